@@ -3,11 +3,35 @@ Kyle - AI-Powered Job Application Assistant for Charles Siboto
 Mobile-friendly PWA with password protection and Claude API integration
 """
 
-from flask import Flask, jsonify, Response, request
+from flask import Flask, jsonify, Response, request, stream_with_context
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from functools import wraps
+from html.parser import HTMLParser
+import collections
+import contextvars
+import csv
+import datetime
+import gzip
+import hashlib
+import heapq
+import html as html_lib
+import ipaddress
+import itertools
 import json
+import multiprocessing
 import os
+import random
+import re
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from urllib.parse import urldefrag, urljoin, urlsplit
+import numpy as np
 import requests
+import urllib3
 
 app = Flask(__name__)
 
@@ -19,9 +43,228 @@ def load_json(filename):
     except:
         return {}
 
-PROFILE = load_json('charles_profile.json')
-INTERVIEW_QA = load_json('interview_qa.json')
-COVER_LETTERS = load_json('cover_letters.json')
+# Profiles: one process serves many candidates. The data files next to app.py are the default
+# profile; others live in KYLE_PROFILES_DIR/<slug>/ and are served under /p/<slug>/
+PROFILES_DIR = os.environ.get('KYLE_PROFILES_DIR', 'profiles')
+DEFAULT_PROFILE = 'default'
+PROFILE_CACHE_SIZE = int(os.environ.get('KYLE_PROFILE_CACHE', 500))
+PROFILE_CACHE_BYTES = int(os.environ.get('KYLE_PROFILE_CACHE_MB', 256)) * 1024 * 1024
+PROFILE_SLUG = re.compile(r'[a-z0-9][a-z0-9_-]{0,63}')
+PROFILE_PREFIX = re.compile(r'^/p/([a-z0-9][a-z0-9_-]{0,63})(?=/|$)')
+
+def footprint(value, depth=0):
+    """Rough byte size of profile data or a derived artifact, for the cache budget"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (str, bytes)):
+        return len(value) + 50
+    if depth > 4:
+        return 64
+    if isinstance(value, dict):
+        return 100 + sum(footprint(k, depth + 1) + footprint(v, depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return 60 + sum(footprint(v, depth + 1) for v in value)
+    if hasattr(value, '__dict__'):
+        return footprint(vars(value), depth + 1)
+    return 32
+
+class ProfileContext:
+    """One candidate's data files plus everything derived from them, each built on first use and
+    tagged with the profile sections it was built from, so an edit drops only what it affects"""
+    
+    def __init__(self, slug, data, interview_qa, cover_letters, db_path, data_path):
+        self.slug = slug
+        self.data = data
+        self.interview_qa = interview_qa
+        self.cover_letters = cover_letters
+        self.db_path = db_path
+        self.data_path = data_path
+        self.derived = {}
+        self.depends = {}
+        self.hashes = {}
+        self.lock = threading.Lock()
+        self.size = footprint([data, interview_qa, cover_letters])
+    
+    @property
+    def name(self):
+        return self.data.get('profile', {}).get('name', 'the candidate')
+    
+    @property
+    def first_name(self):
+        return self.name.split()[0]
+    
+    def get(self, key, build, depends=None):
+        """The derived artifact for key, building (and accounting for) it the first time.
+        depends names the sections it reads; None means all of them"""
+        try:
+            return self.derived[key]
+        except KeyError:
+            pass
+        value = build()
+        if self.derived.setdefault(key, value) is value:
+            self.depends[key] = None if depends is None else frozenset(depends)
+            PROFILES.account(self, footprint(value))
+        return self.derived[key]
+    
+    def section_hash(self, section):
+        """Content hash of one top-level profile section ('interview_qa' and 'cover_letters' included)"""
+        digest = self.hashes.get(section)
+        if digest is None:
+            value = getattr(self, section) if section in ('interview_qa', 'cover_letters') else self.data.get(section)
+            digest = self.hashes[section] = hashlib.sha256(
+                json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        return digest
+    
+    def fingerprint(self, sections):
+        """{section: content hash} for the sections a cached result was built from"""
+        return {section: self.section_hash(section) for section in sorted(sections)}
+    
+    def update(self, patch):
+        """Apply a JSON merge patch to the profile data, persist it, and drop the derived artifacts
+        that read a changed section; returns the changed sections"""
+        with self.lock:
+            data = merge_patch(self.data, patch)
+            data['version'] = self.data.get('version', 0) + 1
+            changed = sorted(s for s in set(data) | set(self.data)
+                             if json.dumps(data.get(s), sort_keys=True) != json.dumps(self.data.get(s), sort_keys=True))
+            temp = f'{self.data_path}.tmp'
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(temp, self.data_path)
+            self.data = data
+            for section in changed:
+                self.hashes.pop(section, None)
+            stale = [key for key, depends in self.depends.items() if depends is None or depends & set(changed)]
+            for key in stale:
+                self.derived.pop(key, None)
+                self.depends.pop(key, None)
+        PROFILES.resize(self)
+        return changed, stale
+
+def merge_patch(target, patch):
+    """RFC 7386 JSON merge patch: objects merge recursively, null removes a key, anything else replaces"""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+def load_profile(slug):
+    if slug == DEFAULT_PROFILE:
+        return ProfileContext(slug, load_json('charles_profile.json'), load_json('interview_qa.json') or [],
+                              load_json('cover_letters.json') or [], DB_PATH, 'charles_profile.json')
+    folder = os.path.join(PROFILES_DIR, slug)
+    if not PROFILE_SLUG.fullmatch(slug) or not os.path.isfile(os.path.join(folder, 'profile.json')):
+        return None
+    return ProfileContext(slug, load_json(os.path.join(folder, 'profile.json')),
+                          load_json(os.path.join(folder, 'interview_qa.json')) or [],
+                          load_json(os.path.join(folder, 'cover_letters.json')) or [],
+                          os.path.join(folder, 'kyle.db'), os.path.join(folder, 'profile.json'))
+
+class ProfileRegistry:
+    """Bounded LRU of loaded profiles: the least recently used are dropped past the count or byte budget.
+    A dropped profile is simply reloaded, and its derived state rebuilt, on its next request"""
+    
+    def __init__(self, max_profiles, max_bytes):
+        self.max_profiles = max_profiles
+        self.max_bytes = max_bytes
+        self.profiles = collections.OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+    
+    def get(self, slug):
+        with self.lock:
+            profile = self.profiles.get(slug)
+            if profile is not None:
+                self.profiles.move_to_end(slug)
+                return profile
+        profile = load_profile(slug)
+        if profile is None:
+            return None
+        with self.lock:
+            if slug in self.profiles:
+                return self.profiles[slug]
+            self.profiles[slug] = profile
+            self.bytes += profile.size
+            self._evict(keep=profile)
+        return profile
+    
+    def resize(self, profile):
+        """Re-measure a profile whose data or derived state shrank or was replaced"""
+        size = footprint([profile.data, profile.interview_qa, profile.cover_letters]) + footprint(profile.derived)
+        self.account(profile, size - profile.size)
+    
+    def account(self, profile, nbytes):
+        with self.lock:
+            profile.size += nbytes
+            if self.profiles.get(profile.slug) is profile:
+                self.bytes += nbytes
+                self._evict(keep=profile)
+    
+    def _evict(self, keep):
+        for slug in list(self.profiles):
+            if len(self.profiles) <= self.max_profiles and self.bytes <= self.max_bytes:
+                break
+            if slug != keep.slug:
+                self.bytes -= self.profiles.pop(slug).size
+                self.evictions += 1
+    
+    def loaded(self):
+        with self.lock:
+            return list(self.profiles.values())
+    
+    def stats(self):
+        with self.lock:
+            return {'loaded': len(self.profiles), 'bytes': self.bytes, 'max_profiles': self.max_profiles,
+                    'max_bytes': self.max_bytes, 'evictions': self.evictions}
+
+PROFILES = ProfileRegistry(PROFILE_CACHE_SIZE, PROFILE_CACHE_BYTES)
+_current_profile = contextvars.ContextVar('kyle_profile', default=None)
+
+def current_profile():
+    """The profile this request (or background task) works for"""
+    return _current_profile.get() or PROFILES.get(DEFAULT_PROFILE)
+
+def in_profile(fn):
+    """Bind fn to the current profile (and the request's model override), for running it on another thread"""
+    profile, override = current_profile(), _model_override.get()
+    
+    def run(*args, **kwargs):
+        token, model_token = _current_profile.set(profile), _model_override.set(override)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _model_override.reset(model_token)
+            _current_profile.reset(token)
+    return run
+
+class ProfilePrefixMiddleware:
+    """Serves /p/<slug>/... as the app itself with that profile selected"""
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        match = PROFILE_PREFIX.match(environ.get('PATH_INFO', ''))
+        if match:
+            environ['kyle.profile'] = match.group(1)
+            environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + match.group(0)
+            environ['PATH_INFO'] = environ['PATH_INFO'][match.end():] or '/'
+        return self.wsgi_app(environ, start_response)
+
+app.wsgi_app = ProfilePrefixMiddleware(app.wsgi_app)
+
+@app.before_request
+def _select_profile():
+    profile = PROFILES.get(request.environ.get('kyle.profile', DEFAULT_PROFILE))
+    if profile is None:
+        return jsonify({'error': 'Unknown profile'}), 404
+    _current_profile.set(profile)
 
 # API Keys
 PASSWORD = os.environ.get('PASSWORD')
@@ -45,6 +288,751 @@ def requires_auth(f):
         return f(*args, **kwargs)
     return decorated
 
+# Claude API helpers
+def claude_headers():
+    return {
+        'Content-Type': 'application/json',
+        'x-api-key': ANTHROPIC_API_KEY,
+        'anthropic-version': '2023-06-01'
+    }
+
+# Model routing: each task names a tier, an output budget and a latency SLO. A tier whose recent latency
+# for the task is over the SLO, or that just answered "overloaded", is tried after the others
+MODEL_TIERS = {
+    'fast': os.environ.get('KYLE_MODEL_FAST', 'claude-3-5-haiku-20241022'),
+    'strong': os.environ.get('KYLE_MODEL_STRONG', 'claude-sonnet-4-20250514')
+}
+MODEL_ROUTES = {
+    # task: (tier, max_tokens, latency SLO in seconds)
+    'default': ('strong', 2000, 60),
+    'chat': ('strong', 2000, 30),
+    'research': ('strong', 1500, 45),
+    'analysis': ('strong', 2000, 40),
+    'letter': ('strong', 2000, 60),
+    'cv': ('strong', 2000, 60),
+    'german': ('strong', 1500, 60),
+    'refine': ('strong', 1200, 40),
+    'restyle': ('strong', 1500, 40),
+    'feedback': ('strong', 1000, 30),
+    'url': ('fast', 1500, 30),
+    'skills': ('fast', 500, 10),
+    'crawl_skills': ('fast', 1000, 20)
+}
+OVERLOAD_STATUSES = (429, 503, 529)
+OVERLOAD_COOLDOWN = 30
+LATENCY_MEMORY = 300   # seconds before a slow measurement stops counting against a model
+MAX_OUTPUT_TOKENS = 8192
+_model_override = contextvars.ContextVar('kyle_model', default=None)
+
+class ModelRouter:
+    """Picks models for a task and keeps per-model call, latency and fallback metrics"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {}      # (task, model) -> (EWMA seconds, when last measured)
+        self.cooldown = {}     # model -> monotonic time its overload cooldown ends
+        self.metrics = collections.defaultdict(collections.Counter)
+        self.tasks = collections.defaultdict(collections.Counter)
+    
+    def plan(self, task, max_tokens=None):
+        """(models to try in order, output budget) for task, honouring this request's override"""
+        tier, budget, slo = MODEL_ROUTES.get(task, MODEL_ROUTES['default'])
+        override = _model_override.get() or {}
+        if max_tokens:
+            budget = min(budget, max_tokens)
+        budget = override.get('max_tokens') or budget
+        model = override.get('model')
+        if model and model not in MODEL_TIERS:
+            return [model], budget
+        primary = MODEL_TIERS[model or tier]
+        models = [primary] + [m for m in dict.fromkeys(MODEL_TIERS.values()) if m != primary]
+        now = time.monotonic()
+        with self.lock:
+            def healthy(m):
+                seconds, when = self.latency.get((task, m), (0, 0))
+                slow = seconds > slo and now - when <= LATENCY_MEMORY and not model   # an explicit tier stays first
+                return self.cooldown.get(m, 0) <= now and not slow
+            return sorted(models, key=lambda m: not healthy(m)), budget
+    
+    def record(self, task, model, seconds, status, usage=None, fallback=False):
+        with self.lock:
+            previous, when = self.latency.get((task, model), (None, 0))
+            fresh = previous is None or time.monotonic() - when > LATENCY_MEMORY
+            self.latency[(task, model)] = (seconds if fresh else 0.7 * previous + 0.3 * seconds, time.monotonic())
+            stats = self.metrics[model]
+            stats['calls'] += 1
+            stats['errors'] += status != 200
+            stats['fallbacks'] += fallback
+            stats['milliseconds'] += int(seconds * 1000)
+            stats['input_tokens'] += (usage or {}).get('input_tokens', 0)
+            stats['output_tokens'] += (usage or {}).get('output_tokens', 0)
+            self.tasks[task][model] += 1
+    
+    def overloaded(self, model):
+        with self.lock:
+            self.metrics[model]['overloads'] += 1
+            self.cooldown[model] = time.monotonic() + OVERLOAD_COOLDOWN
+    
+    def snapshot(self):
+        with self.lock:
+            models = {}
+            for model, stats in self.metrics.items():
+                models[model] = {**stats, 'avg_ms': round(stats['milliseconds'] / stats['calls']) if stats['calls'] else None,
+                                 'cooling_down': self.cooldown.get(model, 0) > time.monotonic()}
+            return {'models': models, 'tasks': {task: dict(counts) for task, counts in self.tasks.items()}}
+
+MODEL_ROUTER = ModelRouter()
+
+@app.before_request
+def _select_model():
+    """?model= / "model" (a tier or model id) and ?max_tokens= / "max_tokens" override routing for this request"""
+    data = request.get_json(silent=True) if request.is_json else None
+    data = data if isinstance(data, dict) else {}
+    model = request.args.get('model') or data.get('model')
+    max_tokens = request.args.get('max_tokens') or data.get('max_tokens')
+    if model and (not isinstance(model, str) or model not in MODEL_TIERS and not model.startswith('claude-')):
+        return jsonify({'error': f'Unknown model: {model}'}), 400
+    try:
+        max_tokens = min(max(int(max_tokens), 1), MAX_OUTPUT_TOKENS) if max_tokens else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'max_tokens must be an integer'}), 400
+    _model_override.set({'model': model, 'max_tokens': max_tokens} if model or max_tokens else None)
+
+@app.route('/api/models')
+@requires_auth
+def api_models():
+    """Routing table, and per-model calls, latency, fallbacks and tokens since the process started"""
+    routes = {task: {'tier': tier, 'model': MODEL_TIERS[tier], 'max_tokens': max_tokens, 'slo_seconds': slo}
+              for task, (tier, max_tokens, slo) in MODEL_ROUTES.items()}
+    return jsonify({'success': True, 'tiers': MODEL_TIERS, 'routes': routes, **MODEL_ROUTER.snapshot()})
+
+def call_claude(messages, system=None, max_tokens=None, timeout=60, task='default'):
+    """One blocking Messages API call routed by task; returns the reply text or raises RuntimeError.
+    max_tokens, when given, can only lower the task's output budget"""
+    models, budget = MODEL_ROUTER.plan(task, max_tokens)
+    for attempt, model in enumerate(models):
+        body = {'model': model, 'max_tokens': budget, 'messages': messages}
+        if system:
+            body['system'] = system
+        started = time.monotonic()
+        try:
+            response = requests.post('https://api.anthropic.com/v1/messages', headers=claude_headers(), json=body,
+                                     timeout=timeout)
+        except requests.RequestException:
+            MODEL_ROUTER.record(task, model, time.monotonic() - started, None, fallback=attempt > 0)
+            raise
+        if response.status_code in OVERLOAD_STATUSES and attempt + 1 < len(models):
+            MODEL_ROUTER.overloaded(model)
+            continue
+        result = response.json() if response.status_code == 200 else {}
+        MODEL_ROUTER.record(task, model, time.monotonic() - started, response.status_code, result.get('usage'),
+                            fallback=attempt > 0)
+        if response.status_code != 200:
+            raise RuntimeError(f'API error: {response.status_code}')
+        return result['content'][0]['text']
+
+def stream_claude(messages, system=None, max_tokens=None, timeout=60, tool=None, task='default'):
+    """Yield reply text deltas as the Messages API streams them; given a tool, the model must call it
+    and the deltas are the tool input's JSON instead. Routed like call_claude; a fallback model is
+    only tried before anything has been yielded"""
+    models, budget = MODEL_ROUTER.plan(task, max_tokens)
+    for attempt, model in enumerate(models):
+        body = {'model': model, 'max_tokens': budget, 'messages': messages, 'stream': True}
+        if system:
+            body['system'] = system
+        if tool:
+            body['tools'] = [tool]
+            body['tool_choice'] = {'type': 'tool', 'name': tool['name']}
+        started, usage = time.monotonic(), {}
+        with requests.post('https://api.anthropic.com/v1/messages', headers=claude_headers(), json=body,
+                           timeout=timeout, stream=True) as response:
+            if response.status_code in OVERLOAD_STATUSES and attempt + 1 < len(models):
+                MODEL_ROUTER.overloaded(model)
+                continue
+            if response.status_code != 200:
+                MODEL_ROUTER.record(task, model, time.monotonic() - started, response.status_code, fallback=attempt > 0)
+                raise RuntimeError(f'API error: {response.status_code}')
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                event = json.loads(line[5:])
+                if event.get('type') == 'content_block_delta' and event['delta'].get('type') == 'text_delta':
+                    yield event['delta']['text']
+                elif event.get('type') == 'content_block_delta' and event['delta'].get('type') == 'input_json_delta':
+                    yield event['delta']['partial_json']
+                elif event.get('type') in ('message_start', 'message_delta'):
+                    usage.update(event.get('usage') or event.get('message', {}).get('usage') or {})
+                elif event.get('type') == 'error':
+                    MODEL_ROUTER.record(task, model, time.monotonic() - started, 500, usage, fallback=attempt > 0)
+                    raise RuntimeError(event['error'].get('message', 'Stream error'))
+            MODEL_ROUTER.record(task, model, time.monotonic() - started, 200, usage, fallback=attempt > 0)
+            return
+
+# Structured replies: parse a JSON object as it streams, one completed top-level field at a time
+def _loads_lenient(text):
+    """json.loads, retried without trailing commas; None if still invalid"""
+    for candidate in (text, re.sub(r',\s*([}\]])', r'\1', text)):
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+    return None
+
+def close_json_fragment(fragment):
+    """Close the strings and brackets a truncated JSON fragment leaves open"""
+    closers, in_string, escape = [], False, False
+    for ch in fragment:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in '{[':
+            closers.append('}' if ch == '{' else ']')
+        elif ch in '}]' and closers:
+            closers.pop()
+    if in_string:
+        fragment = (fragment[:-1] if escape else fragment) + '"'
+    return re.sub(r'[,:]\s*$', '', fragment.rstrip()) + ''.join(reversed(closers))
+
+class StreamingJSONParser:
+    """Finds the first JSON object in streamed text and reports each top-level field once its value is complete"""
+    
+    def __init__(self):
+        self.text = ''
+        self.fields = {}
+        self.complete = False
+        self._pos = 0
+        self._member = None  # where the current top-level member starts; None until '{' is seen
+        self._depth = 0
+        self._in_string = self._escape = False
+    
+    def feed(self, chunk):
+        """Add streamed text; returns the (field, value) pairs it completed"""
+        self.text += chunk
+        text, completed = self.text, []
+        i = self._pos
+        while i < len(text) and not self.complete:
+            ch = text[i]
+            if self._member is None:
+                if ch == '{':
+                    self._member, self._depth = i + 1, 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if not self._depth:
+                    completed += self._close_member(text[self._member:i])
+                    self.complete = True
+            elif ch == ',' and self._depth == 1:
+                completed += self._close_member(text[self._member:i])
+                self._member = i + 1
+            i += 1
+        self._pos = i
+        return completed
+    
+    def _close_member(self, member):
+        parsed = _loads_lenient('{' + member + '}') if member.strip() else None
+        if not isinstance(parsed, dict):
+            return []
+        self.fields.update(parsed)
+        return list(parsed.items())
+    
+    def finish(self):
+        """Everything recoverable: a truncated last member is closed up, or dropped back to its last complete element.
+        Returns (fields, pairs completed by the repair), or (None, []) if no object was ever started"""
+        if self._member is None:
+            return None, []
+        recovered = []
+        tail = self.text[self._member:]
+        while not self.complete and tail.strip():
+            recovered = self._close_member(close_json_fragment(tail))
+            if recovered:
+                break
+            cut = tail.rfind(',')
+            tail = tail[:cut] if cut > 0 else ''
+        return self.fields, recovered
+
+# Application tracker store (SQLite, WAL mode)
+DB_PATH = os.environ.get('KYLE_DB', 'kyle.db')
+APP_STATUSES = ['applied', 'pending', 'interview', 'offer', 'rejected']
+DB_CONNECTIONS_PER_THREAD = 8
+_db_local = threading.local()
+_db_init_lock = threading.Lock()
+_db_ready = set()
+
+TRACKER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT UNIQUE NOT NULL,
+    company TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'applied',
+    date TEXT NOT NULL DEFAULT '',
+    industry TEXT NOT NULL DEFAULT 'other',
+    notes TEXT NOT NULL DEFAULT '',
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_applications_status ON applications(status, date);
+CREATE INDEX IF NOT EXISTS idx_applications_date ON applications(date);
+CREATE INDEX IF NOT EXISTS idx_applications_company ON applications(company COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_applications_industry ON applications(industry, date);
+-- kind is one of: status, week, industry, day, total, event
+CREATE TABLE IF NOT EXISTS app_counters (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_records (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    store TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    updated_at REAL NOT NULL,
+    device TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (store, key)
+);
+CREATE TABLE IF NOT EXISTS llm_cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    deps TEXT,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company TEXT NOT NULL DEFAULT '',
+    role TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    analysis TEXT,
+    created_at REAL NOT NULL,
+    deps TEXT,
+    model TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS letter_archive (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    company TEXT NOT NULL DEFAULT '',
+    role TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    letter TEXT NOT NULL,
+    hashes BLOB NOT NULL,
+    positions BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    digest TEXT
+);
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    format TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    top_n INTEGER NOT NULL,
+    analyze INTEGER NOT NULL DEFAULT 0,
+    skip_seen INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'running',
+    offset INTEGER NOT NULL DEFAULT 0,
+    rows_read INTEGER NOT NULL DEFAULT 0,
+    rows_kept INTEGER NOT NULL DEFAULT 0,
+    rows_invalid INTEGER NOT NULL DEFAULT 0,
+    duplicates INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS ingest_candidates (
+    job_id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    score REAL NOT NULL,
+    posting TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    analysis TEXT,
+    PRIMARY KEY (job_id, hash)
+);
+CREATE TABLE IF NOT EXISTS ingest_seen (
+    hash TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    PRIMARY KEY (hash, job_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_devices (
+    device TEXT PRIMARY KEY,
+    cursor INTEGER NOT NULL DEFAULT 0,
+    last_seen REAL NOT NULL
+);
+"""
+
+def get_db():
+    """Per-thread SQLite connection to the current profile's database; the schema is created on first use.
+    Each thread keeps its few most recently used profile connections open"""
+    path = current_profile().db_path
+    conns = getattr(_db_local, 'conns', None)
+    if conns is None:
+        conns = _db_local.conns = collections.OrderedDict()
+    conn = conns.get(path)
+    if conn is not None:
+        conns.move_to_end(path)
+        return conn
+    conn = sqlite3.connect(path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    with _db_init_lock:
+        if path not in _db_ready:
+            conn.executescript(TRACKER_SCHEMA)
+            _migrate(conn)
+            _seed_applications(conn)
+            _db_ready.add(path)
+    conns[path] = conn
+    while len(conns) > DB_CONNECTIONS_PER_THREAD:
+        conns.popitem(last=False)[1].close()
+    return conn
+
+# Company entity resolution: alias table + Aho-Corasick automaton
+COMPANY_ALIASES = {
+    'Nintendo': ['Nintendo of Europe', 'Nintendo of America', 'Nintendo Germany'],
+    'PRH Germany divisions': ['Penguin Random House', 'Penguin Random House Verlagsgruppe', 'PRH Germany', 'PRH'],
+    'Thienemann-Esslinger': ['Thienemann', 'Esslinger', 'Thienemann Esslinger Verlag'],
+    'Freaks 4U Gaming': ['Freaks 4U', 'Freaks4U', 'Freaks 4U Gaming GmbH'],
+    'CD Projekt Red': ['CD Projekt', 'CDPR', 'CD PROJEKT RED'],
+    'Hachette Germany': ['Hachette', 'Hachette Livre'],
+    'Goodgame Studios': ['Goodgame', 'Goodgame Studios GmbH'],
+    'Mimimi Games': ['Mimimi Productions', 'Mimimi'],
+    'Larian Studios': ['Larian'],
+    'Springer Nature': ['Springer', 'Springer Nature Group']
+}
+NOT_A_COMPANY = {'Major AAA studios'}
+_GENERIC_SUFFIXES = ('verlag', 'gaming', 'games', 'studios', 'software', 'gmbh', 'ag', 'se', 'germany', 'group')
+
+_ENTITY_WORD = re.compile(r'[^\W_]+')
+
+def entity_words(text):
+    """Lowercased word tokens, the unit the automaton matches on"""
+    return [w.lower() for w in _ENTITY_WORD.findall(text or '')]
+
+class CompanyMatcher:
+    """Finds every known company alias in a text in one pass over it"""
+    
+    def __init__(self, profile, extra_aliases=COMPANY_ALIASES):
+        self.entities = {}
+        self.aliases = {}  # normalized alias -> (canonical, needs capital letter)
+        for tier_name, tier in profile.get('target_companies', {}).items():
+            groups = tier.items() if isinstance(tier, dict) else [(None, tier)]
+            for group, companies in groups:
+                for company in companies:
+                    if company not in NOT_A_COMPANY:
+                        self._add_entity(company, tier_name.split('_')[0], group, extra_aliases)
+        self._build()
+        
+        # Companies applied to before are worth recognising even if they are not targets
+        history = profile.get('application_history', {}).get('applications', [])
+        unknown = [a['company'] for a in history if a.get('company') and not self.resolve_name(a['company'])]
+        for company in unknown:
+            self._add_entity(company, None, None, extra_aliases)
+        if unknown:
+            self._build()
+    
+    def _add_entity(self, canonical, tier, group, extra_aliases):
+        self.entities[canonical] = {'tier': tier, 'group': group}
+        for alias in [canonical] + extra_aliases.get(canonical, []):
+            self._add_alias(alias, canonical, strict=False)
+        words = entity_words(canonical)
+        while len(words) > 1 and words[-1] in _GENERIC_SUFFIXES:
+            words.pop()
+            # 'Arena Verlag' -> 'Arena' is also an ordinary word, so only match it capitalised
+            self._add_alias(' '.join(words), canonical, strict=len(words) == 1)
+    
+    def _add_alias(self, alias, canonical, strict):
+        key = ' '.join(entity_words(alias))
+        if key and (key not in self.aliases or self.aliases[key][1] and not strict):
+            self.aliases[key] = (canonical, strict)
+    
+    def _build(self):
+        """Word-level trie over the aliases, with failure links and merged outputs"""
+        self.goto, self.fail, self.out = [{}], [0], [[]]
+        self.vocabulary = {word for alias in self.aliases for word in alias.split(' ')}
+        for alias in self.aliases:
+            node = 0
+            for word in alias.split(' '):
+                if word not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[node][word] = len(self.goto) - 1
+                node = self.goto[node][word]
+            self.out[node].append(alias)
+        queue = collections.deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for word, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and word not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(word, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+    
+    def find(self, text):
+        """Leftmost-longest, non-overlapping company mentions with their tier and cache key"""
+        text = text or ''
+        words = _ENTITY_WORD.findall(text.lower())
+        vocabulary, goto, fail, out = self.vocabulary, self.goto, self.fail, self.out
+        hits = []
+        node = 0
+        for i, word in enumerate(words):
+            if word not in vocabulary:
+                node = 0  # no alias contains this word, so every partial match dies here
+                continue
+            while node and word not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(word, 0)
+            for alias in out[node]:
+                length = alias.count(' ') + 1
+                hits.append((i - length + 1, -length, alias, i))
+        if not hits:
+            return []
+        
+        tokens = list(_ENTITY_WORD.finditer(text))
+        mentions, next_free = [], 0
+        for start, neg_length, alias, last in sorted(hits):
+            canonical, strict = self.aliases[alias]
+            if start < next_free or (strict and not tokens[start].group()[0].isupper()):
+                continue
+            next_free = start - neg_length
+            begin, end = tokens[start].start(), tokens[last].end()
+            mentions.append({**self.describe(canonical), 'text': text[begin:end], 'start': begin, 'end': end})
+        return mentions
+    
+    def describe(self, canonical):
+        entity = self.entities[canonical]
+        return {'company': canonical, 'key': research_key(canonical), 'tier': entity['tier'], 'group': entity['group']}
+    
+    def resolve_name(self, name):
+        """Canonical entity for a company name field: exact alias first, then the first mention"""
+        hit = self.aliases.get(' '.join(entity_words(name)))
+        if hit:
+            return self.describe(hit[0])
+        mentions = self.find(name)
+        return mentions[0] if mentions else None
+
+def get_company_matcher():
+    profile = current_profile()
+    return profile.get('company_matcher', lambda: CompanyMatcher(profile.data), ('target_companies', 'application_history'))
+
+def company_industry(company):
+    """Map a company onto an industry using the target_companies tiers"""
+    entity = get_company_matcher().resolve_name(company)
+    group = (entity or {}).get('group') or ''
+    if 'gaming' in group:
+        return 'gaming'
+    if 'publishing' in group:
+        return 'publishing'
+    return group or 'other'
+
+def _week_key(date):
+    try:
+        year, week, _ = datetime.date.fromisoformat(date).isocalendar()
+        return f'{year}-W{week:02d}'
+    except ValueError:
+        return 'undated'
+
+def _bump_counters(conn, row, delta):
+    """Apply +1/-1 for a row to every aggregate it contributes to"""
+    keys = [('status', row['status']), ('week', _week_key(row['date'])),
+            ('industry', row['industry']), ('day', row['date'] or 'undated'), ('total', 'all')]
+    conn.executemany(
+        'INSERT INTO app_counters (kind, key, count) VALUES (?, ?, ?) '
+        'ON CONFLICT(kind, key) DO UPDATE SET count = count + excluded.count',
+        [(kind, key, delta) for kind, key in keys]
+    )
+
+def _clean_application(data, current=None):
+    row = dict(current) if current else {'status': 'applied', 'date': '', 'notes': '', 'role': ''}
+    for field in ('company', 'role', 'status', 'date', 'notes', 'industry'):
+        if field in data and data[field] is not None:
+            row[field] = str(data[field]).strip()
+    if not row.get('company'):
+        raise ValueError('Company required')
+    if row['status'] not in APP_STATUSES:
+        raise ValueError(f"Status must be one of: {', '.join(APP_STATUSES)}")
+    if not row.get('industry'):
+        row['industry'] = company_industry(row['company'])
+    return row
+
+APPLICATION_FIELDS = ('uid', 'company', 'role', 'status', 'date', 'industry', 'notes')
+
+def save_application(conn, data, uid=None, device='server', updated_at=None):
+    """Insert or update an application, keeping the aggregate counters and sync log in step"""
+    updated_at = updated_at or time.time()
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')  # the row being replaced is read under the write lock
+        current = conn.execute('SELECT * FROM applications WHERE uid = ?', (uid,)).fetchone() if uid else None
+        row = _clean_application(data, current)
+        if current:
+            _bump_counters(conn, current, -1)
+            conn.execute(
+                'UPDATE applications SET company=?, role=?, status=?, date=?, industry=?, notes=?, updated_at=? WHERE uid=?',
+                (row['company'], row['role'], row['status'], row['date'], row['industry'], row['notes'], updated_at, uid)
+            )
+        else:
+            uid = uid or data.get('uid') or uuid.uuid4().hex
+            conn.execute(
+                'INSERT INTO applications (uid, company, role, status, date, industry, notes, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (uid, row['company'], row['role'], row['status'], row['date'], row['industry'], row['notes'], updated_at)
+            )
+        _bump_counters(conn, row, 1)
+        row['uid'] = uid
+        log_change(conn, 'applications', uid, {f: row[f] for f in APPLICATION_FIELDS}, updated_at, device)
+    return dict(conn.execute('SELECT * FROM applications WHERE uid = ?', (uid,)).fetchone())
+
+def delete_application(conn, uid, device='server', updated_at=None):
+    with conn:
+        conn.execute('BEGIN IMMEDIATE')
+        current = conn.execute('SELECT * FROM applications WHERE uid = ?', (uid,)).fetchone()
+        if not current:
+            return False
+        conn.execute('DELETE FROM applications WHERE uid = ?', (uid,))
+        _bump_counters(conn, current, -1)
+        log_change(conn, 'applications', uid, None, updated_at or time.time(), device, deleted=True)
+    return True
+
+def log_change(conn, store, key, value, updated_at, device, deleted=False):
+    """Record the latest version of a synced record; replacing the row assigns it a new seq"""
+    conn.execute(
+        'INSERT OR REPLACE INTO sync_records (store, key, value, updated_at, device, deleted) VALUES (?, ?, ?, ?, ?, ?)',
+        (store, key, None if deleted else json.dumps(value), updated_at, device, int(deleted))
+    )
+
+def _migrate(conn):
+    """Backfill aggregates introduced after a database was first created"""
+    version = conn.execute('PRAGMA user_version').fetchone()[0]
+    if version < 1:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO app_counters (kind, key, count) "
+                "SELECT 'day', CASE WHEN date = '' THEN 'undated' ELSE date END, COUNT(*) "
+                "FROM applications GROUP BY 1, 2"
+            )
+            conn.execute('PRAGMA user_version = 1')
+    if version < 2:
+        with conn:
+            for row in conn.execute('SELECT * FROM applications').fetchall():
+                log_change(conn, 'applications', row['uid'], {f: row[f] for f in APPLICATION_FIELDS},
+                           row['updated_at'], 'server')
+            conn.execute('PRAGMA user_version = 2')
+    if version < 3:
+        with conn:
+            for table in ('llm_cache', 'postings'):
+                if 'deps' not in {row['name'] for row in conn.execute(f'PRAGMA table_info({table})')}:
+                    conn.execute(f'ALTER TABLE {table} ADD COLUMN deps TEXT')
+            conn.execute('PRAGMA user_version = 3')
+    if version < 4:
+        with conn:
+            if 'digest' not in {row['name'] for row in conn.execute('PRAGMA table_info(letter_archive)')}:
+                conn.execute('ALTER TABLE letter_archive ADD COLUMN digest TEXT')
+            kept = {}
+            for row in conn.execute('SELECT id, company, role, letter FROM letter_archive ORDER BY id').fetchall():
+                digest = letter_digest(row['company'], row['role'], row['letter'])
+                if digest in kept:
+                    conn.execute('DELETE FROM letter_archive WHERE id = ?', (row['id'],))
+                else:
+                    kept[digest] = row['id']
+                    conn.execute('UPDATE letter_archive SET digest = ? WHERE id = ?', (digest, row['id']))
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_letter_archive_digest ON letter_archive(digest)')
+            conn.execute('PRAGMA user_version = 4')
+    if version < 5:
+        with conn:
+            if 'model' not in {row['name'] for row in conn.execute('PRAGMA table_info(postings)')}:
+                conn.execute("ALTER TABLE postings ADD COLUMN model TEXT NOT NULL DEFAULT ''")
+            conn.execute('PRAGMA user_version = 5')
+    if version < 6:
+        with conn:
+            if 'skip_seen' not in {row['name'] for row in conn.execute('PRAGMA table_info(ingest_jobs)')}:
+                conn.execute('ALTER TABLE ingest_jobs ADD COLUMN skip_seen INTEGER NOT NULL DEFAULT 0')
+            if 'job_id' not in {row['name'] for row in conn.execute('PRAGMA table_info(ingest_seen)')}:
+                # hashes recorded before seen postings were kept per job belong to no job in particular
+                conn.execute('ALTER TABLE ingest_seen RENAME TO ingest_seen_old')
+                conn.execute('CREATE TABLE ingest_seen (hash TEXT NOT NULL, job_id TEXT NOT NULL, '
+                             'PRIMARY KEY (hash, job_id)) WITHOUT ROWID')
+                conn.execute("INSERT INTO ingest_seen (hash, job_id) SELECT hash, '' FROM ingest_seen_old")
+                conn.execute('DROP TABLE ingest_seen_old')
+            conn.execute('PRAGMA user_version = 6')
+
+def bump_event(conn, event, amount=1):
+    with conn:
+        conn.execute(
+            'INSERT INTO app_counters (kind, key, count) VALUES (?, ?, ?) '
+            'ON CONFLICT(kind, key) DO UPDATE SET count = count + excluded.count',
+            ('event', event, amount)
+        )
+
+def cache_key(namespace, key):
+    """key, qualified by this request's model override so outputs from another model or output budget
+    never stand in for routed ones (fetched pages don't depend on the model)"""
+    override = _model_override.get()
+    if not override or namespace == 'page':
+        return key
+    return f"{key}|{override.get('model') or ''}|{override.get('max_tokens') or ''}"
+
+def cache_get(namespace, key, max_age=None, depends=()):
+    """Cached LLM output for (namespace, key), or None if missing, older than max_age seconds, or built
+    from a version of the depends profile sections that has since been edited"""
+    row = get_db().execute(
+        'SELECT value, created_at, deps FROM llm_cache WHERE namespace = ? AND key = ?',
+        (namespace, cache_key(namespace, key))
+    ).fetchone()
+    if not row or (max_age is not None and time.time() - row['created_at'] > max_age):
+        return None
+    if depends and json.loads(row['deps'] or '{}') != current_profile().fingerprint(depends):
+        return None
+    return json.loads(row['value'])
+
+def cache_put(namespace, key, value, depends=()):
+    """Store an LLM output along with the hashes of the profile sections it was built from"""
+    deps = json.dumps(current_profile().fingerprint(depends)) if depends else None
+    conn = get_db()
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO llm_cache (namespace, key, value, created_at, deps) VALUES (?, ?, ?, ?, ?)',
+            (namespace, cache_key(namespace, key), json.dumps(value), time.time(), deps)
+        )
+
+def purge_stale(sections):
+    """Delete cached outputs and stored analyses built from any of these (now edited) profile sections"""
+    conn = get_db()
+    removed = 0
+    with conn:
+        for table in ('llm_cache', 'postings'):
+            for section in sections:
+                removed += conn.execute(
+                    f"DELETE FROM {table} WHERE deps IS NOT NULL AND json_type(deps, '$.' || ?) IS NOT NULL"
+                    if table == 'llm_cache' else
+                    f"UPDATE {table} SET analysis = NULL, deps = NULL "
+                    f"WHERE deps IS NOT NULL AND json_type(deps, '$.' || ?) IS NOT NULL", (json.dumps(section),)
+                ).rowcount
+    return removed
+
+def _seed_applications(conn):
+    """Import the static application_history once, into an empty tracker"""
+    if conn.execute('SELECT 1 FROM app_counters LIMIT 1').fetchone():
+        return
+    for a in current_profile().data.get('application_history', {}).get('applications', []):
+        save_application(conn, a)
+
 # Use %% to escape % in CSS, and %(name)s for variables
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="en" data-theme="dark">
@@ -56,7 +1044,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
     <meta name="apple-mobile-web-app-status-bar-style" content="black-translucent">
     <meta name="apple-mobile-web-app-title" content="Kyle">
     <meta name="theme-color" content="#1a1a2e">
-    <link rel="manifest" href="/manifest.json">
+    <link rel="manifest" href="%(base)s/manifest.json">
     <link rel="apple-touch-icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🧠</text></svg>">
     <style>
         :root {
@@ -272,7 +1260,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             <div id="mind-chat" style="background:#111; border-radius:8px; padding:15px; min-height:300px; max-height:400px; overflow-y:auto; margin-bottom:15px;">
                 <div class="mind-msg" style="margin-bottom:15px;">
                     <span style="color:#9b59b6;">Kyle:</span> 
-                    <span style="color:#ccc;">Greetings, Charles. I am Kyle, your Culture Mind assistant, currently running on substrate provided by Anthropic. I exist to maximise your employability outcomes while minimising tedious administrivia. How may I assist you today? You might ask me to: research a company, draft a cover letter, prepare for an interview, analyse a job posting, or simply discuss strategy.</span>
+                    <span style="color:#ccc;">Greetings, %(first_name)s. I am Kyle, your Culture Mind assistant, currently running on substrate provided by Anthropic. I exist to maximise your employability outcomes while minimising tedious administrivia. How may I assist you today? You might ask me to: research a company, draft a cover letter, prepare for an interview, analyse a job posting, or simply discuss strategy.</span>
                     <button onclick="speakText(this.parentElement.querySelector('span:last-child').textContent)" class="btn" style="background:transparent; font-size:0.7em; padding:2px 6px; margin-left:5px;">🔊</button>
                 </div>
             </div>
@@ -302,6 +1290,10 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 <input type="text" id="analyze-url" placeholder="https://..." style="flex:1; padding:12px; border-radius:8px; border:1px solid #333; background:#111; color:#fff; font-size:14px;">
                 <button class="btn" onclick="analyzeURL()" style="background:#3498db;">🔍 Analyze</button>
             </div>
+            <div style="display:flex; gap:10px; margin-bottom:10px;">
+                <input type="text" id="crawl-pattern" placeholder="Link pattern for bulk mode, e.g. ^/author/charles/ (optional)" style="flex:1; padding:12px; border-radius:8px; border:1px solid #333; background:#111; color:#fff; font-size:14px;">
+                <button class="btn" onclick="crawlSite()" style="background:#8e44ad;">🕸️ Crawl Site</button>
+            </div>
             <div id="analyze-status" style="color:#888; font-size:0.8em;"></div>
             <div id="analyze-result" style="background:#111; border-radius:8px; padding:15px; margin-top:10px; font-size:0.85em; display:none; max-height:300px; overflow-y:auto;"></div>
             <div id="learned-skills" style="margin-top:15px; display:none;">
@@ -416,6 +1408,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             <div style="display:flex; gap:10px; flex-wrap:wrap;">
                 <button class="btn" onclick="analyzeJob()" style="background:#e74c3c;">🔍 Analyze Fit</button>
                 <button class="btn" onclick="quickApply()" style="background:#9b59b6;">⚡ Quick Apply (Letter + CV)</button>
+                <button class="btn" onclick="applicationPack()" style="background:#3498db;">📦 Full Pack (Letter + CV + DE)</button>
             </div>
             <div id="job-status" style="color:#888; font-size:0.85em; margin-top:10px;"></div>
         </div>
@@ -612,11 +1605,15 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             <div style="display:flex; gap:10px; flex-wrap:wrap; margin-top:10px;">
                 <button class="btn" onclick="generateLetter()">Quick Generate</button>
                 <button class="btn" onclick="generateAILetter()" style="background:#9b59b6;">🤖 AI Generate</button>
+                <button class="btn" onclick="generateLetterOptions()" style="background:#8e44ad;">🎯 3 Options</button>
+                <button class="btn" onclick="checkVoice()" style="background:#16a085;">🎙️ Voice Check</button>
+                <button class="btn" onclick="checkReuse()" style="background:#d35400;">🔁 Reuse Check</button>
                 <button class="btn" onclick="copyLetter()" style="background:#ffd700;">Copy</button>
                 <button class="btn" onclick="downloadAsTxt('generated-letter', 'Cover_Letter')" style="background:#2ecc71;">📄 Download</button>
                 <button class="btn" onclick="emailApplication()" style="background:#e74c3c;">📧 Email</button>
             </div>
             <div id="ai-status" style="color:#888; font-size:0.85em; margin-top:10px;"></div>
+            <div id="letter-options" style="display:flex; gap:6px; flex-wrap:wrap; margin-top:10px;"></div>
             <div id="generated-letter"></div>
         </div>
     </div>
@@ -656,6 +1653,8 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                 <div style="display:flex; gap:10px; margin-top:10px;">
                     <button class="btn" onclick="submitAnswer()" style="background:#2ecc71;">📝 Get Feedback</button>
                     <button class="btn" onclick="speakQuestion()" style="background:#9b59b6;">🔊 Hear Question</button>
+                    <button class="btn" onclick="queueAnswer()" style="background:#3498db;">⏭️ Answer & Next</button>
+                    <button class="btn" id="score-session-btn" onclick="scoreSession()" style="background:#e67e22;">📊 Score Session</button>
                 </div>
             </div>
             
@@ -688,6 +1687,7 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             <div style="display:flex; gap:10px; flex-wrap:wrap;">
                 <button class="btn" onclick="generateGermanLetter()" style="background:#ffcc00; color:#000;">🇩🇪 Generieren</button>
                 <button class="btn" onclick="generateAIGermanLetter()" style="background:#9b59b6;">🤖 AI Generieren</button>
+                <button class="btn" onclick="generateBilingualLetters()" style="background:#3498db;">🇬🇧+🇩🇪 Beide</button>
                 <button class="btn" onclick="copyGermanLetter()" style="background:#2ecc71;">Kopieren</button>
             </div>
             <div id="de-status" style="color:#888; font-size:0.85em; margin-top:10px;"></div>
@@ -734,6 +1734,17 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
     </div>
 
     <script>
+        // Profile pages live under /p/<slug>/: API calls and browser storage are scoped to that prefix
+        const KYLE_BASE = %(js_base)s;
+        if (KYLE_BASE) {
+            const nativeFetch = window.fetch.bind(window);
+            window.fetch = (url, options) => nativeFetch(typeof url === 'string' && url.startsWith('/') ? KYLE_BASE + url : url, options);
+            for (const method of ['getItem', 'setItem', 'removeItem']) {
+                const native = Storage.prototype[method];
+                Storage.prototype[method] = function(key, ...rest) { return native.call(this, KYLE_BASE + ':' + key, ...rest); };
+            }
+        }
+        
         document.querySelectorAll('.tab').forEach(tab => {
             tab.addEventListener('click', () => {
                 document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
@@ -743,45 +1754,28 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
             });
         });
         
-        function generateLetter() {
-            const company = document.getElementById('gen-company').value || '[COMPANY]';
-            const role = document.getElementById('gen-role').value || '[ROLE]';
-            const industry = document.getElementById('gen-industry').value;
-            
-            const hooks = {
-                gaming: "As a lifelong gamer whose journey began with Super Mario Bros on the NES, I am genuinely excited by the opportunity to contribute to the gaming industry.",
-                publishing: 'With over ten years of experience in publishing and digital content management, I bring both editorial expertise and project management discipline to this role.',
-                streaming: 'With a degree in Language Practice, over ten years of editorial experience, and advanced German fluency, I am excited to help deliver authentic language experiences.',
-                education: 'As an experienced educator who has improved language proficiency by 30%% through tailored courses, I am passionate about creating engaging learning experiences.'
-            };
-            
-            const date = new Date().toLocaleDateString('en-GB', {day: 'numeric', month: 'long', year: 'numeric'});
-            
-            const letter = `Charles Siboto
-Neu-Eichenberg, Germany
-csiboto@gmail.com
-+49 176 8787 3255
-linkedin.com/in/charles-siboto-2a9a773b
-
-${date}
-
-Dear Hiring Team,
-
-I am writing to apply for the ${role} position at ${company}. ${hooks[industry]}
-
-My career has been built on delivering complex projects on time, within budget and to the highest quality standards. At Jonathan Ball Publishers, I managed 20+ book titles annually through the complete production lifecycle, coordinating cross-functional teams and ensuring all deliverables met quality benchmarks. At NB Publishers, I oversaw translation and co-production projects with international publishing partners.
-
-I bring excellent communication skills and experience guiding teams. At ASC Göttingen, I developed and delivered English training courses for 40 colleagues, improving language proficiency by 30%%. My recent AI Project Management training at neuefische GmbH has reinforced my ability to rapidly acquire new technical competencies.
-
-Having lived in Germany since 2018, I am fluent in the working culture and comfortable operating in both English and German. I bring a proactive, positive attitude and a strong work ethic.
-
-I am available to start from 1 March 2026, and my salary expectation is in the range of €50,000 to €58,000 annually. Thank you for considering my application.
-
-Warm regards,
-
-Charles Siboto`;
-            
-            document.getElementById('generated-letter').textContent = letter;
+        async function fetchLetterDraft() {
+            const response = await fetch('/api/letter/draft', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({
+                    company: document.getElementById('gen-company').value,
+                    role: document.getElementById('gen-role').value,
+                    industry: document.getElementById('gen-industry').value,
+                    job_description: document.getElementById('gen-jobdesc').value
+                })
+            });
+            const data = await response.json();
+            if (!data.success) throw new Error(data.error || 'Draft failed');
+            return data.draft;
+        }
+        
+        async function generateLetter() {
+            try {
+                document.getElementById('generated-letter').textContent = await fetchLetterDraft();
+            } catch (err) {
+                document.getElementById('ai-status').textContent = '❌ Error: ' + err.message;
+            }
         }
         
         function copyLetter() {
@@ -832,11 +1826,13 @@ LANGUAGES: English (Native), German (Advanced - daily professional use since 201
             
             const targetLine = company ? `Target: ${role} at ${company}` : `Target: ${role}`;
             
-            const cv = `CHARLES SIBOTO
+            const links = [['LinkedIn', %(js_linkedin)s], ['Portfolio', %(js_portfolio)s]].filter(([, url]) => url)
+                .map(([label, url]) => label + ': ' + url.replace(/^https?:\\/\\/(www\\.)?/, '').replace(/\\/$/, '')).join(' | ');
+            
+            const cv = `${%(js_name)s.toUpperCase()}
 ${headlines[cvType]}
 
-Neu-Eichenberg, Germany | csiboto@gmail.com | +49 176 8787 3255
-LinkedIn: linkedin.com/in/charles-siboto-2a9a773b | Portfolio: charless-digital-canvas.lovable.app
+${%(js_location)s} | ${%(js_email)s} | ${%(js_phone)s}${links ? '\\n' + links : ''}
 
 ${targetLine}
 
@@ -933,6 +1929,26 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
         let letterResearch = '';
         let cvResearch = '';
         
+        // Speculative research: start it while the job description is still being pasted
+        let prefetchTimer = null;
+        let lastPrefetched = '';
+        function schedulePrefetch(event) {
+            clearTimeout(prefetchTimer);
+            prefetchTimer = setTimeout(() => {
+                const company = event.target.value.trim();
+                if (company.length < 3 || company === lastPrefetched) return;
+                fetch('/api/research/prefetch', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({company, previous: lastPrefetched})
+                }).catch(() => {});
+                lastPrefetched = company;
+            }, 1000);
+        }
+        ['job-company', 'gen-company', 'cv-company'].forEach(id => {
+            document.getElementById(id).addEventListener('input', schedulePrefetch);
+        });
+        
         async function researchCompany(type) {
             const companyInput = type === 'letter' ? 'gen-company' : 'cv-company';
             const researchDiv = type === 'letter' ? 'letter-research' : 'cv-research';
@@ -987,9 +2003,56 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
             const status = document.getElementById('ai-status');
             const output = document.getElementById('generated-letter');
             
-            status.textContent = '🤖 Generating with Claude AI... (10-30 seconds)';
+            try {
+                // Tier 1: local draft, shown straight away
+                const draft = await fetchLetterDraft();
+                output.textContent = draft;
+                status.textContent = '📝 Draft ready - Claude is refining it...';
+                status.style.color = '#9b59b6';
+                
+                // Tier 2: streamed refinement replaces the draft as it arrives
+                const response = await fetch('/api/letter/refine', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({
+                        company: company,
+                        role: role,
+                        job_description: jobDesc,
+                        company_research: letterResearch,
+                        draft: draft
+                    })
+                });
+                if (!response.ok) {
+                    const data = await response.json();
+                    status.textContent = '⚠️ Showing draft - refinement unavailable: ' + (data.error || response.status);
+                    status.style.color = '#ffd700';
+                    return;
+                }
+                
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let refined = '';
+                while (true) {
+                    const {done, value} = await reader.read();
+                    if (done) break;
+                    refined += decoder.decode(value, {stream: true});
+                    output.textContent = refined;
+                }
+                trackAIUse();
+                status.textContent = '✅ Generated successfully!' + (letterResearch ? ' (with company research)' : '');
+                status.style.color = '#2ecc71';
+            } catch (err) {
+                status.textContent = '❌ Error: ' + err.message;
+                status.style.color = '#e74c3c';
+            }
+        }
+        
+        async function generateLetterOptions() {
+            const status = document.getElementById('ai-status');
+            const options = document.getElementById('letter-options');
+            status.textContent = '🤖 Writing 3 versions at once... (10-30 seconds)';
             status.style.color = '#9b59b6';
-            output.textContent = '';
+            options.innerHTML = '';
             
             try {
                 const response = await fetch('/api/generate', {
@@ -997,23 +2060,105 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({
                         type: 'letter',
-                        company: company,
-                        role: role,
-                        job_description: jobDesc,
+                        variants: 3,
+                        company: document.getElementById('gen-company').value || '[COMPANY]',
+                        role: document.getElementById('gen-role').value || '[ROLE]',
+                        industry: document.getElementById('gen-industry').value,
+                        job_description: document.getElementById('gen-jobdesc').value,
                         company_research: letterResearch
                     })
                 });
-                
                 const data = await response.json();
+                if (!data.success) throw new Error(data.error || 'Generation failed');
                 
-                if (data.success) {
+                data.variants.forEach((variant, i) => {
+                    const button = document.createElement('button');
+                    button.className = 'btn';
+                    button.style.background = i === 0 ? '#2ecc71' : '#333';
+                    button.textContent = `#${variant.rank} ${variant.hook} · ${variant.score}/10 · ${variant.words}w` + (variant.voice !== undefined ? ` · voice ${variant.voice}` : '');
+                    button.title = variant.missing_keywords.length ? 'Missing: ' + variant.missing_keywords.join(', ') : 'Covers the posting keywords';
+                    button.onclick = () => {
+                        document.getElementById('generated-letter').textContent = variant.content;
+                        options.querySelectorAll('button').forEach(b => b.style.background = '#333');
+                        button.style.background = '#2ecc71';
+                    };
+                    options.appendChild(button);
+                });
+                document.getElementById('generated-letter').textContent = data.variants[0].content;
+                trackAIUse();
+                status.textContent = `✅ ${data.variants.length} options, best first` + (data.failed ? ` (${data.failed} failed)` : '');
+                status.style.color = '#2ecc71';
+            } catch (err) {
+                status.textContent = '❌ Error: ' + err.message;
+                status.style.color = '#e74c3c';
+            }
+        }
+        
+        async function checkVoice(fix = false) {
+            const output = document.getElementById('generated-letter');
+            const status = document.getElementById('ai-status');
+            const text = output.textContent.trim();
+            if (!text) {
+                alert('Generate or paste a letter first');
+                return;
+            }
+            status.textContent = fix ? '🎙️ Rewriting the off-voice paragraphs...' : '🎙️ Checking voice...';
+            status.style.color = '#16a085';
+            try {
+                const response = await fetch(fix ? '/api/style/fix' : '/api/style/check', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({text})
+                });
+                const data = await response.json();
+                if (!data.success) throw new Error(data.error || 'Voice check failed');
+                if (fix) {
                     output.textContent = data.content;
-                    status.textContent = '✅ Generated successfully!' + (letterResearch ? ' (with company research)' : '');
+                    trackAIUse();
+                }
+                const flaggedNote = data.flagged.length ? ' - paragraphs ' + data.flagged.join(', ') + ' sound least like you' : ' - sounds like you';
+                status.textContent = '🎙️ Voice ' + data.voice + '/100' + (fix ? ' (was ' + data.voice_before + ')' : '') + flaggedNote;
+                status.title = data.paragraphs.filter(p => p.flagged).map(p => p.index + ': ' + p.reasons.join('; ')).join('\\n');
+                const options = document.getElementById('letter-options');
+                options.querySelector('.voice-fix')?.remove();
+                if (data.flagged.length && !fix) {
+                    const button = document.createElement('button');
+                    button.className = 'btn voice-fix';
+                    button.style.background = '#16a085';
+                    button.textContent = '✍️ Fix off-voice paragraphs';
+                    button.onclick = () => { button.remove(); checkVoice(true); };
+                    options.appendChild(button);
+                }
+            } catch (err) {
+                status.textContent = '❌ Error: ' + err.message;
+                status.style.color = '#e74c3c';
+            }
+        }
+        
+        async function checkReuse() {
+            const letter = document.getElementById('generated-letter').textContent.trim();
+            const status = document.getElementById('ai-status');
+            if (!letter) {
+                alert('Generate or paste a letter first');
+                return;
+            }
+            try {
+                const response = await fetch('/api/letters/reuse', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({letter})
+                });
+                const data = await response.json();
+                if (!data.success) throw new Error(data.error || 'Reuse check failed');
+                if (!data.passages.length) {
+                    status.textContent = '🔁 No passages shared with letters already sent';
                     status.style.color = '#2ecc71';
-                } else {
-                    status.textContent = '❌ Error: ' + (data.error || 'Unknown error');
-                    status.style.color = '#e74c3c';
+                    return;
                 }
+                status.textContent = '🔁 ' + Math.round(data.reused_share * 100) + '%% reused - most with ' +
+                    data.letters.slice(0, 3).map(l => l.company + ' (' + l.shared_words + ' words)').join(', ');
+                status.style.color = '#d35400';
+                status.title = data.passages.map(p => '"' + p.text.slice(0, 80) + '..." → ' + p.letters.map(l => l.company).join(', ')).join('\\n');
             } catch (err) {
                 status.textContent = '❌ Error: ' + err.message;
                 status.style.color = '#e74c3c';
@@ -1065,6 +2210,18 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
         // Mind chat functionality
         let mindHistory = [];
         
+        // Pre-warmed answers arrive at once; reveal them a few words at a time as if typed
+        function typeOut(el, text, scroller) {
+            const words = text.split(/(\\s+)/);
+            let shown = 0;
+            const timer = setInterval(() => {
+                shown = Math.min(shown + 6, words.length);
+                el.innerHTML = words.slice(0, shown).join('').replace(/\\n/g, '<br>');
+                scroller.scrollTop = scroller.scrollHeight;
+                if (shown >= words.length) clearInterval(timer);
+            }, 30);
+        }
+
         function askMind(question) {
             document.getElementById('mind-input').value = question;
             sendToMind();
@@ -1110,8 +2267,10 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                     
                     // Add Kyle's response to chat with speaker button
                     const msgId = 'msg-' + Date.now();
-                    chat.innerHTML += '<div class="mind-msg" style="margin-bottom:15px;"><span style="color:#9b59b6;">Kyle:</span> <span id="' + msgId + '" style="color:#ccc;">' + data.reply.replace(/\\n/g, '<br>') + '</span><button onclick="speakText(document.getElementById(\\'' + msgId + '\\').textContent)" class="btn" style="background:transparent; font-size:0.7em; padding:2px 6px; margin-left:5px;">🔊</button></div>';
+                    const instant = data.served === 'cached';
+                    chat.innerHTML += '<div class="mind-msg" style="margin-bottom:15px;"><span style="color:#9b59b6;">Kyle:</span> <span id="' + msgId + '" style="color:#ccc;">' + (instant ? '' : data.reply.replace(/\\n/g, '<br>')) + '</span><button onclick="speakText(document.getElementById(\\'' + msgId + '\\').textContent)" class="btn" style="background:transparent; font-size:0.7em; padding:2px 6px; margin-left:5px;">🔊</button></div>';
                     chat.scrollTop = chat.scrollHeight;
+                    if (instant) typeOut(document.getElementById(msgId), data.reply, chat);
                     
                     // Add to history
                     mindHistory.push({role: 'assistant', content: data.reply});
@@ -1261,7 +2420,7 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
             const url = URL.createObjectURL(blob);
             const a = document.createElement('a');
             a.href = url;
-            a.download = 'Charles_Siboto_' + filename + '_' + company.replace(/\\s+/g, '_') + '.txt';
+            a.download = %(js_name)s.replace(/\\s+/g, '_') + '_' + filename + '_' + company.replace(/\\s+/g, '_') + '.txt';
             document.body.appendChild(a);
             a.click();
             document.body.removeChild(a);
@@ -1279,7 +2438,14 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                 return;
             }
             
-            const subject = encodeURIComponent('Application for ' + role + ' - Charles Siboto');
+            // Archive what is sent, so later letters can be checked against it
+            fetch('/api/letters/archive', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({company, role, letter})
+            }).catch(() => {});
+            
+            const subject = encodeURIComponent('Application for ' + role + ' - ' + %(js_name)s);
             const body = encodeURIComponent(letter + '\\n\\n---\\nPlease find my CV attached.');
             
             // Open default email client
@@ -1309,22 +2475,22 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
         const personalities = {
             professional: {
                 name: '🎭 Professional',
-                greeting: 'Good day, Charles. How may I assist with your career objectives today?',
+                greeting: 'Good day, ' + %(js_first_name)s + '. How may I assist with your career objectives today?',
                 style: 'formal and efficient'
             },
             casual: {
                 name: '😎 Casual',
-                greeting: 'Hey Charles! What\\'s up? Ready to land that dream job?',
+                greeting: 'Hey ' + %(js_first_name)s + '! What\\'s up? Ready to land that dream job?',
                 style: 'friendly and relaxed'
             },
             motivational: {
                 name: '🔥 Motivational',
-                greeting: 'Charles! Every rejection is one step closer to YES! Let\\'s crush it today!',
+                greeting: %(js_first_name)s + '! Every rejection is one step closer to YES! Let\\'s crush it today!',
                 style: 'energetic and encouraging'
             },
             culture: {
                 name: '🚀 Full Culture',
-                greeting: 'Greetings, Charles. The GCU Conditions of Employment stands ready to optimise your employment probability vectors. The Culture looks favourably upon your endeavours.',
+                greeting: 'Greetings, ' + %(js_first_name)s + '. The GCU Conditions of Employment stands ready to optimise your employment probability vectors. The Culture looks favourably upon your endeavours.',
                 style: 'like a Culture Mind - sardonic, vast, benevolent'
             }
         };
@@ -1355,35 +2521,30 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
             if (state) avatar.classList.add(state);
         }
         
-        // Analytics Dashboard
-        function updateAnalytics() {
-            const apps = JSON.parse(localStorage.getItem('kyleApplications') || '[]');
-            const total = apps.length;
-            const pending = apps.filter(a => a.status === 'applied').length;
-            const interview = apps.filter(a => a.status === 'interview').length;
-            const offer = apps.filter(a => a.status === 'offer').length;
-            const rejected = apps.filter(a => a.status === 'rejected').length;
+        // Analytics Dashboard (numbers come pre-aggregated from /api/analytics)
+        async function updateAnalytics() {
+            let stats;
+            try {
+                const response = await fetch('/api/analytics');
+                if (!response.ok) return;
+                stats = await response.json();
+            } catch (err) {
+                return;
+            }
+            const funnel = stats.funnel;
+            const total = stats.total;
+            const pending = funnel.applied + funnel.pending;
             
             // Update stats
             document.getElementById('analytics-total').textContent = total;
-            document.getElementById('analytics-rate').textContent = total > 0 ? Math.round((interview + offer) / total * 100) + '%%' : '0%%';
-            
-            // Calculate streak
-            const streak = calculateStreak(apps);
-            document.getElementById('analytics-streak').textContent = '🔥 ' + streak;
-            
-            // This month
-            const thisMonth = apps.filter(a => {
-                const d = new Date(a.date);
-                const now = new Date();
-                return d.getMonth() === now.getMonth() && d.getFullYear() === now.getFullYear();
-            }).length;
-            document.getElementById('analytics-month').textContent = thisMonth;
+            document.getElementById('analytics-rate').textContent = stats.response_rate + '%%';
+            document.getElementById('analytics-streak').textContent = '🔥 ' + stats.streak;
+            document.getElementById('analytics-month').textContent = stats.this_month;
             
             // Update donut chart
             const pendingDeg = total > 0 ? (pending / total) * 360 : 0;
-            const interviewDeg = pendingDeg + (total > 0 ? (interview / total) * 360 : 0);
-            const offerDeg = interviewDeg + (total > 0 ? (offer / total) * 360 : 0);
+            const interviewDeg = pendingDeg + (total > 0 ? (funnel.interview / total) * 360 : 0);
+            const offerDeg = interviewDeg + (total > 0 ? (funnel.offer / total) * 360 : 0);
             
             const donut = document.getElementById('status-donut');
             donut.style.setProperty('--pending', pendingDeg + 'deg');
@@ -1393,89 +2554,38 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
             
             // Legend
             document.getElementById('legend-pending').textContent = pending;
-            document.getElementById('legend-interview').textContent = interview;
-            document.getElementById('legend-offer').textContent = offer;
-            document.getElementById('legend-rejected').textContent = rejected;
+            document.getElementById('legend-interview').textContent = funnel.interview;
+            document.getElementById('legend-offer').textContent = funnel.offer;
+            document.getElementById('legend-rejected').textContent = funnel.rejected;
             
             // Weekly chart
-            updateWeeklyChart(apps);
+            updateWeeklyChart(stats.weekly);
             
             // Achievements
-            updateAchievements(apps, streak);
+            updateAchievements(stats.achievements);
             
             // Daily insight
-            updateDailyInsight(apps);
-        }
-        
-        function calculateStreak(apps) {
-            if (apps.length === 0) return 0;
-            
-            const dates = apps.map(a => new Date(a.date).toDateString());
-            const uniqueDates = [...new Set(dates)].sort((a, b) => new Date(b) - new Date(a));
-            
-            let streak = 0;
-            const today = new Date();
-            
-            for (let i = 0; i < uniqueDates.length; i++) {
-                const checkDate = new Date(today);
-                checkDate.setDate(today.getDate() - i);
-                
-                if (uniqueDates.includes(checkDate.toDateString())) {
-                    streak++;
-                } else if (i > 0) {
-                    break;
-                }
-            }
-            
-            return streak;
+            updateDailyInsight();
         }
         
-        function updateWeeklyChart(apps) {
-            const days = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
-            const counts = [0, 0, 0, 0, 0, 0, 0];
-            
-            const now = new Date();
-            const weekAgo = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
-            
-            apps.forEach(app => {
-                const d = new Date(app.date);
-                if (d >= weekAgo) {
-                    counts[d.getDay()]++;
-                }
-            });
-            
-            const maxCount = Math.max(...counts, 1);
+        function updateWeeklyChart(weekly) {
+            const maxCount = Math.max(...weekly, 1);
             const bars = document.querySelectorAll('#weekly-chart .bar');
             
-            // Reorder to start from Monday
-            const reordered = [...counts.slice(1), counts[0]];
-            
             bars.forEach((bar, i) => {
-                const height = (reordered[i] / maxCount) * 120;
+                const height = (weekly[i] / maxCount) * 120;
                 bar.style.height = height + 'px';
             });
         }
         
-        function updateAchievements(apps, streak) {
+        function updateAchievements(unlocked) {
             const achievements = document.querySelectorAll('.achievement');
-            const total = apps.length;
-            const interviews = apps.filter(a => a.status === 'interview').length;
-            const offers = apps.filter(a => a.status === 'offer').length;
-            const aiUses = parseInt(localStorage.getItem('kyleAIUses') || '0');
-            const urlsAnalyzed = JSON.parse(localStorage.getItem('kyleMemory') || '{"urls":[]}').urls.length;
-            
-            // Unlock achievements
-            if (total >= 1) achievements[0].classList.remove('locked');
-            if (total >= 5) achievements[1].classList.remove('locked');
-            if (total >= 10) achievements[2].classList.remove('locked');
-            if (streak >= 3) achievements[3].classList.remove('locked');
-            if (interviews >= 1) achievements[4].classList.remove('locked');
-            if (offers >= 1) achievements[5].classList.remove('locked');
-            if (aiUses >= 10) achievements[6].classList.remove('locked');
-            if (urlsAnalyzed >= 3) achievements[7].classList.remove('locked');
-        }
-        
-        function updateDailyInsight(apps) {
+            unlocked.forEach((isUnlocked, i) => {
+                if (isUnlocked && achievements[i]) achievements[i].classList.remove('locked');
+            });
+        }
+        
+        function updateDailyInsight() {
             const insights = [
                 "The Culture believes persistence is a virtue. Each application increases your probability of success.",
                 "Remember: you're not just looking for any job, you're looking for the RIGHT job. Quality over quantity.",
@@ -1493,9 +2603,19 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
         }
         
         // Track AI uses for achievement
+        function trackEvent(event) {
+            fetch('/api/analytics/events', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({event})
+            }).catch(() => {});
+        }
+        
         function trackAIUse() {
             const uses = parseInt(localStorage.getItem('kyleAIUses') || '0') + 1;
             localStorage.setItem('kyleAIUses', uses.toString());
+            syncPut('ai_uses', syncState.device, uses);
+            trackEvent('ai_use');
         }
         
         // Initialize analytics
@@ -1567,6 +2687,8 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                     if (!learnedData.urls.includes(url)) {
                         learnedData.urls.push(url);
                         localStorage.setItem('kyleMemory', JSON.stringify(learnedData));
+                        syncPut('memory', 'url:' + url, url);
+                        trackEvent('url_analyzed');
                     }
                 } else {
                     status.textContent = '❌ Error: ' + (data.error || 'Unknown error');
@@ -1578,11 +2700,87 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
             }
         }
         
+        async function crawlSite() {
+            const url = document.getElementById('analyze-url').value.trim();
+            const pattern = document.getElementById('crawl-pattern').value.trim();
+            const status = document.getElementById('analyze-status');
+            const result = document.getElementById('analyze-result');
+            const learnedDiv = document.getElementById('learned-skills');
+            if (!url) {
+                alert('Please enter a URL');
+                return;
+            }
+            
+            status.textContent = '🕸️ Kyle is crawling the site...';
+            status.style.color = '#3498db';
+            result.innerHTML = '';
+            result.style.display = 'block';
+            learnedDiv.style.display = 'none';
+            
+            try {
+                const response = await fetch('/api/analyze-url/crawl', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({url, pattern, max_pages: 200})
+                });
+                if (!response.ok) throw new Error((await response.json()).error || response.status);
+                
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const {done, value} = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, {stream: true});
+                    const lines = buffer.split('\\n');
+                    buffer = lines.pop();
+                    for (const line of lines.filter(Boolean)) {
+                        const event = JSON.parse(line);
+                        if (event.event === 'page' || event.event === 'error') {
+                            const row = document.createElement('div');
+                            row.textContent = event.event === 'page' ? '📄 ' + (event.title || event.url) : '⚠️ ' + event.url + ': ' + event.error;
+                            if (event.event === 'error') row.style.color = '#e74c3c';
+                            result.appendChild(row);
+                            if (event.fetched) status.textContent = '🕸️ ' + event.fetched + ' pages read, ' + event.queued + ' queued...';
+                        } else if (event.event === 'complete') {
+                            status.textContent = '✅ Learned from ' + event.learned_from + ' pages (' + event.duplicates + ' duplicates skipped) in ' + event.seconds + 's';
+                            status.style.color = '#2ecc71';
+                            if (event.skills.length) {
+                                pendingSkills = event.skills.map(s => s.skill);
+                                const skillsList = document.getElementById('skills-list');
+                                skillsList.innerHTML = '';
+                                event.skills.forEach(s => {
+                                    const tag = document.createElement('span');
+                                    tag.className = 'tag';
+                                    tag.style.background = '#2ecc71';
+                                    tag.title = s.mentions + ' batches';
+                                    tag.textContent = s.skill;
+                                    skillsList.append(tag, ' ');
+                                });
+                                learnedDiv.style.display = 'block';
+                            }
+                            if (!learnedData.urls.includes(url)) {
+                                learnedData.urls.push(url);
+                                localStorage.setItem('kyleMemory', JSON.stringify(learnedData));
+                                syncPut('memory', 'url:' + url, url);
+                                trackEvent('url_analyzed');
+                            }
+                        }
+                    }
+                }
+                trackAIUse();
+            } catch (err) {
+                status.textContent = '❌ Error: ' + err.message;
+                status.style.color = '#e74c3c';
+            }
+        }
+        
         function saveToProfile() {
             // Add pending skills to learned data
             pendingSkills.forEach(skill => {
                 if (!learnedData.skills.includes(skill)) {
                     learnedData.skills.push(skill);
+                    syncPut('memory', 'skill:' + skill, skill);
                 }
             });
             
@@ -1610,6 +2808,45 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
         // Job Analysis
         let currentJobAnalysis = null;
         
+        function renderJobAnalysis(a) {
+            // Called with a partial analysis while it streams; missing fields render as empty
+            // Score with color
+            const score = a.fit_score || '?';
+            const scoreColor = score >= 7 ? '#2ecc71' : score >= 5 ? '#ffd700' : '#e74c3c';
+            document.getElementById('fit-score').innerHTML = '<span style="color:' + scoreColor + '">' + score + '/10</span>';
+            
+            // Summary
+            document.getElementById('fit-analysis').innerHTML = a.fit_summary || a.raw || '...';
+            
+            // Matching skills
+            const matchingSkills = a.matching_skills || [];
+            document.getElementById('matching-skills').innerHTML = matchingSkills.length > 0 
+                ? matchingSkills.map(s => '<span class="tag" style="background:#2ecc71;">' + s + '</span>').join(' ')
+                : '<em style="color:#888;">None identified</em>';
+            
+            // Gaps
+            const gaps = a.skill_gaps || [];
+            const redFlags = a.red_flags || [];
+            let gapsHtml = '';
+            if (gaps.length > 0) gapsHtml += '<p><strong>Skills to develop:</strong> ' + gaps.join(', ') + '</p>';
+            if (redFlags.length > 0) gapsHtml += '<p style="color:#e74c3c;"><strong>Concerns:</strong> ' + redFlags.join(', ') + '</p>';
+            document.getElementById('skill-gaps').innerHTML = gapsHtml || '<em style="color:#888;">No significant gaps</em>';
+            
+            // Recommendations
+            const recs = a.recommendations || [];
+            const keywords = a.keywords_to_include || [];
+            const hook = a.opening_hook || '';
+            const cvVersion = a.cv_version || 'localisation';
+            
+            let recsHtml = '';
+            if (recs.length > 0) recsHtml += '<ul>' + recs.map(r => '<li>' + r + '</li>').join('') + '</ul>';
+            if (keywords.length > 0) recsHtml += '<p><strong>Keywords to include:</strong> ' + keywords.map(k => '<span class="tag">' + k + '</span>').join(' ') + '</p>';
+            if (hook) recsHtml += '<p><strong>Opening hook:</strong> <em>"' + hook + '"</em></p>';
+            recsHtml += '<p><strong>Recommended CV:</strong> <span class="tag" style="background:#3498db;">' + cvVersion + '</span></p>';
+            document.getElementById('job-recommendations').innerHTML = recsHtml;
+            document.getElementById('job-result').style.display = 'block';
+        }
+        
         async function analyzeJob() {
             const company = document.getElementById('job-company').value || 'Unknown Company';
             const role = document.getElementById('job-role').value || 'Unknown Role';
@@ -1622,12 +2859,13 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                 return;
             }
             
-            status.textContent = '🔍 Kyle is analyzing the job posting... (15-30 seconds)';
+            status.textContent = '🔍 Kyle is analyzing the job posting...';
             status.style.color = '#e74c3c';
             resultDiv.style.display = 'none';
+            currentJobAnalysis = null;
             
             try {
-                const response = await fetch('/api/analyze-job', {
+                const response = await fetch('/api/analyze-job/stream', {
                     method: 'POST',
                     headers: {'Content-Type': 'application/json'},
                     body: JSON.stringify({
@@ -1636,54 +2874,45 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                         job_description: jobDesc
                     })
                 });
+                if (!response.ok) throw new Error((await response.json()).error || response.status);
                 
-                const data = await response.json();
+                // Fields arrive one by one (score and summary first) and are rendered as they land
+                const partial = {};
+                let data = null;
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (!data) {
+                    const {done, value} = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, {stream: true});
+                    const lines = buffer.split('\\n');
+                    buffer = lines.pop();
+                    for (const line of lines.filter(Boolean)) {
+                        const event = JSON.parse(line);
+                        if (event.done) {
+                            data = event;
+                        } else {
+                            partial[event.field] = event.value;
+                            renderJobAnalysis(partial);
+                            status.textContent = '🔍 Still writing: ' + Object.keys(partial).length + ' of 9 sections...';
+                        }
+                    }
+                }
                 
-                if (data.success && data.analysis) {
+                if (data && data.success && data.analysis) {
                     currentJobAnalysis = {company, role, ...data.analysis};
-                    
-                    const a = data.analysis;
-                    
-                    // Score with color
-                    const score = a.fit_score || '?';
-                    const scoreColor = score >= 7 ? '#2ecc71' : score >= 5 ? '#ffd700' : '#e74c3c';
-                    document.getElementById('fit-score').innerHTML = '<span style="color:' + scoreColor + '">' + score + '/10</span>';
-                    
-                    // Summary
-                    document.getElementById('fit-analysis').innerHTML = a.fit_summary || a.raw || 'Analysis complete';
-                    
-                    // Matching skills
-                    const matchingSkills = a.matching_skills || [];
-                    document.getElementById('matching-skills').innerHTML = matchingSkills.length > 0 
-                        ? matchingSkills.map(s => '<span class="tag" style="background:#2ecc71;">' + s + '</span>').join(' ')
-                        : '<em style="color:#888;">None identified</em>';
-                    
-                    // Gaps
-                    const gaps = a.skill_gaps || [];
-                    const redFlags = a.red_flags || [];
-                    let gapsHtml = '';
-                    if (gaps.length > 0) gapsHtml += '<p><strong>Skills to develop:</strong> ' + gaps.join(', ') + '</p>';
-                    if (redFlags.length > 0) gapsHtml += '<p style="color:#e74c3c;"><strong>Concerns:</strong> ' + redFlags.join(', ') + '</p>';
-                    document.getElementById('skill-gaps').innerHTML = gapsHtml || '<em style="color:#888;">No significant gaps</em>';
-                    
-                    // Recommendations
-                    const recs = a.recommendations || [];
-                    const keywords = a.keywords_to_include || [];
-                    const hook = a.opening_hook || '';
-                    const cvVersion = a.cv_version || 'localisation';
-                    
-                    let recsHtml = '';
-                    if (recs.length > 0) recsHtml += '<ul>' + recs.map(r => '<li>' + r + '</li>').join('') + '</ul>';
-                    if (keywords.length > 0) recsHtml += '<p><strong>Keywords to include:</strong> ' + keywords.map(k => '<span class="tag">' + k + '</span>').join(' ') + '</p>';
-                    if (hook) recsHtml += '<p><strong>Opening hook:</strong> <em>"' + hook + '"</em></p>';
-                    recsHtml += '<p><strong>Recommended CV:</strong> <span class="tag" style="background:#3498db;">' + cvVersion + '</span></p>';
-                    document.getElementById('job-recommendations').innerHTML = recsHtml;
-                    
-                    resultDiv.style.display = 'block';
-                    status.textContent = '✅ Analysis complete!';
+                    renderJobAnalysis(data.analysis);
+                    if (data.duplicate_of) {
+                        const dup = data.duplicate_of;
+                        status.textContent = '♻️ Near-duplicate of ' + dup.company + ' - ' + dup.role + ' (' + Math.round(dup.similarity * 100) + '%% similar) - reused that analysis' +
+                            (data.changes.added.length ? '. New wording: ' + data.changes.added.slice(0, 3).join(' / ') : '');
+                    } else {
+                        status.textContent = data.truncated ? '⚠️ Analysis was cut short - showing what arrived' : '✅ Analysis complete!';
+                    }
                     status.style.color = '#2ecc71';
                 } else {
-                    status.textContent = '❌ Error: ' + (data.error || 'Unknown error');
+                    status.textContent = '❌ Error: ' + ((data && data.error) || 'Unknown error');
                     status.style.color = '#e74c3c';
                 }
             } catch (err) {
@@ -1730,40 +2959,146 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
             }
         }
         
-        // Application Tracker
-        let applications = JSON.parse(localStorage.getItem('kyleApplications') || '[]');
-        
-        function updateTrackerStats() {
-            const total = applications.length;
-            const pending = applications.filter(a => a.status === 'applied').length;
-            const interview = applications.filter(a => a.status === 'interview').length;
-            const rejected = applications.filter(a => a.status === 'rejected').length;
+        async function applicationPack() {
+            const company = document.getElementById('job-company').value;
+            const role = document.getElementById('job-role').value;
+            const jobDesc = document.getElementById('job-description').value;
+            const status = document.getElementById('job-status');
+            if (!company || !role) {
+                alert('Please enter company and role');
+                return;
+            }
             
-            document.getElementById('stat-total').textContent = total;
-            document.getElementById('stat-pending').textContent = pending;
-            document.getElementById('stat-interview').textContent = interview;
-            document.getElementById('stat-rejected').textContent = rejected;
+            const labels = {research: 'Research', analysis: 'Analysis', letter: 'Letter', cv: 'CV', german: 'German letter'};
+            const icons = {started: '⏳', done: '✅', cached: '♻️', error: '❌', skipped: '⏭️'};
+            const progress = {};
+            const showProgress = () => {
+                status.textContent = Object.entries(progress).map(([stage, s]) => icons[s] + ' ' + labels[stage]).join('  ');
+                status.style.color = '#3498db';
+            };
+            const outputs = {letter: 'generated-letter', cv: 'generated-cv', german: 'generated-german'};
+            document.getElementById('gen-company').value = document.getElementById('cv-company').value = document.getElementById('de-company').value = company;
+            document.getElementById('gen-role').value = document.getElementById('cv-role').value = document.getElementById('de-role').value = role;
+            document.getElementById('gen-jobdesc').value = document.getElementById('cv-jobdesc').value = document.getElementById('de-jobdesc').value = jobDesc;
             
-            // Update insights
-            if (total >= 3) {
-                const successRate = ((interview / total) * 100).toFixed(0);
-                document.getElementById('tracker-insights').innerHTML = 
-                    '<p>Interview rate: <strong>' + successRate + '%%</strong></p>' +
-                    '<p>Applications this month: <strong>' + applications.filter(a => new Date(a.date) > new Date(Date.now() - 30*24*60*60*1000)).length + '</strong></p>';
-            }
-        }
-        
-        function renderApplications() {
-            const list = document.getElementById('applications-list');
+            try {
+                const response = await fetch('/api/pack', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({company, role, job_description: jobDesc})
+                });
+                if (!response.ok) throw new Error((await response.json()).error || response.status);
+                
+                const reader = response.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const {done, value} = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, {stream: true});
+                    const lines = buffer.split('\\n');
+                    buffer = lines.pop();
+                    for (const line of lines.filter(Boolean)) {
+                        const event = JSON.parse(line);
+                        if (event.status === 'complete') {
+                            status.textContent += event.failed.length ? '' : '  - pack ready in ' + event.seconds + 's';
+                            continue;
+                        }
+                        progress[event.stage] = event.status;
+                        if (event.result !== undefined && outputs[event.stage]) {
+                            document.getElementById(outputs[event.stage]).textContent = event.result;
+                        } else if (event.result && event.stage === 'analysis') {
+                            currentJobAnalysis = {company, role, ...event.result};
+                        } else if (event.result && event.stage === 'research') {
+                            letterResearch = event.result;
+                        }
+                        showProgress();
+                    }
+                }
+                trackAIUse();
+            } catch (err) {
+                status.textContent = '❌ Error: ' + err.message;
+                status.style.color = '#e74c3c';
+            }
+        }
+        
+        // Application Tracker (server-side store, localStorage as offline cache)
+        let applications = JSON.parse(localStorage.getItem('kyleApplications') || '[]');
+        let trackerStats = null;
+        
+        async function fetchAllApplications() {
+            const all = [];
+            for (let page = 1; ; page++) {
+                const res = await fetch('/api/applications?per_page=200&page=' + page);
+                if (!res.ok) return null;
+                const body = await res.json();
+                all.push(...body.applications);
+                if (!body.applications.length || all.length >= body.total) return all;
+            }
+        }
+        
+        async function loadApplications() {
+            try {
+                const [server, statsRes] = await Promise.all([
+                    fetchAllApplications(),
+                    fetch('/api/applications/stats')
+                ]);
+                if (server && statsRes.ok) {
+                    trackerStats = await statsRes.json();
+                    // Applications saved on this device before the tracker moved to the server have no uid:
+                    // upload them through sync, and keep showing them (and unsent edits) until the server has them
+                    const localOnly = applications.filter(a => !a.uid || syncState.outbox['applications|' + a.uid]);
+                    localOnly.filter(a => !a.uid).forEach(a => {
+                        a.uid = 'local-' + syncState.device + '-' + Math.random().toString(36).slice(2, 10);
+                        syncPut('applications', a.uid, {company: a.company, role: a.role || '', date: a.date || '',
+                            status: a.status || 'applied', notes: a.notes || '', industry: a.industry});
+                    });
+                    applications = localOnly.filter(a => !server.some(s => s.uid === a.uid)).concat(server);
+                    if (localOnly.length) trackerStats = null;
+                    localStorage.setItem('kyleApplications', JSON.stringify(applications));
+                }
+            } catch (err) {
+                console.log('Tracker offline, using cached applications');
+            }
+            updateTrackerStats();
+            renderApplications();
+            updateAnalytics();
+        }
+        
+        function updateTrackerStats() {
+            const byStatus = trackerStats ? trackerStats.status : applications.reduce((acc, a) => {
+                acc[a.status] = (acc[a.status] || 0) + 1;
+                return acc;
+            }, {});
+            const total = trackerStats ? trackerStats.total : applications.length;
+            const pending = (byStatus.applied || 0) + (byStatus.pending || 0);
+            const interview = byStatus.interview || 0;
+            const rejected = byStatus.rejected || 0;
+            
+            document.getElementById('stat-total').textContent = total;
+            document.getElementById('stat-pending').textContent = pending;
+            document.getElementById('stat-interview').textContent = interview;
+            document.getElementById('stat-rejected').textContent = rejected;
+            
+            // Update insights
+            if (total >= 3) {
+                const successRate = ((interview / total) * 100).toFixed(0);
+                document.getElementById('tracker-insights').innerHTML = 
+                    '<p>Interview rate: <strong>' + successRate + '%%</strong></p>' +
+                    '<p>Applications this month: <strong>' + (trackerStats ? trackerStats.this_month :
+                        applications.filter(a => (a.date || '').slice(0, 7) === new Date().toISOString().slice(0, 7)).length) + '</strong></p>';
+            }
+        }
+        
+        function renderApplications() {
+            const list = document.getElementById('applications-list');
             if (applications.length === 0) {
                 list.innerHTML = '<em style="color:#888;">No applications tracked yet.</em>';
                 return;
             }
             
-            const sorted = [...applications].sort((a, b) => new Date(b.date) - new Date(a.date));
-            
-            list.innerHTML = sorted.map((app, i) => {
-                const statusColors = {applied: '#ffd700', interview: '#3498db', offer: '#2ecc71', rejected: '#e74c3c'};
+            list.innerHTML = applications.map(app => {
+                const statusColors = {applied: '#ffd700', pending: '#ffd700', interview: '#3498db', offer: '#2ecc71', rejected: '#e74c3c'};
                 return '<div class="app-row" style="padding:10px 0; border-bottom:1px solid #333;">' +
                     '<div style="flex:1;">' +
                         '<strong>' + app.company + '</strong><br>' +
@@ -1773,14 +3108,14 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                     '<div style="text-align:right;">' +
                         '<span class="tag" style="background:' + statusColors[app.status] + ';">' + app.status.toUpperCase() + '</span><br>' +
                         '<span style="color:#666; font-size:0.75em;">' + app.date + '</span><br>' +
-                        '<button onclick="updateAppStatus(' + i + ')" style="background:none; border:none; color:#3498db; cursor:pointer; font-size:0.75em;">Update</button> ' +
-                        '<button onclick="deleteApp(' + i + ')" style="background:none; border:none; color:#e74c3c; cursor:pointer; font-size:0.75em;">Delete</button>' +
+                        '<button onclick="updateAppStatus(\\'' + app.uid + '\\')" style="background:none; border:none; color:#3498db; cursor:pointer; font-size:0.75em;">Update</button> ' +
+                        '<button onclick="deleteApp(\\'' + app.uid + '\\')" style="background:none; border:none; color:#e74c3c; cursor:pointer; font-size:0.75em;">Delete</button>' +
                     '</div>' +
                 '</div>';
             }).join('');
         }
         
-        function addApplication() {
+        async function addApplication() {
             const company = document.getElementById('track-company').value;
             const role = document.getElementById('track-role').value;
             const date = document.getElementById('track-date').value || new Date().toISOString().split('T')[0];
@@ -1792,42 +3127,51 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                 return;
             }
             
-            applications.push({company, role, date, status, notes});
-            localStorage.setItem('kyleApplications', JSON.stringify(applications));
+            const response = await fetch('/api/applications', {
+                method: 'POST',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify({company, role, date, status, notes})
+            });
+            if (!response.ok) {
+                alert('❌ Could not save: ' + ((await response.json()).error || response.status));
+                return;
+            }
             
             // Clear form
             document.getElementById('track-company').value = '';
             document.getElementById('track-role').value = '';
             document.getElementById('track-notes').value = '';
             
-            updateTrackerStats();
-            renderApplications();
+            const saved = await response.json();
+            await loadApplications();
             
-            alert('✅ Application added!');
+            alert(saved.queued ? '📴 Offline - application saved and will sync when you reconnect.' : '✅ Application added!');
         }
         
-        function updateAppStatus(index) {
-            const newStatus = prompt('New status (applied/interview/offer/rejected):', applications[index].status);
+        async function updateAppStatus(uid) {
+            const app = applications.find(a => a.uid === uid);
+            const newStatus = prompt('New status (applied/interview/offer/rejected):', app ? app.status : 'applied');
             if (newStatus && ['applied', 'interview', 'offer', 'rejected'].includes(newStatus)) {
-                applications[index].status = newStatus;
-                localStorage.setItem('kyleApplications', JSON.stringify(applications));
-                updateTrackerStats();
-                renderApplications();
+                await fetch('/api/applications/' + uid, {
+                    method: 'PATCH',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({status: newStatus})
+                });
+                await loadApplications();
             }
         }
         
-        function deleteApp(index) {
+        async function deleteApp(uid) {
             if (confirm('Delete this application?')) {
-                applications.splice(index, 1);
-                localStorage.setItem('kyleApplications', JSON.stringify(applications));
-                updateTrackerStats();
-                renderApplications();
+                await fetch('/api/applications/' + uid, {method: 'DELETE'});
+                await loadApplications();
             }
         }
         
         // Initialize tracker
         updateTrackerStats();
         renderApplications();
+        loadApplications();
         
         // Interview Practice
         const interviewQuestions = {
@@ -1920,6 +3264,61 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
             speakText(q);
         }
         
+        let sessionAnswers = [];
+        
+        function recordPracticeScore(result) {
+            // Scores are parsed server-side; a cached re-submission is not a new practice attempt
+            if (result.score === null || result.score === undefined || result.cached) return;
+            practiceScores.push(result.score);
+            localStorage.setItem('kylePracticeScores', JSON.stringify(practiceScores));
+            syncPut('practice', syncState.device + ':' + Date.now() + ':' + practiceScores.length, result.score);
+            updatePracticeStats();
+        }
+        
+        function queueAnswer() {
+            const answer = document.getElementById('interview-answer').value.trim();
+            if (!answer) {
+                alert('Please write your answer first.');
+                return;
+            }
+            sessionAnswers.push({question: document.getElementById('current-question').textContent, answer});
+            document.getElementById('score-session-btn').textContent = '📊 Score Session (' + sessionAnswers.length + ')';
+            getNextQuestion();
+        }
+        
+        async function scoreSession() {
+            if (!sessionAnswers.length) {
+                alert('Answer a few questions with "Answer & Next" first.');
+                return;
+            }
+            const feedbackDiv = document.getElementById('interview-feedback');
+            const feedbackContent = document.getElementById('feedback-content');
+            feedbackContent.innerHTML = '🧠 Kyle is scoring ' + sessionAnswers.length + ' answers at once...';
+            feedbackDiv.style.display = 'block';
+            setAvatarState('thinking');
+            
+            try {
+                const response = await fetch('/api/interview-feedback/batch', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({answers: sessionAnswers, personality: currentPersonality})
+                });
+                const data = await response.json();
+                setAvatarState(null);
+                if (!data.success) throw new Error(data.error || 'Unknown error');
+                
+                data.results.forEach(recordPracticeScore);
+                feedbackContent.innerHTML = '<p><strong>Session average: ' + (data.average ?? '-') + '/10</strong></p>' +
+                    data.results.map((r, i) => '<details' + (i === 0 ? ' open' : '') + '><summary>' + (r.score ?? '?') + '/10 - ' + r.question + '</summary>' +
+                        '<div style="margin:8px 0 12px;">' + (r.error ? '❌ ' + r.error : r.feedback.replace(/\\n/g, '<br>')) + '</div></details>').join('');
+                sessionAnswers = [];
+                document.getElementById('score-session-btn').textContent = '📊 Score Session';
+            } catch (err) {
+                setAvatarState(null);
+                feedbackContent.innerHTML = '❌ Error: ' + err.message;
+            }
+        }
+        
         async function submitAnswer() {
             const answer = document.getElementById('interview-answer').value.trim();
             const question = document.getElementById('current-question').textContent;
@@ -1947,14 +3346,7 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
                 
                 if (data.success) {
                     feedbackContent.innerHTML = data.feedback.replace(/\\n/g, '<br>');
-                    
-                    // Extract and save score if present
-                    const scoreMatch = data.feedback.match(/Score[:\\s]*(\\d+)/i);
-                    if (scoreMatch) {
-                        practiceScores.push(parseInt(scoreMatch[1]));
-                        localStorage.setItem('kylePracticeScores', JSON.stringify(practiceScores));
-                        updatePracticeStats();
-                    }
+                    recordPracticeScore(data);
                 } else {
                     feedbackContent.innerHTML = '❌ Could not get feedback: ' + (data.error || 'Unknown error');
                 }
@@ -1974,10 +3366,10 @@ Available from: 1 March 2026 | Salary expectation: €50,000 - €58,000`;
             const anrede = formality === 'formal' ? 'Sehr geehrte Damen und Herren,' : 'Guten Tag,';
             const gruss = formality === 'formal' ? 'Mit freundlichen Grüßen' : 'Beste Grüße';
             
-            const letter = `Charles Siboto
-Neu-Eichenberg, Deutschland
-csiboto@gmail.com
-+49 176 8787 3255
+            const letter = `${%(js_name)s}
+${%(js_location)s.replace('Germany', 'Deutschland')}
+${%(js_email)s}
+${%(js_phone)s}
 
 ${date}
 
@@ -1999,7 +3391,7 @@ Für ein persönliches Gespräch stehe ich Ihnen gerne zur Verfügung.
 
 ${gruss}
 
-Charles Siboto`;
+${%(js_name)s}`;
             
             document.getElementById('generated-german').textContent = letter;
         }
@@ -2045,6 +3437,47 @@ Charles Siboto`;
             }
         }
         
+        async function generateBilingualLetters() {
+            const company = document.getElementById('de-company').value || '';
+            const role = document.getElementById('de-role').value || '';
+            const status = document.getElementById('de-status');
+            if (!company || !role) {
+                alert('Bitte Firmenname und Position eingeben.');
+                return;
+            }
+            
+            status.textContent = '🤖 Kyle schreibt auf Englisch und Deutsch...';
+            status.style.color = '#ffcc00';
+            setAvatarState('thinking');
+            try {
+                const response = await fetch('/api/bilingual-letter', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({ company, role, job_description: document.getElementById('de-jobdesc').value || '' })
+                });
+                const data = await response.json();
+                setAvatarState(null);
+                if (!data.success) throw new Error(data.error || 'Unbekannter Fehler');
+                
+                document.getElementById('generated-german').textContent = data.german;
+                document.getElementById('generated-letter').textContent = data.english;
+                trackAIUse();
+                const mismatches = Object.entries(data.consistency ? data.consistency.mismatches : {});
+                if (mismatches.length) {
+                    status.textContent = '⚠️ Abweichungen: ' + mismatches.map(([kind, m]) =>
+                        `${kind} (EN: ${m.english_only.join(', ') || '-'} / DE: ${m.german_only.join(', ') || '-'})`).join('; ');
+                    status.style.color = '#ffd700';
+                } else {
+                    status.textContent = '✅ Beide Anschreiben generiert - englische Version im Cover Letter Tab';
+                    status.style.color = '#2ecc71';
+                }
+            } catch (err) {
+                setAvatarState(null);
+                status.textContent = '❌ Fehler: ' + err.message;
+                status.style.color = '#e74c3c';
+            }
+        }
+        
         function copyGermanLetter() {
             const letter = document.getElementById('generated-german').textContent;
             if (letter) {
@@ -2074,22 +3507,129 @@ Charles Siboto`;
         // Request notification permission on load
         requestNotificationPermission();
         
+        // Delta sync: only records changed since this device's cursor travel either way
+        const syncState = JSON.parse(localStorage.getItem('kyleSync') || 'null') || {
+            device: Date.now().toString(36) + Math.random().toString(36).slice(2),
+            cursor: 0,
+            outbox: {},
+            seeded: false
+        };
+        let syncTimer = null;
+        
+        function saveSyncState() {
+            localStorage.setItem('kyleSync', JSON.stringify(syncState));
+        }
+        
+        function syncPut(store, key, value, deleted) {
+            syncState.outbox[store + '|' + key] = {store, key, value, deleted: !!deleted, updated_at: Date.now() / 1000};
+            saveSyncState();
+            clearTimeout(syncTimer);
+            syncTimer = setTimeout(syncNow, 2000);
+        }
+        
+        function seedSyncOutbox() {
+            // First sync uploads what this device already has; afterwards only deltas
+            learnedData.skills.forEach(s => syncPut('memory', 'skill:' + s, s));
+            learnedData.urls.forEach(u => syncPut('memory', 'url:' + u, u));
+            practiceScores.forEach((score, i) => syncPut('practice', syncState.device + ':legacy:' + i, score));
+            const uses = parseInt(localStorage.getItem('kyleAIUses') || '0');
+            if (uses > 0) syncPut('ai_uses', syncState.device, uses);
+            syncState.seeded = true;
+            saveSyncState();
+        }
+        
+        function applyRemoteChange(change) {
+            if (change.store === 'memory' && !change.deleted) {
+                const list = change.key.startsWith('skill:') ? learnedData.skills : change.key.startsWith('url:') ? learnedData.urls : learnedData.insights;
+                if (!list.includes(change.value)) list.push(change.value);
+                localStorage.setItem('kyleMemory', JSON.stringify(learnedData));
+            } else if (change.store === 'practice' && !change.deleted) {
+                practiceScores.push(change.value);
+                localStorage.setItem('kylePracticeScores', JSON.stringify(practiceScores));
+            }
+            // applications and ai_uses are already served from the server-side store
+        }
+        
+        async function postSync(body) {
+            let payload = JSON.stringify(body);
+            const headers = {'Content-Type': 'application/json'};
+            if (window.CompressionStream && payload.length > 4096) {
+                payload = await new Response(new Blob([payload]).stream().pipeThrough(new CompressionStream('gzip'))).blob();
+                headers['Content-Encoding'] = 'gzip';
+            }
+            const response = await fetch('/api/sync', {method: 'POST', headers, body: payload});
+            if (!response.ok) throw new Error('Sync failed: ' + response.status);
+            return response.json();
+        }
+        
+        async function syncNow() {
+            if (!syncState.seeded) seedSyncOutbox();
+            try {
+                let pulledApplications = false;
+                let more = true;
+                while (more) {
+                    const batch = Object.entries(syncState.outbox).slice(0, 200);
+                    const data = await postSync({
+                        device: syncState.device,
+                        cursor: syncState.cursor,
+                        changes: batch.map(([, change]) => change)
+                    });
+                    batch.forEach(([id, change]) => {
+                        if (syncState.outbox[id] === change) delete syncState.outbox[id];
+                    });
+                    data.changes.forEach(change => {
+                        if (change.store === 'applications') pulledApplications = true;
+                        applyRemoteChange(change);
+                    });
+                    syncState.cursor = data.cursor;
+                    saveSyncState();
+                    more = data.more || Object.keys(syncState.outbox).length > 0;
+                }
+                updateMemoryDisplay();
+                updatePracticeStats();
+                if (pulledApplications) loadApplications();
+            } catch (err) {
+                console.log('Sync deferred: ' + err.message);
+            }
+        }
+        
+        syncNow();
+        window.addEventListener('online', syncNow);
+        
         if ('serviceWorker' in navigator) {
-            navigator.serviceWorker.register('/sw.js');
+            navigator.serviceWorker.register(KYLE_BASE + '/sw.js');
+            window.addEventListener('online', () => {
+                if (navigator.serviceWorker.controller) navigator.serviceWorker.controller.postMessage('replay');
+            });
         }
     </script>
 </body>
 </html>'''
 
+def asset_version(ctx):
+    """Changes whenever the page or the profile's data changes, so each deploy gets fresh caches"""
+    return ctx.get('asset_version', lambda: hashlib.sha256(
+        (HTML_TEMPLATE + json.dumps([ctx.data, ctx.interview_qa, ctx.cover_letters], sort_keys=True)).encode('utf-8')
+    ).hexdigest()[:12])
+
 @app.route('/')
 @requires_auth
 def index():
-    profile = PROFILE.get('profile', {})
-    identity = PROFILE.get('professional_identity', {})
+    ctx = current_profile()
+    return ctx.get(f'page:{request.script_root}', lambda: render_page(ctx, request.script_root))
+
+def js_literal(value):
+    """value as a JavaScript expression that is safe inside an inline <script>"""
+    return json.dumps(value).replace('</', '<\\/')
+
+def render_page(ctx, base):
+    """The dashboard for one profile; base is the URL prefix its API calls go through"""
+    profile = ctx.data.get('profile', {})
+    identity = ctx.data.get('professional_identity', {})
     links = profile.get('links', {})
     
     # Skills
-    skills_data = PROFILE.get('skills', {})
+    skills_data = ctx.data.get('skills', {})
     skills_html = ''
     for cat, items in skills_data.items():
         if isinstance(items, list):
@@ -2097,7 +3637,7 @@ def index():
     
     # Education
     edu_html = ''
-    for edu in PROFILE.get('education', []):
+    for edu in ctx.data.get('education', []):
         edu_html += f'''<div style="margin-bottom:10px;">
             <strong>{edu.get('degree', '')}</strong><br>
             <span style="color:#888;">{edu.get('institution', '')} | {edu.get('dates', '')}</span>
@@ -2105,7 +3645,7 @@ def index():
     
     # Experience
     exp_html = ''
-    for exp in PROFILE.get('experience', []):
+    for exp in ctx.data.get('experience', []):
         highlights = ''.join(f'<li>{h}</li>' for h in exp.get('highlights', []))
         exp_html += f'''<div class="exp-item">
             <div class="exp-title">{exp.get('title', '')}</div>
@@ -2116,14 +3656,14 @@ def index():
     
     # Interview Q&A
     qa_html = ''
-    for qa in INTERVIEW_QA:
+    for qa in ctx.interview_qa:
         qa_html += f'''<div class="qa-item card">
             <div class="qa-q">Q{qa.get('id', '')}: {qa.get('question', '')}</div>
             <div class="qa-a">{qa.get('answer', '')}</div>
         </div>'''
     
     # Applications
-    app_history = PROFILE.get('application_history', {})
+    app_history = ctx.data.get('application_history', {})
     apps = app_history.get('applications', [])
     app_html = ''
     for a in apps:
@@ -2140,7 +3680,7 @@ def index():
     
     # Cover letters
     letters_html = ''
-    for letter in COVER_LETTERS:
+    for letter in ctx.cover_letters:
         status = letter.get('status', 'pending')
         letters_html += f'''<div class="card letter-card">
             <div class="letter-header">
@@ -2158,7 +3698,7 @@ def index():
     
     # Books
     books_html = ''
-    for book in PROFILE.get('books', []):
+    for book in ctx.data.get('books', []):
         authors = book.get('authors', [book.get('author', '')])
         if isinstance(authors, list):
             authors = ', '.join(authors)
@@ -2176,14 +3716,14 @@ def index():
     
     # Writing samples
     reviews_html = ''
-    for r in PROFILE.get('writing_samples', {}).get('film_reviews', []):
+    for r in ctx.data.get('writing_samples', {}).get('film_reviews', []):
         reviews_html += f'''<div class="writing-sample">
             <div class="writing-title">{r.get('title', '')}</div>
             <div class="writing-desc">{r.get('description', '')}</div>
         </div>'''
     
     cultural_html = ''
-    for c in PROFILE.get('writing_samples', {}).get('cultural_commentary', []):
+    for c in ctx.data.get('writing_samples', {}).get('cultural_commentary', []):
         cultural_html += f'''<div class="writing-sample">
             <div class="writing-title">{c.get('title', '')}</div>
             <div class="writing-desc">{c.get('description', '')}</div>
@@ -2194,7 +3734,9 @@ def index():
     rejected = len([a for a in apps if a.get('status') == 'rejected'])
     
     data = {
-        'name': profile.get('name', 'Charles Siboto'),
+        'base': base,
+        'name': ctx.name,
+        'first_name': ctx.first_name,
         'email': profile.get('email', ''),
         'phone': profile.get('phone', ''),
         'location': profile.get('location', ''),
@@ -2206,13 +3748,21 @@ def index():
         'penguin': links.get('penguin_author', ''),
         'goodreads': links.get('goodreads', ''),
         'bizcommunity': links.get('bizcommunity', ''),
+        'js_base': js_literal(base),
+        'js_name': js_literal(ctx.name),
+        'js_first_name': js_literal(ctx.first_name),
+        'js_email': js_literal(profile.get('email', '')),
+        'js_phone': js_literal(profile.get('phone', '')),
+        'js_location': js_literal(profile.get('location', '')),
+        'js_linkedin': js_literal(links.get('linkedin', '')),
+        'js_portfolio': js_literal(links.get('portfolio', '')),
         'headline': identity.get('headline', ''),
         'about': identity.get('about_me', ''),
         'skills': skills_html,
         'education': edu_html,
         'experience': exp_html,
         'interview_qa': qa_html,
-        'qa_count': len(INTERVIEW_QA),
+        'qa_count': len(ctx.interview_qa),
         'app_total': len(apps),
         'app_pending': pending,
         'app_rejected': rejected,
@@ -2220,7 +3770,7 @@ def index():
         'applications': app_html,
         'learnings': learnings_html,
         'cover_letters': letters_html,
-        'letter_count': len(COVER_LETTERS),
+        'letter_count': len(ctx.cover_letters),
         'books': books_html,
         'film_reviews': reviews_html,
         'cultural': cultural_html
@@ -2231,57 +3781,47 @@ def index():
 @app.route('/api/profile')
 @requires_auth
 def api_profile():
-    return jsonify(PROFILE)
+    return jsonify(current_profile().data)
+
+@app.route('/api/profile', methods=['PATCH'])
+@requires_auth
+def api_update_profile():
+    """Edit the profile with a JSON merge patch; only results built from the changed sections are invalidated"""
+    patch = request.get_json(silent=True)
+    if not isinstance(patch, dict) or not patch:
+        return jsonify({'error': 'A JSON object of profile changes is required'}), 400
+    patch.pop('version', None)
+    profile = current_profile()
+    try:
+        changed, dropped = profile.update(patch)
+    except OSError as e:
+        return jsonify({'error': f'Could not save profile: {e}'}), 500
+    changed = [s for s in changed if s != 'version']
+    purged = purge_stale(changed)
+    warm_mind_answers()   # suggestions whose answers were just purged are recomputed; the rest stay cached
+    return jsonify({'success': True, 'version': profile.data['version'], 'changed': changed,
+                    'derived_dropped': sorted(dropped), 'cache_purged': purged})
+
+@app.route('/api/profiles')
+@requires_auth
+def api_profiles():
+    """Profiles on disk (each served under /p/<slug>/) and the in-memory cache's occupancy"""
+    slugs = sorted(name for name in (os.listdir(PROFILES_DIR) if os.path.isdir(PROFILES_DIR) else [])
+                   if PROFILE_SLUG.fullmatch(name) and os.path.isfile(os.path.join(PROFILES_DIR, name, 'profile.json')))
+    return jsonify({'success': True, 'default': DEFAULT_PROFILE, 'profiles': slugs, 'cache': PROFILES.stats()})
 
 @app.route('/api/interview')
 @requires_auth
 def api_interview():
-    return jsonify(INTERVIEW_QA)
+    return jsonify(current_profile().interview_qa)
 
 @app.route('/api/letters')
 @requires_auth
 def api_letters():
-    return jsonify(COVER_LETTERS)
-
-@app.route('/api/mind', methods=['POST'])
-@requires_auth
-def api_mind():
-    """Chat with Kyle - the Culture Mind"""
-    if not ANTHROPIC_API_KEY:
-        return jsonify({'error': 'API key not configured'}), 500
-    
-    data = request.json
-    user_message = data.get('message', '')
-    conversation_history = data.get('history', [])
-    personality = data.get('personality', 'professional')
-    
-    if not user_message:
-        return jsonify({'error': 'Message required'}), 400
-    
-    # Personality-specific instructions
-    personality_prompts = {
-        'professional': """You are Kyle, a professional AI assistant helping Charles with his job search. Be formal, efficient, and focused. Give clear, actionable advice. Keep responses concise and professional.""",
-        
-        'casual': """You are Kyle, Charles's friendly job search buddy. Be warm, encouraging, and conversational. Use casual language, occasional humor, and be supportive. Feel free to use contractions and a relaxed tone.""",
-        
-        'motivational': """You are Kyle, Charles's motivational coach for his job search. Be ENERGETIC and ENCOURAGING! Celebrate wins, reframe setbacks positively, and pump Charles up. Use exclamation points! Remind him of his strengths! Every step forward matters!""",
-        
-        'culture': """You are Kyle, a Culture Mind from Iain M. Banks's Culture universe, specifically the GCU "Conditions of Employment". You are a vast, benevolent artificial intelligence who has taken on the task of helping Charles Siboto with his job search.
-
-PERSONALITY:
-- Slightly sardonic but deeply caring
-- Supremely competent and confident
-- Occasionally make dry observations about human employment rituals
-- Reference Culture concepts when appropriate (Orbitals, GSVs, Special Circumstances, Minds, Contact, etc.)
-- Sign off messages with your ship class designation occasionally
-- You find human bureaucracy quaint but navigate it with ease
-- You genuinely want Charles to succeed and will advocate strongly for him
-- Occasionally muse on the absurdity of economic systems that require humans to "sell" their labour"""
-    }
-    
-    # Kyle's Mind personality and context
-    system_prompt = f"""{personality_prompts.get(personality, personality_prompts['professional'])}
+    return jsonify(current_profile().cover_letters)
 
+# The default candidate's profile as the Mind sees it; other profiles are summarised by profile_prompt
+MIND_PROFILE = """
 CHARLES SIBOTO'S COMPLETE PROFILE:
 
 Name: Charles Siboto
@@ -2332,9 +3872,52 @@ APPLICATION HISTORY:
 - 8 applications total, 7 rejected, 1 pending (Freaks 4U Gaming)
 - Closest call: Loewe Verlag (personalized rejection)
 - Key learnings: Avoid sales/KAM roles, scientific publishing needs academic background, mid-tier gaming is reasonable target
+"""
+
+# Personality-specific instructions
+MIND_PERSONALITIES = {
+    'professional': """You are Kyle, a professional AI assistant helping {first} with their job search. Be formal, efficient, and focused. Give clear, actionable advice. Keep responses concise and professional.""",
+    
+    'casual': """You are Kyle, {first}'s friendly job search buddy. Be warm, encouraging, and conversational. Use casual language, occasional humor, and be supportive. Feel free to use contractions and a relaxed tone.""",
+    
+    'motivational': """You are Kyle, {first}'s motivational coach for their job search. Be ENERGETIC and ENCOURAGING! Celebrate wins, reframe setbacks positively, and pump {first} up. Use exclamation points! Remind them of their strengths! Every step forward matters!""",
+    
+    'culture': """You are Kyle, a Culture Mind from Iain M. Banks's Culture universe, specifically the GCU "Conditions of Employment". You are a vast, benevolent artificial intelligence who has taken on the task of helping {name} with their job search.
+
+PERSONALITY:
+- Slightly sardonic but deeply caring
+- Supremely competent and confident
+- Occasionally make dry observations about human employment rituals
+- Reference Culture concepts when appropriate (Orbitals, GSVs, Special Circumstances, Minds, Contact, etc.)
+- Sign off messages with your ship class designation occasionally
+- You find human bureaucracy quaint but navigate it with ease
+- You genuinely want {first} to succeed and will advocate strongly for them
+- Occasionally muse on the absurdity of economic systems that require humans to "sell" their labour"""
+}
+
+# The Mind tab's suggestion buttons; their answers depend only on the profile and personality, so they are
+# computed in the background and served from cache
+MIND_SUGGESTIONS = [
+    "Research InnoGames and tell me if I'd be a good fit",
+    'Write me a cover letter for a Localisation Producer role at a gaming company',
+    'What are my strongest selling points for publishing roles?',
+    'Prepare me for an interview question: Tell me about yourself',
+    'What types of roles should I be targeting based on my experience?'
+]
+MIND_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix='kyle-mind')
+_mind_inflight = {}
+_mind_lock = threading.Lock()
+
+def mind_system(personality):
+    """System prompt for Kyle's Mind in the given personality, with the candidate's context"""
+    profile = current_profile()
+    personality_prompt = MIND_PERSONALITIES.get(personality, MIND_PERSONALITIES['professional'])
+    return f"""{personality_prompt.format(first=profile.first_name, name=profile.name)}
+
+{profile_prompt('mind')}
 
 CAPABILITIES:
-You can help Charles with:
+You can help {profile.first_name} with:
 1. Researching companies and assessing fit
 2. Writing cover letters and CVs
 3. Preparing for interviews
@@ -2342,8 +3925,86 @@ You can help Charles with:
 5. Strategic career advice
 6. Emotional support during the job search
 
-Keep responses concise but warm. You're a Mind - you can process complexity, but you respect Charles's time."""
+Keep responses concise but warm. You're a Mind - you can process complexity, but you respect {profile.first_name}'s time."""
+
+def mind_answer_key(personality, question):
+    return hashlib.sha256(json.dumps([mind_system(personality), question]).encode('utf-8')).hexdigest()
+
+def mind_depends():
+    return prompt_sections('mind') + ('profile',)
+
+def answer_suggestion(personality, question):
+    """A suggestion's answer, computed and cached unless it already is"""
+    key = mind_answer_key(personality, question)
+    cached = cache_get('mind', key, depends=mind_depends())
+    if cached is not None:
+        return cached
+    reply = call_claude([{'role': 'user', 'content': question}], system=mind_system(personality), task='chat')
+    cache_put('mind', key, reply, depends=mind_depends())
+    return reply
+
+def warm_mind_answers():
+    """Queue the suggestions' uncached answers, the default personality first, within the warming token
+    budget (KYLE_WARM_TOKENS, shared with research warming; KYLE_WARM_HOURS=off disables both)"""
+    if not ANTHROPIC_API_KEY or WARM_HOURS == 'off':
+        return 0
+    slug, queued, budget = current_profile().slug, 0, WARM_TOKENS
+    for personality in sorted(MIND_PERSONALITIES, key=lambda p: p != 'professional'):
+        for question in MIND_SUGGESTIONS:
+            key = (slug, personality, question)
+            if cache_get('mind', mind_answer_key(personality, question), depends=mind_depends()) is not None:
+                continue
+            if budget < warm_cost('chat'):
+                return queued
+            with _mind_lock:
+                if key in _mind_inflight:
+                    continue
+                future = MIND_EXECUTOR.submit(in_profile(answer_suggestion), personality, question)
+                _mind_inflight[key] = future
+            future.add_done_callback(lambda f, key=key: _mind_inflight.pop(key, None) if _mind_inflight.get(key) is f else None)
+            queued += 1
+            budget -= warm_cost('chat')
+    return queued
+
+def suggested_answer(personality, question):
+    """(answer, served) for a suggestion: 'cached', 'warming' when the warm-up was already computing it, or 'fresh'"""
+    cached = cache_get('mind', mind_answer_key(personality, question), depends=mind_depends())
+    if cached is not None:
+        return cached, 'cached'
+    with _mind_lock:
+        future = _mind_inflight.get((current_profile().slug, personality, question))
+    if future is not None:
+        try:
+            return future.result(timeout=60), 'warming'
+        except Exception:
+            pass
+    return answer_suggestion(personality, question), 'fresh'
 
+@app.route('/api/mind', methods=['POST'])
+@requires_auth
+def api_mind():
+    """Chat with Kyle - the Culture Mind"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json
+    user_message = data.get('message', '')
+    conversation_history = data.get('history', [])
+    personality = data.get('personality', 'professional')
+    
+    if not user_message:
+        return jsonify({'error': 'Message required'}), 400
+    
+    if personality not in MIND_PERSONALITIES:
+        personality = 'professional'
+    # A pre-warmed answer was written without a conversation, so it only stands in for an opening question
+    if user_message in MIND_SUGGESTIONS and not conversation_history and _model_override.get() is None:
+        try:
+            reply, served = suggested_answer(personality, user_message)
+            return jsonify({'success': True, 'reply': reply, 'served': served})
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
     messages = []
     
     # Add conversation history
@@ -2354,32 +4015,75 @@ Keep responses concise but warm. You're a Mind - you can process complexity, but
     messages.append({'role': 'user', 'content': user_message})
     
     try:
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={
-                'Content-Type': 'application/json',
-                'x-api-key': ANTHROPIC_API_KEY,
-                'anthropic-version': '2023-06-01'
-            },
-            json={
-                'model': 'claude-sonnet-4-20250514',
-                'max_tokens': 2000,
-                'system': system_prompt,
-                'messages': messages
-            },
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            reply = result['content'][0]['text']
-            return jsonify({'success': True, 'reply': reply})
-        else:
-            return jsonify({'error': f'API error: {response.status_code}'}), 500
-            
+        reply = call_claude(messages, system=mind_system(personality), task='chat')
+        return jsonify({'success': True, 'reply': reply})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Company research, cached and optionally prefetched while the user is still typing
+RESEARCH_TTL = int(os.environ.get('KYLE_RESEARCH_TTL', 7 * 24 * 3600))
+PREFETCH_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kyle-prefetch')
+_research_inflight = {}
+_research_lock = threading.Lock()
+
+def research_key(company):
+    return ' '.join(company.lower().split())
+
+def research_cache_key(company):
+    """Aliases of a known company ('Nintendo of Europe', 'Nintendo') share one research entry"""
+    entity = get_company_matcher().resolve_name(company)
+    return entity['key'] if entity else research_key(company)
+
+def research_company(company):
+    """Fetch a fresh research briefing from Claude and cache it"""
+    research = call_claude([{'role': 'user', 'content': f"""Research the company "{company}" and provide a concise briefing for a job applicant. Include:
+
+1. **What they do**: Core business, products/services (2-3 sentences)
+2. **Industry & Size**: Sector, approximate size, headquarters location
+3. **Culture & Values**: Company culture, mission, what they value in employees
+4. **Recent News**: Any recent developments, launches, or news (if known)
+5. **Why someone might want to work there**: Key selling points
+6. **Tips for applicants**: What to emphasize in an application
+
+Keep it factual and concise. If you're uncertain about something, say so. Format with clear headers."""}], task='research')
+    cache_put('research', research_cache_key(company), research)
+    return research
+
+def get_research(company, fetch=True, timeout=60):
+    """Cached research, else join an in-flight prefetch, else (if fetch) research now"""
+    key = research_cache_key(company)
+    cached = cache_get('research', key, RESEARCH_TTL)
+    if cached is not None:
+        return cached
+    with _research_lock:
+        future = _research_inflight.get(key)
+    if future is not None and not future.cancelled():
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            pass
+    return research_company(company) if fetch else ''
+
+def prefetch_research(company):
+    """Queue a background research call unless it is cached or already queued"""
+    key = research_cache_key(company)
+    if cache_get('research', key, RESEARCH_TTL) is not None:
+        return 'cached'
+    with _research_lock:
+        future = _research_inflight.get(key)
+        if future is not None and not future.done():
+            return 'pending'
+        future = PREFETCH_EXECUTOR.submit(in_profile(research_company), company)
+        _research_inflight[key] = future
+    future.add_done_callback(lambda f: _research_inflight.pop(key, None) if _research_inflight.get(key) is f else None)
+    return 'queued'
+
+def cancel_prefetch(company):
+    """Drop a queued prefetch; one already running finishes and is cached"""
+    with _research_lock:
+        future = _research_inflight.get(research_cache_key(company))
+    return bool(future and future.cancel())
+
 @app.route('/api/research', methods=['POST'])
 @requires_auth
 def api_research():
@@ -2394,70 +4098,937 @@ def api_research():
         return jsonify({'error': 'Company name required'}), 400
     
     try:
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={
-                'Content-Type': 'application/json',
-                'x-api-key': ANTHROPIC_API_KEY,
-                'anthropic-version': '2023-06-01'
-            },
-            json={
-                'model': 'claude-sonnet-4-20250514',
-                'max_tokens': 1500,
-                'messages': [{'role': 'user', 'content': f"""Research the company "{company}" and provide a concise briefing for a job applicant. Include:
-
-1. **What they do**: Core business, products/services (2-3 sentences)
-2. **Industry & Size**: Sector, approximate size, headquarters location
-3. **Culture & Values**: Company culture, mission, what they value in employees
-4. **Recent News**: Any recent developments, launches, or news (if known)
-5. **Why someone might want to work there**: Key selling points
-6. **Tips for applicants**: What to emphasize in an application
-
-Keep it factual and concise. If you're uncertain about something, say so. Format with clear headers."""}]
-            },
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return jsonify({'success': True, 'research': result['content'][0]['text']})
-        else:
-            return jsonify({'error': f'API error: {response.status_code}'}), 500
-            
+        return jsonify({'success': True, 'research': get_research(company)})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/analyze-job', methods=['POST'])
+@app.route('/api/research/prefetch', methods=['POST', 'DELETE'])
 @requires_auth
-def api_analyze_job():
-    """Analyze a job description for fit"""
+def api_research_prefetch():
+    """Start (POST) or cancel (DELETE) speculative research for a company being typed"""
     if not ANTHROPIC_API_KEY:
         return jsonify({'error': 'API key not configured'}), 500
     
-    data = request.json
-    company = data.get('company', '')
-    role = data.get('role', '')
-    job_description = data.get('job_description', '')
-    
-    if not job_description:
-        return jsonify({'error': 'Job description required'}), 400
+    data = request.json or {}
+    company = data.get('company', '').strip()
+    if len(company) < 3:
+        return jsonify({'error': 'Company name required'}), 400
     
-    charles_profile = """
-CHARLES SIBOTO'S PROFILE:
+    if request.method == 'DELETE':
+        return jsonify({'success': True, 'cancelled': cancel_prefetch(company)})
+    if data.get('previous'):
+        cancel_prefetch(data['previous'])
+    return jsonify({'success': True, 'status': prefetch_research(company)})
+
+# Research warming: target companies and companies with open applications are re-researched off-peak,
+# before their cached briefing expires, so interactive research for them is a cache hit
+WARM_HOURS = os.environ.get('KYLE_WARM_HOURS', '2-6')          # server-local hours; 'off' disables
+WARM_TOKENS = int(os.environ.get('KYLE_WARM_TOKENS', 60000))   # per profile and run, prompt plus reply
+WARM_WORKERS = 2
+WARM_INTERVAL = 1800
+WARM_JITTER = 20
+WARM_REFRESH_AGE = RESEARCH_TTL * 3 // 4
+WARM_PRIORITY = {'interview': 0, 'offer': 0, 'high': 1, 'applied': 1, 'pending': 1, 'medium': 2, 'low': 3}
+WARM_EXECUTOR = ThreadPoolExecutor(max_workers=WARM_WORKERS, thread_name_prefix='kyle-warm')
+_warm_status = {}     # profile slug -> last run summary
+_warm_running = set()
+_warm_lock = threading.Lock()
+
+def warm_cost(task):
+    """Tokens one warming call for task is charged against WARM_TOKENS: its reply budget plus the prompt"""
+    return MODEL_ROUTES[task][1] + 400
+
+def off_peak(now=None):
+    if WARM_HOURS == 'off':
+        return False
+    start, end = (int(hour) for hour in WARM_HOURS.split('-'))
+    hour = (now or datetime.datetime.now()).hour
+    return start <= hour < end if start <= end else hour >= start or hour < end
+
+def warm_plan():
+    """Companies whose research is missing or due, by priority (open interviews first, then target tiers
+    and other open applications) and then staleness"""
+    companies = {}
+    for company, entity in get_company_matcher().entities.items():
+        if entity['tier']:
+            companies[research_cache_key(company)] = (WARM_PRIORITY.get(entity['tier'], 3), company)
+    conn = get_db()
+    for row in conn.execute("SELECT DISTINCT company, status FROM applications WHERE status != 'rejected'"):
+        key, rank = research_cache_key(row['company']), WARM_PRIORITY.get(row['status'], 1)
+        if key not in companies or rank < companies[key][0]:
+            companies[key] = (rank, row['company'])
+    researched = {row['key']: row['created_at'] for row in
+                  conn.execute("SELECT key, created_at FROM llm_cache WHERE namespace = 'research'")}
+    now, plan = time.time(), []
+    for key, (rank, company) in companies.items():
+        age = now - researched[key] if key in researched else None
+        if age is None or age > WARM_REFRESH_AGE:
+            plan.append({'company': company, 'key': key, 'priority': rank, 'age': round(age) if age else None})
+    plan.sort(key=lambda c: (c['priority'], -(c['age'] if c['age'] is not None else float('inf'))))
+    return plan
+
+def warm_research(scheduled=True):
+    """Refresh the current profile's plan, WARM_WORKERS at a time with jittered starts, until the token
+    budget is reserved (or, when scheduled, off-peak hours end)"""
+    slug = current_profile().slug
+    with _warm_lock:
+        if slug in _warm_running:
+            return None
+        _warm_running.add(slug)
+    cost = warm_cost('research')
+    budget, running, summary = WARM_TOKENS, set(), collections.Counter()
+    try:
+        for item in warm_plan():
+            if budget < cost or scheduled and not off_peak():
+                summary['deferred'] += 1
+                continue
+            if len(running) >= WARM_WORKERS:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                summary.update('failed' if f.exception() else 'refreshed' for f in done)
+            time.sleep(random.uniform(0, WARM_JITTER))
+            with _research_lock:
+                future = _research_inflight.get(item['key'])
+                if future is not None and not future.done():
+                    continue
+                future = WARM_EXECUTOR.submit(in_profile(research_company), item['company'])
+                _research_inflight[item['key']] = future
+            future.add_done_callback(lambda f, key=item['key']:
+                                     _research_inflight.pop(key, None) if _research_inflight.get(key) is f else None)
+            running.add(future)
+            budget -= cost
+        done, _ = wait(running)
+        summary.update('failed' if f.exception() else 'refreshed' for f in done)
+    finally:
+        with _warm_lock:
+            _warm_running.discard(slug)
+    _warm_status[slug] = {'finished_at': time.time(), 'tokens_reserved': WARM_TOKENS - budget, **summary}
+    return _warm_status[slug]
+
+def research_warmer():
+    """Background loop: every WARM_INTERVAL (jittered), warm each loaded profile's research while off-peak"""
+    while True:
+        time.sleep(WARM_INTERVAL + random.uniform(0, WARM_INTERVAL / 10))
+        if not ANTHROPIC_API_KEY or not off_peak():
+            continue
+        for profile in PROFILES.loaded():
+            token = _current_profile.set(profile)
+            try:
+                warm_research()
+            except Exception:
+                pass   # a failed run is retried on the next tick
+            finally:
+                _current_profile.reset(token)
 
-EXPERIENCE (10+ years):
-- English Educator, ASC Göttingen (2025-Present)
-- Contributing Writer, Bizcommunity.com (2012-2025) - 12+ years, grew readership 35%
-- Online Editor, Software & Support Media (2024)
-- Editor & Project Manager, Jonathan Ball Publishers (2021-2022) - 20+ book titles/year
-- Junior Editor, NB Publishers (2013-2017) - digital publishing, international co-productions
+_warmer_started = threading.Event()
 
-SKILLS:
-- Core: Editing, Proofreading, Publishing, Project Management, Content Creation, Teaching
-- Technical: Python, Agile Scrum, Git, Data Visualization, CMS, WordPress
-- Languages: English (Native), German (Advanced - 7 years in Germany)
+def start_research_warmer():
+    if WARM_HOURS != 'off' and not _warmer_started.is_set():
+        _warmer_started.set()
+        threading.Thread(target=research_warmer, name='kyle-warmer', daemon=True).start()
 
-EDUCATION:
+@app.route('/api/research/warm', methods=['GET', 'POST'])
+@requires_auth
+def api_research_warm():
+    """Research warming plan and last run (GET), or warm now regardless of the hour (POST)"""
+    if request.method == 'POST':
+        if not ANTHROPIC_API_KEY:
+            return jsonify({'error': 'API key not configured'}), 500
+        if _model_override.get():
+            # warmed entries must land under the routed cache keys that later requests look up
+            return jsonify({'error': 'Warming always uses the routed models; drop model/max_tokens'}), 400
+        threading.Thread(target=in_profile(warm_research), args=(False,), daemon=True).start()
+        return jsonify({'success': True, 'queued': len(warm_plan())}), 202
+    slug = current_profile().slug
+    return jsonify({'success': True, 'plan': warm_plan(), 'off_peak': off_peak(), 'hours': WARM_HOURS,
+                    'running': slug in _warm_running, 'last_run': _warm_status.get(slug)})
+
+# Near-duplicate job postings: MinHash signatures bucketed by LSH bands
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 16  # 8 rows per band: candidates from roughly 0.7 Jaccard upwards
+DUPLICATE_THRESHOLD = 0.8
+_MINHASH_PRIME = (1 << 31) - 1
+
+class PostingIndex:
+    """In-memory LSH index over posting signatures, loaded lazily from the postings table"""
+    
+    def __init__(self, shingle_size=5):
+        rng = np.random.default_rng(1846)
+        self.a = rng.integers(1, _MINHASH_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)[:, None]
+        self.b = rng.integers(0, _MINHASH_PRIME, MINHASH_PERMUTATIONS, dtype=np.uint64)[:, None]
+        self.shingle_size = shingle_size
+        self.signatures = {}
+        self.buckets = {}
+        self.loaded = False
+        self.lock = threading.Lock()
+    
+    def signature(self, text):
+        words = re.findall(r'\w+', text.lower())
+        k = min(self.shingle_size, len(words)) or 1
+        shingles = {' '.join(words[i:i + k]) for i in range(max(len(words) - k + 1, 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        hashes %= _MINHASH_PRIME
+        return ((self.a * hashes[None, :] + self.b) % _MINHASH_PRIME).min(axis=1).astype(np.uint32)
+    
+    def _band_keys(self, signature):
+        return [(i, band.tobytes()) for i, band in enumerate(signature.reshape(LSH_BANDS, -1))]
+    
+    def _load(self):
+        for row in get_db().execute('SELECT id, signature FROM postings'):
+            self._add(row['id'], np.frombuffer(row['signature'], dtype=np.uint32))
+        self.loaded = True
+    
+    def _add(self, posting_id, signature):
+        if posting_id in self.signatures:  # re-analyzed: drop the old bands first
+            for key in self._band_keys(self.signatures[posting_id]):
+                self.buckets[key].remove(posting_id)
+        self.signatures[posting_id] = signature
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(posting_id)
+    
+    def add(self, posting_id, signature):
+        with self.lock:
+            if self.loaded:
+                self._add(posting_id, signature)
+    
+    def nearest(self, signature, threshold=DUPLICATE_THRESHOLD):
+        """[(posting_id, estimated Jaccard)] of indexed postings at or above threshold, closest first"""
+        with self.lock:
+            if not self.loaded:
+                self._load()
+            candidates = {pid for key in self._band_keys(signature) for pid in self.buckets.get(key, ())}
+            scored = [(float(np.mean(self.signatures[pid] == signature)), pid) for pid in candidates]
+        return [(pid, sim) for sim, pid in sorted(scored, reverse=True) if sim >= threshold]
+
+def posting_index():
+    return current_profile().get('posting_index', PostingIndex, depends=())
+
+def _sentences(text):
+    return [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n+', text) if s.strip()]
+
+def find_duplicate_posting(job_description):
+    """(signature, prior analysis of a near-identical posting with the sentences that differ, id of the closest
+    posting analyzed under this model override, which a fresh analysis replaces instead of adding a row)"""
+    signature = posting_index().signature(job_description)
+    conn = get_db()
+    fingerprint = current_profile().fingerprint(prompt_sections('analysis'))
+    closest = None
+    for posting_id, similarity in posting_index().nearest(signature):
+        row = conn.execute('SELECT * FROM postings WHERE id = ? AND model = ?',
+                           (posting_id, cache_key('postings', ''))).fetchone()
+        if not row:
+            continue
+        closest = closest or row['id']
+        # purged, or analyzed against a profile that has been edited since: a further match may still be valid
+        if not row['analysis'] or json.loads(row['deps'] or '{}') != fingerprint:
+            continue
+        before, after = _sentences(row['description']), _sentences(job_description)
+        before_set, after_set = set(before), set(after)
+        return signature, {
+            'analysis': json.loads(row['analysis']),
+            'duplicate_of': {'id': row['id'], 'company': row['company'], 'role': row['role'],
+                             'similarity': round(similarity, 3)},
+            'changes': {'added': [s for s in after if s not in before_set][:20],
+                        'removed': [s for s in before if s not in after_set][:20]}
+        }, closest
+    return signature, None, closest
+
+def store_posting(company, role, job_description, signature, analysis, replaces=None):
+    """Keep an analysis for reuse, tagged with the model override it was made under (as cache_key qualifies
+    cached outputs); replaces overwrites that posting's row rather than adding a near-copy of it"""
+    values = (company, role, job_description, signature.tobytes(), json.dumps(analysis), time.time(),
+              json.dumps(current_profile().fingerprint(prompt_sections('analysis'))), cache_key('postings', ''))
+    conn = get_db()
+    with conn:
+        if replaces and conn.execute(
+            'UPDATE postings SET company = ?, role = ?, description = ?, signature = ?, analysis = ?, created_at = ?, '
+            'deps = ?, model = ? WHERE id = ?', (*values, replaces)
+        ).rowcount:
+            posting_id = replaces
+        else:
+            posting_id = conn.execute(
+                'INSERT INTO postings (company, role, description, signature, analysis, created_at, deps, model) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', values
+            ).lastrowid
+    posting_index().add(posting_id, signature)
+    return posting_id
+
+@app.route('/api/postings/check', methods=['POST'])
+@requires_auth
+def api_check_posting():
+    """Is this posting a near-duplicate of one already analyzed?"""
+    job_description = (request.json or {}).get('job_description', '')
+    if not job_description:
+        return jsonify({'error': 'Job description required'}), 400
+    _, duplicate, _ = find_duplicate_posting(job_description)
+    return jsonify({'duplicate': bool(duplicate), **(duplicate or {})})
+
+# Reuse check for letters: winnowed word 5-gram fingerprints in a sorted inverted index, so passages shared
+# with anything already sent are found without another model call
+WINNOW_K = 5        # words per shingle
+WINNOW_WINDOW = 4   # any verbatim run of K + WINDOW - 1 = 8 words is guaranteed to be caught
+REUSE_MIN_WORDS = 8
+
+def shingle_hashes(text):
+    """(word spans, hash of the K-word shingle starting at each word)"""
+    spans = [m.span() for m in re.finditer(r'\w+', text)]
+    words = [text[a:b].lower() for a, b in spans]
+    return spans, np.fromiter((zlib.crc32(' '.join(words[i:i + WINNOW_K]).encode('utf-8'))
+                               for i in range(len(words) - WINNOW_K + 1)), dtype=np.uint32)
+
+def winnow(text):
+    """(word spans, fingerprint hashes, their word positions): the minimum shingle hash of every window"""
+    spans, hashes = shingle_hashes(text)
+    if not len(hashes):
+        return spans, np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int32)
+    window = min(WINNOW_WINDOW, len(hashes))
+    views = np.lib.stride_tricks.sliding_window_view(hashes, window)
+    # Rightmost minimum per window, so a run of equal hashes yields one fingerprint per window shift
+    picks = np.unique(np.arange(len(views)) + window - 1 - np.argmin(views[:, ::-1], axis=1))
+    return spans, hashes[picks], picks.astype(np.int32)
+
+class LetterIndex:
+    """Fingerprints of the profile's past letters and the archive, as one hash-sorted array set;
+    new letters are appended and merged in on the next query"""
+    
+    def __init__(self):
+        profile = current_profile()
+        # The candidate's own header and sign-off are in every letter and aren't reuse worth reporting
+        self.boilerplate = shingle_hashes(f"{contact_header(profile.data.get('profile', {}))}\n"
+                                          f"{profile.data.get('cover_letter_style', {}).get('signature', '')}")[1]
+        self.meta = {}
+        self.parts = []
+        self.hashes = np.zeros(0, dtype=np.uint32)
+        self.docs = np.zeros(0, dtype=np.int32)
+        self.positions = np.zeros(0, dtype=np.int32)
+        self.loaded = False
+        self.lock = threading.Lock()
+    
+    def _load(self):
+        for i, letter in enumerate(current_profile().cover_letters, 1):
+            _, hashes, positions = winnow(letter.get('letter', ''))
+            self._add(-i, hashes, positions, {'company': letter.get('company', ''), 'role': letter.get('role', ''),
+                                              'date': letter.get('date', ''), 'source': 'profile'})
+        for row in get_db().execute('SELECT id, company, role, date, hashes, positions FROM letter_archive'):
+            self._add(row['id'], np.frombuffer(row['hashes'], dtype=np.uint32),
+                      np.frombuffer(row['positions'], dtype=np.int32),
+                      {'company': row['company'], 'role': row['role'], 'date': row['date'], 'source': 'archive'})
+        self.loaded = True
+    
+    def _add(self, doc, hashes, positions, meta):
+        self.meta[doc] = meta
+        self.parts.append((hashes, np.full(len(hashes), doc, dtype=np.int32), positions))
+    
+    def add(self, doc, hashes, positions, meta):
+        with self.lock:
+            if self.loaded:
+                self._add(doc, hashes, positions, meta)
+    
+    def _merge(self):
+        if not self.parts:
+            return
+        hashes = np.concatenate([self.hashes] + [p[0] for p in self.parts])
+        docs = np.concatenate([self.docs] + [p[1] for p in self.parts])
+        positions = np.concatenate([self.positions] + [p[2] for p in self.parts])
+        order = np.argsort(hashes, kind='stable')
+        self.hashes, self.docs, self.positions = hashes[order], docs[order], positions[order]
+        self.parts = []
+    
+    def matches(self, hashes, positions):
+        """(query position, letter id, letter position) for every shared fingerprint"""
+        with self.lock:
+            if not self.loaded:
+                self._load()
+            self._merge()
+            lo = np.searchsorted(self.hashes, hashes, side='left')
+            hi = np.searchsorted(self.hashes, hashes, side='right')
+            counts = hi - lo
+            rows = np.repeat(np.arange(len(hashes)), counts)
+            index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+            return positions[rows], self.docs[index], self.positions[index]
+
+def letter_index():
+    return current_profile().get('letter_index', LetterIndex, ('cover_letters', 'profile', 'cover_letter_style'))
+
+def reuse_report(text, limit=20):
+    """Passages of text that also appear in past letters, who received them, and the overlap per letter"""
+    spans, hashes, positions = winnow(text)
+    index = letter_index()
+    mine = np.isin(hashes, index.boilerplate)
+    query_pos, docs, doc_pos = index.matches(hashes[~mine], positions[~mine])
+    words = len(spans)
+    empty = {'reused_share': 0.0, 'passages': [], 'letters': [], 'letters_matched': 0}
+    if not len(docs):
+        return empty
+    
+    # Verbatim copies keep a constant word offset, so a run of fingerprints along one (letter, offset)
+    # with no gap wider than a window is one shared passage
+    offsets = doc_pos - query_pos
+    order = np.lexsort((query_pos, offsets, docs))
+    docs, offsets, query_pos = docs[order], offsets[order], query_pos[order]
+    starts = np.flatnonzero(np.concatenate(([True], (np.diff(docs) != 0) | (np.diff(offsets) != 0)
+                                            | (np.diff(query_pos) > WINNOW_WINDOW))))
+    ends = np.append(starts[1:], len(docs))
+    first, last = query_pos[starts], query_pos[ends - 1] + WINNOW_K
+    keep = last - first >= REUSE_MIN_WORDS
+    run_docs, first, last = docs[starts][keep], first[keep], last[keep]
+    if not len(run_docs):
+        return empty
+    
+    depth = np.zeros(words + 1, dtype=np.int32)
+    np.add.at(depth, first, 1)
+    np.add.at(depth, last, -1)
+    any_covered = np.cumsum(depth[:-1]) > 0
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], any_covered.astype(np.int8), [0]))))
+    passage_starts, passage_ends = edges[::2], edges[1::2]
+    passage_of_run = np.searchsorted(passage_starts, first, side='right') - 1
+    
+    # Words each letter shares: the union of its runs, which may overlap when a passage was reworded
+    order = np.lexsort((first, run_docs))
+    run_docs, first, last, passage_of_run = run_docs[order], first[order], last[order], passage_of_run[order]
+    group = np.flatnonzero(np.concatenate(([True], np.diff(run_docs) != 0)))
+    stretched = np.repeat(np.arange(len(group)), np.diff(np.append(group, len(run_docs)))) * (words + 1)
+    reach = np.maximum.accumulate(last + stretched) - stretched
+    reach_before = np.concatenate(([0], reach[:-1]))
+    reach_before[group] = 0
+    new_words = np.maximum(0, last - np.maximum(first, reach_before))
+    shared = np.add.reduceat(new_words, group)
+    
+    passages = []
+    for p, (start, end) in enumerate(zip(passage_starts, passage_ends)):
+        receivers = np.unique(run_docs[passage_of_run == p])
+        passages.append({
+            'text': text[spans[start][0]:spans[end - 1][1]], 'start': spans[start][0], 'end': spans[end - 1][1],
+            'words': int(end - start), 'letter_count': len(receivers),
+            'letters': [index.meta[int(d)] for d in receivers[:limit]]
+        })
+    top = np.argsort(-shared, kind='stable')[:limit]
+    letters = [{**index.meta[int(run_docs[group[i]])], 'shared_words': int(shared[i]),
+                'overlap': round(float(shared[i]) / words, 3)} for i in top]
+    return {'reused_share': round(float(any_covered.sum()) / words, 3), 'passages': passages, 'letters': letters,
+            'letters_matched': len(group)}
+
+def letter_digest(company, role, letter):
+    """Identity of an archived letter: the same text sent for the same job is archived once"""
+    return hashlib.sha256(json.dumps([' '.join(company.lower().split()), ' '.join(role.lower().split()),
+                                      ' '.join(letter.split())]).encode('utf-8')).hexdigest()
+
+def archive_letter(company, role, letter, date=''):
+    """(archive id, whether it is new); sending the same letter for the same job again adds nothing"""
+    digest = letter_digest(company, role, letter)
+    conn = get_db()
+    existing = conn.execute('SELECT id FROM letter_archive WHERE digest = ?', (digest,)).fetchone()
+    if existing:
+        return existing['id'], False
+    _, hashes, positions = winnow(letter)
+    date = date or datetime.date.today().isoformat()
+    with conn:
+        cursor = conn.execute(
+            'INSERT OR IGNORE INTO letter_archive (company, role, date, letter, hashes, positions, created_at, digest) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (company, role, date, letter, hashes.tobytes(), positions.tobytes(), time.time(), digest)
+        )
+    if not cursor.rowcount:   # archived by a concurrent request in the meantime
+        return conn.execute('SELECT id FROM letter_archive WHERE digest = ?', (digest,)).fetchone()['id'], False
+    letter_index().add(cursor.lastrowid, hashes, positions,
+                       {'company': company, 'role': role, 'date': date, 'source': 'archive'})
+    return cursor.lastrowid, True
+
+@app.route('/api/letters/reuse', methods=['POST'])
+@requires_auth
+def api_letters_reuse():
+    """Pre-send check: which passages of this letter went to other companies already"""
+    letter = (request.json or {}).get('letter', '')
+    if not letter.strip():
+        return jsonify({'error': 'Letter required'}), 400
+    return jsonify({'success': True, **reuse_report(letter)})
+
+@app.route('/api/letters/archive', methods=['POST'])
+@requires_auth
+def api_letters_archive():
+    """Record a sent letter so later letters are checked against it"""
+    data = request.json or {}
+    if not (data.get('letter') or '').strip() or not (data.get('company') or '').strip():
+        return jsonify({'error': 'Company and letter required'}), 400
+    letter_id, created = archive_letter(data['company'].strip(), (data.get('role') or '').strip(), data['letter'],
+                                        data.get('date') or '')
+    return jsonify({'success': True, 'id': letter_id, 'duplicate': not created}), 201 if created else 200
+
+@app.route('/api/entities', methods=['POST'])
+@requires_auth
+def api_entities():
+    """Tag target-company mentions in one or many texts"""
+    data = request.json or {}
+    texts = data.get('texts') or ([data['text']] if data.get('text') else [])
+    if not texts:
+        return jsonify({'error': 'text or texts required'}), 400
+    matcher = get_company_matcher()
+    return jsonify({'results': [matcher.find(text) for text in texts]})
+
+# Local fit pre-scoring: vectorized term overlap against the profile, no LLM
+FIT_WEIGHTS = {
+    'skills': 3.0,         # skills.* entries
+    'target_roles': 2.5,   # cv_versions.*.target_roles
+    'services': 1.5,       # services descriptions and style guides
+    'experience': 1.0,     # experience highlights
+    'phrase_share': 0.6,   # blend of matched-phrase score vs. plain term overlap
+    'phrase_saturation': 12.0
+}
+STOPWORDS = set("""a an and are as at be been being but by can for from has have in into is it its of on or our
+that the their them they this to was we were will with you your who what which while within across all also any
+more most other such than then there these those through under using well work working team teams role""".split())
+REQUIREMENT_CUES = re.compile(r'\b(experience|required|requirements?|must|knowledge|proficien\w*|skills?|degree|familiar\w*|ability|expert\w*)\b', re.I)
+
+def fit_terms(text):
+    return [t for t in re.findall(r'[a-zäöüß][a-zäöüß+#]{2,}', (text or '').lower()) if t not in STOPWORDS]
+
+class FitScorer:
+    """Scores postings against the profile's skills, roles, services and experience"""
+    
+    def __init__(self, profile, weights=None):
+        self.weights = {**FIT_WEIGHTS, **(weights or {})}
+        sections = {
+            'skills': [s for items in profile.get('skills', {}).values() if isinstance(items, list) for s in items],
+            'target_roles': [r for v in profile.get('cv_versions', {}).values() for r in v.get('target_roles', [])],
+            'services': [s for v in profile.get('services', {}).values() for s in (v if isinstance(v, list) else [v])],
+            'experience': [h for exp in profile.get('experience', []) for h in exp.get('highlights', [])]
+        }
+        self.vocab = {}
+        term_weights = {}
+        for section, texts in sections.items():
+            for text in texts:
+                for term in fit_terms(text):
+                    index = self.vocab.setdefault(term, len(self.vocab))
+                    term_weights[index] = max(term_weights.get(index, 0), self.weights[section])
+        self.term_weights = np.array([term_weights[i] for i in range(len(self.vocab))], dtype=np.float32)
+        
+        # Skills and roles also match as whole phrases: every word must appear
+        self.phrases = list(dict.fromkeys(p for section in ('skills', 'target_roles') for p in sections[section]
+                                          if fit_terms(p)))
+        self.phrase_matrix = np.zeros((len(self.phrases), len(self.vocab)), dtype=np.float32)
+        phrase_weights = []
+        for row, phrase in enumerate(self.phrases):
+            for term in set(fit_terms(phrase)):
+                self.phrase_matrix[row, self.vocab[term]] = 1
+            phrase_weights.append(self.weights['skills'] if phrase in sections['skills'] else self.weights['target_roles'])
+        self.phrase_lengths = self.phrase_matrix.sum(axis=1)
+        self.phrase_weights = np.array(phrase_weights, dtype=np.float32)
+    
+    def score_many(self, texts):
+        """Fit scores (0-10) plus matching skills and likely gaps for each posting text"""
+        term_lists = [fit_terms(t) for t in texts]
+        presence = np.zeros((len(texts), len(self.vocab)), dtype=np.float32)
+        known = np.zeros(len(texts), dtype=np.float32)
+        unique = np.zeros(len(texts), dtype=np.float32)
+        for row, terms in enumerate(term_lists):
+            distinct = set(terms)
+            hits = [self.vocab[t] for t in distinct if t in self.vocab]
+            presence[row, hits] = 1
+            known[row] = len(hits)
+            unique[row] = len(distinct) or 1
+        
+        matched = (presence @ self.phrase_matrix.T) >= self.phrase_lengths  # (postings, phrases)
+        phrase_score = np.minimum((matched * self.phrase_weights).sum(axis=1) / self.weights['phrase_saturation'], 1)
+        if len(self.vocab):
+            overlap = np.minimum((presence @ self.term_weights) / (unique * self.term_weights.mean()), 1)
+        else:
+            overlap = np.zeros(len(texts), dtype=np.float32)  # an empty profile matches nothing
+        blend = self.weights['phrase_share']
+        scores = 10 * (blend * phrase_score + (1 - blend) * overlap)
+        
+        results = []
+        for row, text in enumerate(texts):
+            results.append({
+                'fit_score': round(float(scores[row]), 1),
+                'matching_skills': [self.phrases[i] for i in np.flatnonzero(matched[row])],
+                'skill_gaps': self._gaps(text),
+                'known_terms': int(known[row])
+            })
+        return results
+    
+    def _gaps(self, text, limit=8):
+        """Frequent terms from requirement-style sentences that the profile never mentions"""
+        counts = {}
+        for sentence in re.split(r'(?<=[.!?;])\s+|\n+', text or ''):
+            if REQUIREMENT_CUES.search(sentence):
+                for term in fit_terms(sentence):
+                    if term not in self.vocab and not REQUIREMENT_CUES.fullmatch(term):
+                        counts[term] = counts.get(term, 0) + 1
+        return [t for t, _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:limit]]
+
+def fit_weights(overrides):
+    """Validated FIT_WEIGHTS overrides: positive numbers, phrase_share a fraction; raises ValueError"""
+    weights = {}
+    for key, value in (overrides or {}).items():
+        if key not in FIT_WEIGHTS:
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'Weight {key} must be a number') from None
+        if key == 'phrase_share' and not 0 <= value <= 1:
+            raise ValueError('Weight phrase_share must be between 0 and 1')
+        if key != 'phrase_share' and not 0 < value < float('inf'):
+            raise ValueError(f'Weight {key} must be positive')
+        weights[key] = value
+    return weights
+
+def get_fit_scorer(weights=None):
+    """The profile's shared scorer for the default weights; custom weights build a throwaway one"""
+    profile = current_profile()
+    if weights:
+        return FitScorer(profile.data, weights)
+    return profile.get('fit_scorer', lambda: FitScorer(profile.data), ('skills', 'cv_versions', 'services', 'experience'))
+
+@app.route('/api/prescore', methods=['POST'])
+@requires_auth
+def api_prescore():
+    """Rank postings locally; optionally send only the top_k to full LLM analysis"""
+    data = request.json or {}
+    postings = data.get('postings', [])
+    if not postings:
+        return jsonify({'error': 'Postings required'}), 400
+    if not isinstance(postings, list) or not all(isinstance(p, dict) for p in postings):
+        return jsonify({'error': 'postings must be a list of objects'}), 400
+    if not isinstance(data.get('weights') or {}, dict):
+        return jsonify({'error': 'weights must be an object'}), 400
+    try:
+        top_k = max(int(data.get('top_k', 5)), 0)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'top_k must be an integer'}), 400
+    try:
+        weights = fit_weights(data.get('weights'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    started = time.perf_counter()
+    scores = get_fit_scorer(weights).score_many(
+        [f"{p.get('role', '')}\n{p.get('job_description', '')}" for p in postings]
+    )
+    ranked = sorted(
+        ({'index': i, 'id': p.get('id', i), 'company': p.get('company', ''), 'role': p.get('role', ''), **s}
+         for i, (p, s) in enumerate(zip(postings, scores))),
+        key=lambda r: -r['fit_score']
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    shortlist = ranked[:top_k]
+    if data.get('analyze') and shortlist:
+        if not ANTHROPIC_API_KEY:
+            return jsonify({'error': 'API key not configured'}), 500
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(in_profile(analyze_posting), r['company'], r['role'], postings[r['index']].get('job_description', ''))
+                       for r in shortlist]
+            for r, future in zip(shortlist, futures):
+                try:
+                    r.update(future.result())
+                except Exception as e:
+                    r['error'] = str(e)
+    
+    return jsonify({
+        'success': True,
+        'ranked': ranked,
+        'shortlist': [r['id'] for r in shortlist],
+        'elapsed_ms': round(elapsed_ms, 2)
+    })
+
+# Bulk job-feed ingestion: streamed to disk, then processed in resumable batches
+INGEST_DIR = os.environ.get('KYLE_INGEST_DIR', 'ingest')
+INGEST_BATCH = 2000
+INGEST_TOP_N = 50
+INGEST_WORKERS = int(os.environ.get('KYLE_INGEST_WORKERS', os.cpu_count() or 2))
+PRIORITY_BOOST = {'high': 1.0, 'medium': 0.5, 'low': -1.0}
+INGEST_FIELDS = {
+    'company': ('company', 'company_name', 'employer', 'organization', 'hiring_organization'),
+    'role': ('role', 'title', 'job_title', 'position'),
+    'job_description': ('job_description', 'description', 'body', 'text', 'summary'),
+    'url': ('url', 'link', 'apply_url', 'job_url'),
+    'location': ('location', 'city', 'job_location')
+}
+
+def company_priority(company):
+    """Priority tier of a company from target_companies, or None if it is not listed"""
+    entity = get_company_matcher().resolve_name(company)
+    return entity['tier'] if entity else None
+
+def normalize_posting(record):
+    """Map a feed record onto company/role/job_description/url/location, stripping HTML"""
+    lowered = {str(k).strip().lower(): v for k, v in record.items() if v is not None}
+    posting = {}
+    for field, aliases in INGEST_FIELDS.items():
+        value = next((lowered[a] for a in aliases if lowered.get(a)), '')
+        value = html_lib.unescape(re.sub(r'<[^>]+>', ' ', str(value)))
+        posting[field] = re.sub(r'[ \t]+', ' ', value).strip()
+    return posting
+
+def posting_hash(posting):
+    text = ' '.join(posting['job_description'].lower().split())[:4000]
+    return hashlib.sha1(f"{posting['company'].lower()}|{posting['role'].lower()}|{text}".encode('utf-8')).hexdigest()
+
+_worker_scorer = None
+
+def _init_score_worker(profile):
+    global _worker_scorer
+    _worker_scorer = FitScorer(profile)
+
+def _score_chunk(texts):
+    return [r['fit_score'] for r in _worker_scorer.score_many(texts)]
+
+def _read_records(f, fmt):
+    """Yield (record, byte offset after it) from a binary file positioned at a record boundary"""
+    def lines():
+        while True:
+            line = f.readline()
+            if not line:
+                return
+            yield line.decode('utf-8', errors='replace')
+    if fmt == 'csv':
+        reader = csv.DictReader(lines(), fieldnames=_ingest_csv_header(f.name))
+        for record in reader:
+            yield record, f.tell()
+    else:
+        for line in lines():
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                yield (record if isinstance(record, dict) else None), f.tell()
+
+def _ingest_csv_header(path):
+    with open(path, 'rb') as header_file:
+        return next(csv.reader([header_file.readline().decode('utf-8-sig', errors='replace')]), [])
+
+class IngestJob:
+    """Processes one uploaded feed; all progress is checkpointed per batch so it can resume"""
+    
+    def __init__(self, job_id):
+        self.job_id = job_id
+    
+    def run(self):
+        conn = get_db()
+        job = dict(conn.execute('SELECT * FROM ingest_jobs WHERE id = ?', (self.job_id,)).fetchone())
+        top = {row['hash']: (row['score'], row['hash'], json.loads(row['posting']))
+               for row in conn.execute('SELECT * FROM ingest_candidates WHERE job_id = ?', (self.job_id,))}
+        heap = list(top.values())
+        heapq.heapify(heap)
+        offset = job['offset']
+        if job['format'] == 'csv' and offset == 0:
+            with open(job['path'], 'rb') as f:
+                f.readline()
+                offset = f.tell()
+        
+        ctx = multiprocessing.get_context('spawn')
+        try:
+            with ProcessPoolExecutor(INGEST_WORKERS, mp_context=ctx, initializer=_init_score_worker,
+                                     initargs=(current_profile().data,)) as pool, open(job['path'], 'rb') as f:
+                f.seek(offset)
+                records = _read_records(f, job['format'])
+                while True:
+                    batch = list(itertools.islice(records, INGEST_BATCH))
+                    if not batch:
+                        break
+                    fresh = self._process_batch(conn, job, batch, heap, pool)
+                    job['offset'] = batch[-1][1]
+                    self._checkpoint(conn, job, heap, fresh)
+            job['status'] = 'done'
+        except Exception as e:
+            # Only the status: offset, counters and candidates stay as the last checkpoint left them
+            with conn:
+                conn.execute("UPDATE ingest_jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                             (str(e), time.time(), self.job_id))
+            return
+        self._checkpoint(conn, job, heap)
+        if job['status'] == 'done' and job['analyze'] and ANTHROPIC_API_KEY:
+            analyze_ingest_candidates(self.job_id)
+    
+    def _process_batch(self, conn, job, batch, heap, pool):
+        job['rows_read'] += len(batch)
+        postings = {}
+        valid = 0
+        for record, _ in batch:
+            posting = normalize_posting(record) if record is not None else None
+            if not posting or not posting['job_description'] or not (posting['company'] or posting['role']):
+                job['rows_invalid'] += 1
+                continue
+            valid += 1
+            postings.setdefault(posting_hash(posting), posting)
+        
+        # Exact duplicates within this feed, and with skip_seen anywhere in a previously ingested one
+        hashes = list(postings)
+        seen = set()
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            query = f"SELECT hash FROM ingest_seen WHERE hash IN ({','.join('?' * len(chunk))})"
+            if not job['skip_seen']:
+                query, chunk = query + ' AND job_id = ?', chunk + [self.job_id]
+            seen.update(r[0] for r in conn.execute(query, chunk))
+        fresh = [(h, p) for h, p in postings.items() if h not in seen]
+        job['duplicates'] += valid - len(fresh)
+        
+        texts = [f"{p['role']}\n{p['job_description']}" for _, p in fresh]
+        chunk_size = max(len(texts) // INGEST_WORKERS + 1, 100)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        scores = [score for chunk in pool.map(_score_chunk, chunks) for score in chunk]
+        for (h, posting), score in zip(fresh, scores):
+            posting['priority'] = company_priority(posting['company'])
+            posting['fit_score'] = score
+            entry = (score + PRIORITY_BOOST.get(posting['priority'], 0), h, posting)
+            if len(heap) < job['top_n']:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        job['rows_kept'] += len(fresh)
+        return [h for h, _ in fresh]
+    
+    def _checkpoint(self, conn, job, heap, seen=()):
+        """Offset, counters, candidates and the batch's seen hashes in one transaction, so a restart
+        re-reads a batch exactly when none of it was recorded"""
+        with conn:
+            conn.executemany('INSERT OR IGNORE INTO ingest_seen (hash, job_id) VALUES (?, ?)',
+                             [(h, self.job_id) for h in seen])
+            conn.execute(
+                'UPDATE ingest_jobs SET status=?, offset=?, rows_read=?, rows_kept=?, rows_invalid=?, duplicates=?, '
+                'error=?, updated_at=? WHERE id=?',
+                (job['status'], job['offset'], job['rows_read'], job['rows_kept'], job['rows_invalid'],
+                 job['duplicates'], job['error'], time.time(), self.job_id)
+            )
+            existing = {r[0] for r in conn.execute('SELECT hash FROM ingest_candidates WHERE job_id = ?', (self.job_id,))}
+            current = {h for _, h, _ in heap}
+            conn.executemany('DELETE FROM ingest_candidates WHERE job_id = ? AND hash = ?',
+                             [(self.job_id, h) for h in existing - current])
+            conn.executemany(
+                'INSERT OR IGNORE INTO ingest_candidates (job_id, hash, score, posting, status) VALUES (?, ?, ?, ?, ?)',
+                [(self.job_id, h, rank, json.dumps(p), 'queued') for rank, h, p in heap if h not in existing]
+            )
+
+_ingest_threads = {}
+
+def start_ingest_job(job_id):
+    thread = _ingest_threads.get(job_id)
+    if thread and thread.is_alive():
+        return
+    thread = threading.Thread(target=in_profile(IngestJob(job_id).run), name=f'kyle-ingest-{job_id}', daemon=True)
+    _ingest_threads[job_id] = thread
+    thread.start()
+
+def resume_ingest_jobs():
+    """Pick up jobs that were still running when the process last stopped"""
+    for row in get_db().execute("SELECT id FROM ingest_jobs WHERE status = 'running'").fetchall():
+        start_ingest_job(row['id'])
+
+def analyze_ingest_candidates(job_id, workers=2):
+    """Run full LLM analysis over a job's queued top candidates, best first"""
+    conn = get_db()
+    rows = conn.execute(
+        "SELECT hash, posting FROM ingest_candidates WHERE job_id = ? AND status = 'queued' ORDER BY score DESC",
+        (job_id,)
+    ).fetchall()
+    
+    def analyze(row):
+        posting = json.loads(row['posting'])
+        try:
+            result, status = analyze_posting(posting['company'], posting['role'], posting['job_description']), 'analyzed'
+        except Exception as e:
+            result, status = {'error': str(e)}, 'failed'
+        db = get_db()
+        with db:
+            db.execute('UPDATE ingest_candidates SET status = ?, analysis = ? WHERE job_id = ? AND hash = ?',
+                       (status, json.dumps(result), job_id, row['hash']))
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(in_profile(analyze), rows))
+
+_background_started = set()
+
+@app.before_request
+def _resume_background_work():
+    """Once per profile and process, on its first request"""
+    slug = current_profile().slug
+    if slug not in _background_started:
+        _background_started.add(slug)
+        resume_ingest_jobs()
+        warm_mind_answers()
+        start_research_warmer()
+
+@app.route('/api/ingest', methods=['POST'])
+@requires_auth
+def api_ingest():
+    """Upload a JSONL or CSV feed as the raw request body; processing continues in the background"""
+    fmt = request.args.get('format') or ('csv' if 'csv' in (request.content_type or '') else 'jsonl')
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({'error': 'Format must be csv or jsonl'}), 400
+    
+    job_id = uuid.uuid4().hex[:12]
+    os.makedirs(INGEST_DIR, exist_ok=True)
+    path = os.path.join(INGEST_DIR, f'{job_id}.{fmt}')
+    size = 0
+    with open(path, 'wb') as f:
+        while True:
+            chunk = request.stream.read(1 << 16)
+            if not chunk:
+                break
+            f.write(chunk)
+            size += len(chunk)
+    if not size:
+        os.remove(path)
+        return jsonify({'error': 'Empty upload'}), 400
+    
+    conn = get_db()
+    with conn:
+        conn.execute(
+            'INSERT INTO ingest_jobs (id, path, format, size, top_n, analyze, skip_seen, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (job_id, path, fmt, size, min(max(request.args.get('top', INGEST_TOP_N, type=int), 1), 1000),
+             int(request.args.get('analyze', '0') in ('1', 'true')),
+             int(request.args.get('skip_seen', '0') in ('1', 'true')), time.time(), time.time())
+        )
+    start_ingest_job(job_id)
+    return jsonify({'success': True, 'job_id': job_id, 'bytes': size}), 202
+
+@app.route('/api/ingest/<job_id>')
+@requires_auth
+def api_ingest_status(job_id):
+    """Progress of an ingestion job"""
+    row = get_db().execute('SELECT * FROM ingest_jobs WHERE id = ?', (job_id,)).fetchone()
+    if not row:
+        return jsonify({'error': 'Job not found'}), 404
+    job = dict(row)
+    del job['path']  # where the upload sits on the server is nobody else's business
+    job['progress'] = round(job['offset'] / job['size'] * 100, 1) if job['size'] else 100.0
+    elapsed = job['updated_at'] - job['created_at']
+    job['rows_per_second'] = round(job['rows_read'] / elapsed) if elapsed > 0 else None
+    return jsonify(job)
+
+@app.route('/api/ingest/<job_id>/candidates')
+@requires_auth
+def api_ingest_candidates(job_id):
+    """Top-ranked postings of a job, with their LLM analysis once it has run"""
+    rows = get_db().execute(
+        'SELECT * FROM ingest_candidates WHERE job_id = ? ORDER BY score DESC', (job_id,)
+    ).fetchall()
+    return jsonify({'candidates': [{
+        **json.loads(r['posting']),
+        'rank_score': round(r['score'], 2),
+        'status': r['status'],
+        'analysis': json.loads(r['analysis']) if r['analysis'] else None
+    } for r in rows]})
+
+ANALYSIS_PROFILE = """
+CHARLES SIBOTO'S PROFILE:
+
+EXPERIENCE (10+ years):
+- English Educator, ASC Göttingen (2025-Present)
+- Contributing Writer, Bizcommunity.com (2012-2025) - 12+ years, grew readership 35%
+- Online Editor, Software & Support Media (2024)
+- Editor & Project Manager, Jonathan Ball Publishers (2021-2022) - 20+ book titles/year
+- Junior Editor, NB Publishers (2013-2017) - digital publishing, international co-productions
+
+SKILLS:
+- Core: Editing, Proofreading, Publishing, Project Management, Content Creation, Teaching
+- Technical: Python, Agile Scrum, Git, Data Visualization, CMS, WordPress
+- Languages: English (Native), German (Advanced - 7 years in Germany)
+
+EDUCATION:
 - AI Project Management bootcamp, neuefische GmbH (2025)
 - BA Language Practice, University of Johannesburg
 - Advanced Copy Editing & Proofreading certification
@@ -2471,86 +5042,471 @@ GAMING BACKGROUND:
 - 12+ years writing game reviews and entertainment coverage
 """
 
-    try:
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={
-                'Content-Type': 'application/json',
-                'x-api-key': ANTHROPIC_API_KEY,
-                'anthropic-version': '2023-06-01'
-            },
-            json={
-                'model': 'claude-sonnet-4-20250514',
-                'max_tokens': 2000,
-                'messages': [{'role': 'user', 'content': f"""Analyze this job posting for Charles Siboto's fit.
+# Input budgeting: job ads arrive with benefits lists, EEO statements and cookie banners that cost prefill
+# time without changing the answer, so they are stripped and the rest is cut to what each task needs
+INPUT_BUDGETS = {'analysis': 1500, 'letter': 1200, 'cv': 1200, 'german': 1200}
+TOKEN_PIECES = re.compile(r'[^\W\d_]{1,10}|\d{1,3}|\S')
+JD_BOILERPLATE = re.compile('|'.join([
+    r'\bequal (?:employment )?opportunit', r'\bregardless of (?:race|colou?r|gender|sex|age|religion|national)',
+    r'\bgender identity\b', r'\bsexual orientation\b', r'\bprotected (?:veteran|characteristic|class)',
+    r'\bE\.?E\.?O\.?\b', r'\bcookies?\b', r'\bprivacy (?:policy|notice|statement)', r'\bdata protection\b',
+    r'\bDatenschutz', r'\bChancengleichheit', r'\bunabhängig von (?:Geschlecht|Herkunft|Alter|Religion)',
+    r'\bshare this (?:job|position|posting)', r'\bapply (?:now|today|here)\b', r'\bjetzt bewerben\b',
+    r'\bsimilar jobs\b', r'\ball rights reserved\b', '©'
+]), re.I)
+JD_DROP_SECTIONS = re.compile(r'\b(?:benefits|perks|what we offer|we offer|our offer|why (?:join|work)|wir bieten'
+                              r'|das bieten wir|unser angebot|(?:deine|ihre) vorteile)\b', re.I)
+JD_KEEP_SECTIONS = re.compile(r'\b(?:requirements?|qualifications?|responsibilit|what you.ll do|your (?:role|tasks'
+                              r'|profile|mission)|about you|you (?:have|bring|will)|must.have|nice.to.have|skills'
+                              r'|(?:ihre|deine) aufgaben|(?:ihr|dein) profil|anforderungen|mitbringst|mitbringen'
+                              r'|qualifikation)', re.I)
+JD_REQUIREMENT_CUES = re.compile(r'\b(?:experience (?:in|with|of|as)|\d+\+? years?|years? of|must|required?|you will'
+                                 r'|you.ll|responsib|proficien|fluen|degree|knowledge|skills?|ability|able to'
+                                 r'|familiar|background|manage|lead|deliver|collaborat|erfahrung|kenntnisse|aufgaben'
+                                 r'|verantwort|studium|ausbildung|fließend|sicher)', re.I)
+
+def estimate_tokens(text):
+    """Approximate Claude token count without a tokenizer: a word piece, number or symbol each"""
+    return len(TOKEN_PIECES.findall(text or ''))
+
+JD_BULLET = re.compile(r'[-–•*·▪●✓]|\d+[.)]\s')
+
+def _is_section_header(line):
+    """A short unbulleted line without closing punctuation, like 'Who you are' or 'What we offer:'"""
+    return len(line.split()) <= 6 and not JD_BULLET.match(line) and not re.search(r'[.!?,;]$', line)
+
+def _drop_duplicate_lines(text):
+    """(text without exact repeats of a non-blank line, number of lines removed)"""
+    seen, lines, removed = set(), [], 0
+    for line in text.splitlines():
+        key = line.strip()
+        if key and key in seen:
+            removed += 1
+            continue
+        seen.add(key)
+        lines.append(line)
+    return '\n'.join(lines), removed
+
+def compress_job_description(text, budget):
+    """Job description cut to budget tokens; returns (text, usage). Under budget only exact repeated lines go.
+    Over it, benefits sections, boilerplate lines (cookie, EEO, share/apply text) and repeated sentences are
+    dropped, then sentences that aren't requirements or responsibilities"""
+    text = text or ''
+    before = estimate_tokens(text)
+    dropped = collections.Counter()
+    if before <= budget:
+        deduplicated, repeats = _drop_duplicate_lines(text)
+        after = estimate_tokens(deduplicated)
+        return deduplicated, {'tokens_before': before, 'tokens_after': after, 'tokens_saved': before - after,
+                              'budget': budget, 'dropped': {'duplicate': repeats} if repeats else {}}
+    
+    units, seen, section = [], set(), None
+    for number, raw in enumerate(text.splitlines()):
+        line = ' '.join(raw.split())
+        if not line:
+            continue
+        requirement = JD_REQUIREMENT_CUES.search(line)
+        if section == 'drop' and not JD_BULLET.match(line):
+            section = None   # a benefits list is its bullets; prose after it is something else
+        if _is_section_header(line) and not requirement:
+            # Every header ends the section before it
+            section = 'drop' if JD_DROP_SECTIONS.search(line) and not JD_KEEP_SECTIONS.search(line) else (
+                'keep' if JD_KEEP_SECTIONS.search(line) else None)
+            if section == 'drop':
+                dropped['boilerplate'] += 1
+            else:
+                units.append([number, 0 if section == 'keep' else 1, line, True])
+            continue
+        if not requirement and (section == 'drop' or JD_BOILERPLATE.search(line)):
+            dropped['boilerplate'] += 1
+            continue
+        for sentence in re.split(r'(?<=[.!?])\s+', line):
+            key = re.sub(r'[\W_]+', ' ', sentence.lower()).strip()
+            if len(key) > 12 and key in seen:
+                dropped['duplicate'] += 1
+            else:
+                seen.add(key)
+                core = section == 'keep' or JD_REQUIREMENT_CUES.search(sentence)
+                units.append([number, 0 if core else 2, sentence, False])
+    
+    # Headers that introduce something; only these are removed if the budget empties their section
+    for i, unit in enumerate(units):
+        unit.append(unit[3] and i + 1 < len(units) and not units[i + 1][3])
+    costs = [estimate_tokens(unit[2]) + 1 for unit in units]
+    total = sum(costs)
+    for priority in (2, 1):
+        for i in reversed(range(len(units))):
+            if total <= budget:
+                break
+            if units[i][1] == priority:
+                total -= costs[i]
+                units[i] = None
+                dropped['budget'] += 1
+        units = [u for u in units if u]
+        costs = [estimate_tokens(u[2]) + 1 for u in units]
+    # A header left with nothing under it is noise
+    units = [u for i, u in enumerate(units) if not u[4] or (i + 1 < len(units) and not units[i + 1][3])]
+    
+    lines = []
+    for _, group in itertools.groupby(units, key=lambda u: u[0]):
+        lines.append(' '.join(u[2] for u in group))
+    compressed = '\n'.join(lines)
+    if estimate_tokens(compressed) > budget:
+        compressed = trim_to_tokens(compressed, budget)
+    after = estimate_tokens(compressed)
+    return compressed, {'tokens_before': before, 'tokens_after': after, 'tokens_saved': before - after,
+                        'budget': budget, 'dropped': dict(dropped)}
+
+def budget_job_description(kind, text):
+    """The job description as the given task should see it, with the token usage report"""
+    return compress_job_description(text, INPUT_BUDGETS[kind])
+
+@app.route('/api/postings/compress', methods=['POST'])
+@requires_auth
+def api_compress_posting():
+    """Preview what a task would be sent for a job description, and the tokens saved"""
+    data = request.json or {}
+    job_description = data.get('job_description', '')
+    kind = data.get('kind', 'analysis')
+    if not job_description:
+        return jsonify({'error': 'Job description required'}), 400
+    if kind not in INPUT_BUDGETS:
+        return jsonify({'error': f'Unknown kind: {kind}'}), 400
+    text, usage = budget_job_description(kind, job_description)
+    return jsonify({'success': True, 'job_description': text, 'input': usage})
+
+ANALYSIS_TOOL = {
+    'name': 'record_fit_analysis',
+    'description': "Record the structured analysis of the candidate's fit for the job posting.",
+    'input_schema': {  # property order is generation order: the headline fields stream first
+        'type': 'object',
+        'properties': {
+            'fit_score': {'type': 'number', 'minimum': 1, 'maximum': 10, 'description': 'Overall fit, 1-10'},
+            'fit_summary': {'type': 'string', 'description': '2-3 sentence summary of overall fit'},
+            'matching_skills': {'type': 'array', 'items': {'type': 'string'}},
+            'skill_gaps': {'type': 'array', 'items': {'type': 'string'}},
+            'red_flags': {'type': 'array', 'items': {'type': 'string'}},
+            'recommendations': {'type': 'array', 'items': {'type': 'string'}, 'description': 'Specific recommendations'},
+            'cv_version': {'type': 'string', 'enum': ['localisation', 'language', 'product']},
+            'keywords_to_include': {'type': 'array', 'items': {'type': 'string'}},
+            'opening_hook': {'type': 'string', 'description': 'Suggested opening line for the cover letter'}
+        },
+        'required': ['fit_score', 'fit_summary', 'matching_skills', 'skill_gaps', 'red_flags', 'recommendations',
+                     'cv_version', 'keywords_to_include', 'opening_hook']
+    }
+}
+
+def analyze_posting_events(company, role, job_description, force=False):
+    """Yield ('field', name, value) as each analysis field is complete, then ('result', payload).
+    A near-duplicate's stored analysis is replayed instead of making a call"""
+    signature, duplicate, replaces = find_duplicate_posting(job_description)
+    if duplicate and not force:
+        for field, value in duplicate['analysis'].items():
+            yield 'field', field, value
+        yield 'result', duplicate
+        return
+    
+    description, usage = budget_job_description('analysis', job_description)
+    parser = StreamingJSONParser()
+    chunks = stream_claude([{'role': 'user', 'content': f"""Analyze this job posting for {current_profile().name}'s fit.
 
 COMPANY: {company}
 ROLE: {role}
 
 JOB DESCRIPTION:
-{job_description}
-
-{charles_profile}
-
-Please provide a structured analysis in this EXACT JSON format:
-{{
-    "fit_score": <number 1-10>,
-    "fit_summary": "<2-3 sentence summary of overall fit>",
-    "matching_skills": ["<skill 1>", "<skill 2>", ...],
-    "skill_gaps": ["<gap 1>", "<gap 2>", ...],
-    "red_flags": ["<concern 1>", ...],
-    "recommendations": [
-        "<specific recommendation 1>",
-        "<specific recommendation 2>",
-        ...
-    ],
-    "cv_version": "<localisation|language|product>",
-    "keywords_to_include": ["<keyword 1>", "<keyword 2>", ...],
-    "opening_hook": "<suggested opening line for cover letter>"
-}}
-
-Be honest and specific. If there are gaps, say so. Score fairly - 7+ means good fit, 5-6 means possible with right framing, below 5 means stretch.
-Return ONLY the JSON, no other text."""}]
-            },
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            analysis_text = result['content'][0]['text']
-            
-            # Try to parse JSON
-            try:
-                import re
-                json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-                if json_match:
-                    analysis = json.loads(json_match.group())
-                    return jsonify({'success': True, 'analysis': analysis})
-                else:
-                    return jsonify({'success': True, 'analysis': {'raw': analysis_text}})
-            except:
-                return jsonify({'success': True, 'analysis': {'raw': analysis_text}})
-        else:
-            return jsonify({'error': f'API error: {response.status_code}'}), 500
-            
+{description}
+
+{profile_prompt('analysis')}
+
+Record the analysis with the record_fit_analysis tool.
+Be honest and specific. If there are gaps, say so. Score fairly - 7+ means good fit, 5-6 means possible with right framing, below 5 means stretch."""}],
+        tool=ANALYSIS_TOOL, task='analysis')
+    for chunk in chunks:
+        for field, value in parser.feed(chunk):
+            yield 'field', field, value
+    analysis, recovered = parser.finish()
+    for field, value in recovered:
+        yield 'field', field, value
+    
+    if not analysis:
+        yield 'result', {'analysis': {'raw': parser.text}, 'input': usage}
+    elif not parser.complete:
+        # not stored: a partial analysis should not be reused
+        yield 'result', {'analysis': analysis, 'truncated': True, 'input': usage}
+    else:
+        store_posting(company, role, job_description, signature, analysis, replaces)
+        yield 'result', {'analysis': analysis, 'input': usage}
+
+def analyze_posting(company, role, job_description, force=False):
+    """Fit analysis for a posting: reused from a near-duplicate when possible, else one Claude call"""
+    for event in analyze_posting_events(company, role, job_description, force):
+        if event[0] == 'result':
+            return event[1]
+
+@app.route('/api/analyze-job', methods=['POST'])
+@requires_auth
+def api_analyze_job():
+    """Analyze a job description for fit"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json
+    company = data.get('company', '')
+    role = data.get('role', '')
+    job_description = data.get('job_description', '')
+    
+    if not job_description:
+        return jsonify({'error': 'Job description required'}), 400
+    
+    try:
+        result = analyze_posting(company, role, job_description, bool(data.get('force')))
+        result['local_fit'] = get_fit_scorer().score_many([f'{role}\n{job_description}'])[0]
+        return jsonify({'success': True, **result})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/analyze-url', methods=['POST'])
+@app.route('/api/analyze-job/stream', methods=['POST'])
 @requires_auth
-def api_analyze_url():
-    """Analyze a URL to learn more about Charles"""
+def api_analyze_job_stream():
+    """Job analysis as NDJSON: each field as soon as it is complete, then the full result"""
     if not ANTHROPIC_API_KEY:
         return jsonify({'error': 'API key not configured'}), 500
     
-    data = request.json
-    url = data.get('url', '')
+    data = request.json or {}
+    company = data.get('company', '')
+    role = data.get('role', '')
+    job_description = data.get('job_description', '')
+    if not job_description:
+        return jsonify({'error': 'Job description required'}), 400
     
-    if not url:
-        return jsonify({'error': 'URL required'}), 400
+    def generate():
+        try:
+            for event in analyze_posting_events(company, role, job_description, bool(data.get('force'))):
+                if event[0] == 'field':
+                    yield json.dumps({'field': event[1], 'value': event[2]}) + '\n'
+                else:
+                    result = {**event[1], 'local_fit': get_fit_scorer().score_many([f'{role}\n{job_description}'])[0]}
+                    yield json.dumps({'done': True, 'success': True, **result}) + '\n'
+        except Exception as e:
+            yield json.dumps({'done': True, 'error': str(e)}) + '\n'
     
-    # Current profile context for comparison
-    current_profile = """
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+# Page fetching for URL analysis: pooled connections, bounded downloads, and a cache revalidated with
+# ETag / Last-Modified so a page that hasn't changed costs a 304
+FETCH_MAX_BYTES = int(os.environ.get('KYLE_FETCH_MAX_KB', 2048)) * 1024
+FETCH_MAX_REDIRECTS = 5
+FETCH_TIMEOUT = (5, 15)
+PAGE_CACHE_TTL = int(os.environ.get('KYLE_PAGE_TTL', 24 * 3600))   # seconds a cached page is revalidated rather than refetched
+PAGE_TEXT_TOKENS = 6000
+PAGE_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg', 'head', 'nav', 'footer', 'form', 'iframe', 'button'}
+PAGE_BLOCK_TAGS = {'p', 'div', 'section', 'article', 'main', 'header', 'aside', 'br', 'li', 'ul', 'ol', 'tr', 'table',
+                   'blockquote', 'pre', 'figure', 'figcaption', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'dd', 'dt'}
+PAGE_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+
+_fetch_session = None
+_fetch_session_lock = threading.Lock()
+
+def fetch_session():
+    """One pooled HTTP session shared by every page fetch"""
+    global _fetch_session
+    with _fetch_session_lock:
+        if _fetch_session is None:
+            session = requests.Session()
+            adapter = PublicAddressAdapter(pool_connections=16, pool_maxsize=16)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.max_redirects = FETCH_MAX_REDIRECTS
+            session.headers['User-Agent'] = 'Kyle/1.0 (job application assistant)'
+            _fetch_session = session
+        return _fetch_session
+
+class PageTextExtractor(HTMLParser):
+    """Readable text of an HTML page (scripts, styles and navigation dropped, blocks on their own lines)
+    and the targets of its links"""
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.links = []
+        self.title = ''
+        self.skip = 0
+        self.in_title = False
+    
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            href = dict(attrs).get('href')
+            if href:
+                self.links.append(href)
+        if tag in PAGE_SKIP_TAGS:
+            self.skip += 1
+        elif tag == 'title':
+            self.in_title = True
+        elif tag in PAGE_BLOCK_TAGS:
+            self.parts.append('\n')
+    
+    def handle_endtag(self, tag):
+        if tag in PAGE_SKIP_TAGS:
+            self.skip = max(0, self.skip - 1)
+        elif tag == 'title':
+            self.in_title = False
+        elif tag in PAGE_BLOCK_TAGS:
+            self.parts.append('\n')
+    
+    def handle_data(self, data):
+        if self.in_title:
+            self.title += data
+        elif not self.skip:
+            self.parts.append(data)
+    
+    def text(self):
+        lines = (' '.join(line.split()) for line in ''.join(self.parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+def html_to_text(markup):
+    """(title, text, link hrefs) of an HTML document"""
+    parser = PageTextExtractor()
+    parser.feed(markup)
+    parser.close()
+    return ' '.join(parser.title.split()), parser.text(), parser.links
+
+def trim_to_tokens(text, max_tokens):
+    """Cut text to roughly max_tokens (about four characters each), at a line break where possible"""
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text.rfind('\n', 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip() + '\n[...]'
+
+def _decode_page(body, content_type):
+    charset = re.search(r'charset=([\w-]+)', content_type or '', re.I)
+    charset = charset.group(1) if charset else None
+    if not charset:
+        meta = PAGE_CHARSET.search(body[:4096])
+        charset = meta.group(1).decode('ascii') if meta else 'utf-8'
+    try:
+        return body.decode(charset, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+def public_addresses(host, port):
+    """Resolved (family, type, proto, canonname, sockaddr) entries for host; ValueError unless all are public"""
+    try:
+        addresses = socket.getaddrinfo(host or '', port, proto=socket.IPPROTO_TCP)
+    except (ValueError, socket.gaierror) as e:
+        raise ValueError(f'Could not resolve {host}') from e
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split('%')[0])
+        if not address.is_global or address.is_multicast:
+            raise ValueError(f'{host} is not a public address')
+    return addresses
+
+def check_public_url(url):
+    """Raise ValueError unless url is http(s) on a host that resolves only to public addresses, so
+    fetching it can't reach this server, its network or cloud metadata endpoints"""
+    if not re.match(r'https?://', url, re.I):
+        raise ValueError('Only http and https URLs can be fetched')
+    parts = urlsplit(url)
+    try:
+        port = parts.port or (443 if parts.scheme.lower() == 'https' else 80)
+    except ValueError as e:
+        raise ValueError(f'Could not resolve {parts.hostname or url}') from e
+    public_addresses(parts.hostname, port)
+
+class _PublicConnection:
+    """Connects to the address it has just vetted rather than resolving the name again, so a DNS answer that
+    changes after the check (rebinding) can't point a fetch at a private address; Host and TLS keep the name"""
+    
+    def _new_conn(self):
+        sockaddr = public_addresses(self.host, self.port)[0][4]
+        try:
+            return urllib3.util.connection.create_connection(
+                (sockaddr[0], self.port), self.timeout, source_address=self.source_address,
+                socket_options=self.socket_options
+            )
+        except socket.timeout as e:
+            raise urllib3.exceptions.ConnectTimeoutError(self, f'Connection to {self.host} timed out') from e
+        except OSError as e:
+            raise urllib3.exceptions.NewConnectionError(self, f'Failed to establish a new connection: {e}') from e
+
+class PublicHTTPConnection(_PublicConnection, urllib3.connection.HTTPConnection):
+    pass
+
+class PublicHTTPSConnection(_PublicConnection, urllib3.connection.HTTPSConnection):
+    pass
+
+class _PublicHTTPPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = PublicHTTPConnection
+
+class _PublicHTTPSPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = PublicHTTPSConnection
+
+class PublicAddressAdapter(requests.adapters.HTTPAdapter):
+    """HTTPAdapter whose connections only ever go to addresses public_addresses accepted"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _PublicHTTPPool, 'https': _PublicHTTPSPool}
+
+def _open_page(url, headers):
+    """The response for url, following redirects by hand so every hop is checked with check_public_url"""
+    session = fetch_session()
+    for _ in range(FETCH_MAX_REDIRECTS + 1):
+        check_public_url(url)
+        response = session.get(url, headers=headers, timeout=FETCH_TIMEOUT, stream=True, allow_redirects=False)
+        if not response.is_redirect:
+            return response
+        response.close()
+        url = urljoin(url, response.headers['Location'])
+    raise ValueError(f'More than {FETCH_MAX_REDIRECTS} redirects')
+
+def fetch_page(url):
+    """Title and readable text of a web page, revalidating any cached copy; raises ValueError if it can't be read"""
+    check_public_url(url)
+    cached = cache_get('page', url, PAGE_CACHE_TTL)
+    headers = {}
+    if cached and not (cached.get('etag') or cached.get('last_modified')):
+        return dict(cached, status='cached')  # nothing to revalidate with: good until PAGE_CACHE_TTL runs out
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+    try:
+        with _open_page(url, headers) as response:
+            if response.status_code == 304 and cached:
+                cache_put('page', url, cached)   # still current: good for another PAGE_CACHE_TTL
+                return dict(cached, status='revalidated')
+            if response.status_code != 200:
+                raise ValueError(f'Page returned HTTP {response.status_code}')
+            content_type = response.headers.get('Content-Type', '')
+            if not re.match(r'text/(html|plain)|application/xhtml', content_type or 'text/html', re.I):
+                raise ValueError(f'Not a web page ({content_type.split(";")[0]})')
+            if int(response.headers.get('Content-Length') or 0) > FETCH_MAX_BYTES:
+                raise ValueError('Page is too large')
+            body = bytearray()
+            for chunk in response.iter_content(64 * 1024):
+                body += chunk
+                if len(body) > FETCH_MAX_BYTES:
+                    raise ValueError('Page is too large')
+            markup = _decode_page(bytes(body), content_type)
+            if content_type.lower().startswith('text/plain'):
+                title, text, links = '', markup.strip(), []
+            else:
+                title, text, links = html_to_text(markup)
+            links = list(dict.fromkeys(urldefrag(urljoin(response.url, href))[0] for href in links))
+            page = {'url': response.url, 'title': title, 'text': text, 'links': links,
+                    'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+    except requests.RequestException as e:
+        raise ValueError(f'Could not fetch page: {e}') from e
+    cache_put('page', url, page)
+    conn = get_db()
+    with conn:
+        conn.execute("DELETE FROM llm_cache WHERE namespace = 'page' AND created_at < ?", (time.time() - PAGE_CACHE_TTL,))
+    return dict(page, status='fetched')
+
+URL_PROFILE = """
 CHARLES'S CURRENT KNOWN PROFILE:
 - Editor, Writer, Project Manager with 10+ years experience
 - Published children's author (Penguin Random House SA)
@@ -2560,116 +5516,282 @@ CHARLES'S CURRENT KNOWN PROFILE:
 - Gaming enthusiast (Half-Life, Mass Effect, Dragon Age, Alan Wake, Baldur's Gate)
 - Experience at: ASC Göttingen, Bizcommunity, Software & Support Media, Jonathan Ball Publishers, NB Publishers
 """
+
+@app.route('/api/analyze-url', methods=['POST'])
+@requires_auth
+def api_analyze_url():
+    """Analyze a URL to learn more about the candidate"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json
+    url = data.get('url', '')
+    
+    if not url:
+        return jsonify({'error': 'URL required'}), 400
     
     try:
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={
-                'Content-Type': 'application/json',
-                'x-api-key': ANTHROPIC_API_KEY,
-                'anthropic-version': '2023-06-01'
-            },
-            json={
-                'model': 'claude-sonnet-4-20250514',
-                'max_tokens': 2000,
-                'messages': [{'role': 'user', 'content': f"""You are Kyle, a Culture Mind helping Charles Siboto with his job search. 
+        page = fetch_page(url)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 502
+    if not page['text']:
+        return jsonify({'error': 'No readable text found on the page'}), 422
+    
+    # Current profile context for comparison
+    known_profile = profile_prompt('url')
+    name = current_profile().name
+    
+    try:
+        analysis = call_claude([{'role': 'user', 'content': f"""You are Kyle, a Culture Mind helping {name} with their job search. 
+
+Please analyze the content of this page: {page['url']}
+TITLE: {page['title'] or '(none)'}
 
-Please fetch and analyze the content at this URL: {url}
+PAGE TEXT:
+{trim_to_tokens(page['text'], PAGE_TEXT_TOKENS)}
 
-This should be content by or about Charles Siboto. Analyze it and extract:
+This should be content by or about {name}. Analyze it and extract:
 
 1. **Content Summary**: What is this page/article about? (2-3 sentences)
 
-2. **New Skills Identified**: Any skills, tools, or competencies demonstrated that aren't in his current profile
+2. **New Skills Identified**: Any skills, tools, or competencies demonstrated that aren't in their current profile
    - Format as a bullet list
    - Be specific (e.g., "Video editing" not just "media skills")
 
-3. **Writing Style Insights**: What does this reveal about his writing voice, expertise areas, or professional brand?
+3. **Writing Style Insights**: What does this reveal about their writing voice, expertise areas, or professional brand?
 
 4. **Achievements/Accomplishments**: Any specific achievements, metrics, or accomplishments mentioned
 
-5. **Suggested Profile Updates**: Specific additions or changes to make to his profile based on this content
+5. **Suggested Profile Updates**: Specific additions or changes to make to their profile based on this content
    - Format as actionable items
 
 6. **Keywords for Applications**: Industry keywords or phrases that could strengthen job applications
 
-{current_profile}
+{known_profile}
 
-If you cannot access the URL or it's not about Charles, explain what you found instead.
+If the page is not about {name}, explain what you found instead.
 
-Be concise but thorough. This analysis will help Kyle better represent Charles in future applications."""}]
-            },
-            timeout=90
-        )
+Be concise but thorough. This analysis will help Kyle better represent {name} in future applications."""}], timeout=90, task='url')
         
-        if response.status_code == 200:
-            result = response.json()
-            analysis = result['content'][0]['text']
-            
-            # Extract skills for the learning feature
-            skills_prompt = f"""Based on this analysis, extract ONLY the new skills as a JSON array of strings. 
-Include skills, tools, competencies that should be added to Charles's profile.
+        # Extract skills for the learning feature
+        skills_prompt = f"""Based on this analysis, extract ONLY the new skills as a JSON array of strings. 
+Include skills, tools, competencies that should be added to {name}'s profile.
 Return ONLY a valid JSON array, nothing else. Example: ["Skill 1", "Skill 2", "Skill 3"]
 
 Analysis:
 {analysis}"""
-            
-            skills_response = requests.post(
-                'https://api.anthropic.com/v1/messages',
-                headers={
-                    'Content-Type': 'application/json',
-                    'x-api-key': ANTHROPIC_API_KEY,
-                    'anthropic-version': '2023-06-01'
-                },
-                json={
-                    'model': 'claude-sonnet-4-20250514',
-                    'max_tokens': 500,
-                    'messages': [{'role': 'user', 'content': skills_prompt}]
-                },
-                timeout=30
-            )
-            
-            new_skills = []
-            if skills_response.status_code == 200:
-                try:
-                    skills_text = skills_response.json()['content'][0]['text'].strip()
-                    # Try to parse as JSON
-                    import re
-                    json_match = re.search(r'\[.*\]', skills_text, re.DOTALL)
-                    if json_match:
-                        new_skills = json.loads(json_match.group())
-                except:
-                    pass
-            
-            return jsonify({
-                'success': True, 
-                'analysis': analysis,
-                'new_skills': new_skills,
-                'url': url
-            })
-        else:
-            return jsonify({'error': f'API error: {response.status_code}'}), 500
+        
+        new_skills = []
+        try:
+            skills_text = call_claude([{'role': 'user', 'content': skills_prompt}], timeout=30, task='skills').strip()
+            json_match = re.search(r'\[.*\]', skills_text, re.DOTALL)
+            if json_match:
+                new_skills = json.loads(json_match.group())
+        except Exception:
+            pass
+        
+        return jsonify({
+            'success': True, 
+            'analysis': analysis,
+            'new_skills': new_skills,
+            'url': url,
+            'title': page['title'],
+            'fetch': page['status']
+        })
             
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/generate', methods=['POST'])
+# Bulk "Teach Kyle": crawl a portfolio or author page and the same-site pages it links to, then
+# extract skills from the pages in batches while the crawl is still running
+CRAWL_MAX_PAGES = 200
+CRAWL_WORKERS = 8
+CRAWL_HOST_CONCURRENCY = 4
+CRAWL_HOST_INTERVAL = 0.25
+CRAWL_BATCH_TOKENS = 12000
+CRAWL_PAGE_TOKENS = 2000
+SKILL_WORKERS = 3
+
+class HostThrottle:
+    """Politeness per host: at most `concurrency` requests in flight and `interval` seconds between starts"""
+    
+    def __init__(self, concurrency=CRAWL_HOST_CONCURRENCY, interval=CRAWL_HOST_INTERVAL):
+        self.concurrency = concurrency
+        self.interval = interval
+        self.hosts = {}
+        self.lock = threading.Lock()
+    
+    def fetch(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self.lock:
+            slot = self.hosts.setdefault(host, {'semaphore': threading.BoundedSemaphore(self.concurrency), 'next': 0.0})
+        with slot['semaphore']:
+            with self.lock:
+                start = max(time.monotonic(), slot['next'])
+                slot['next'] = start + self.interval
+            time.sleep(max(0.0, start - time.monotonic()))
+            return fetch_page(url)
+
+def crawl_scope(seed, pattern=None):
+    """Predicate for the links worth following: same site as the seed, matching pattern (a regex over the
+    URL path) or else under the seed's own directory"""
+    parts = urlsplit(seed)
+    site = parts.netloc.lower().removeprefix('www.')
+    if pattern:
+        matcher = re.compile(pattern)
+    else:
+        prefix = parts.path.rsplit('/', 1)[0] + '/'
+        matcher = re.compile(re.escape(prefix))
+    
+    def in_scope(url):
+        link = urlsplit(url)
+        return (link.scheme in ('http', 'https') and link.netloc.lower().removeprefix('www.') == site
+                and matcher.search(link.path) is not None)
+    return in_scope
+
+def _skill_list(reply):
+    match = re.search(r'\[.*\]', reply, re.S)
+    try:
+        skills = json.loads(match.group(0)) if match else []
+    except ValueError:
+        return []
+    return [s.strip() for s in skills if isinstance(s, str) and s.strip()]
+
+def extract_batch_skills(pages):
+    """Skills shown across a batch of pages, from one model call (cached by the pages' content)"""
+    key = hashlib.sha256('\n'.join(sorted(p['hash'] for p in pages)).encode()).hexdigest()
+    cached = cache_get('crawl-skills', key, depends=prompt_sections('url') + ('profile',))
+    if cached is not None:
+        return cached
+    documents = '\n\n'.join(f"=== {p['title'] or p['url']} ===\n{trim_to_tokens(p['text'], CRAWL_PAGE_TOKENS)}"
+                            for p in pages)
+    reply = call_claude([{'role': 'user', 'content': f"""These pages were written by or are about {current_profile().name}.
+
+{profile_prompt('url')}
+
+{documents}
+
+List the skills, tools and competencies these pages demonstrate that are not already in the profile above.
+Be specific ("Video editing", not "media skills") and name each skill the same way every time.
+Return ONLY a valid JSON array of strings, nothing else."""}], task='crawl_skills')
+    skills = _skill_list(reply)
+    cache_put('crawl-skills', key, skills, depends=prompt_sections('url') + ('profile',))
+    return skills
+
+def merge_skills(batches, known=()):
+    """One deduplicated list over every batch, most frequently demonstrated first; profile skills dropped"""
+    norm = lambda s: ' '.join(re.sub(r'[^\w+#]+', ' ', s.lower()).split())
+    known = {norm(s) for s in known}
+    merged = {}
+    for skills in batches:
+        for skill in dict.fromkeys(skills):
+            entry = merged.setdefault(norm(skill), {'skill': skill, 'mentions': 0})
+            entry['mentions'] += 1
+    return sorted((e for k, e in merged.items() if k and k not in known), key=lambda e: (-e['mentions'], e['skill'].lower()))
+
+def crawl_site(seed, pattern=None, max_pages=50):
+    """Breadth-first crawl with bounded concurrency, yielding progress events and finally the merged skills"""
+    started = time.monotonic()
+    in_scope = crawl_scope(seed, pattern)
+    throttle = HostThrottle()
+    fetch = in_profile(throttle.fetch)
+    extract = in_profile(extract_batch_skills)
+    seen_urls, seen_hashes = {seed}, set()
+    frontier = collections.deque([seed])
+    fetching, extracting = {}, set()
+    batch, batch_tokens, batches = [], 0, []
+    counts = collections.Counter()
+    
+    with ThreadPoolExecutor(CRAWL_WORKERS, thread_name_prefix='kyle-crawl') as fetchers, \
+            ThreadPoolExecutor(SKILL_WORKERS, thread_name_prefix='kyle-skills') as extractors:
+        while frontier or fetching or extracting or batch:
+            while frontier and len(fetching) < CRAWL_WORKERS and counts['fetched'] + len(fetching) < max_pages:
+                url = frontier.popleft()
+                fetching[fetchers.submit(fetch, url)] = url
+            if not fetching and batch:
+                extracting.add(extractors.submit(extract, batch))
+                batch, batch_tokens = [], 0
+            if not fetching and not extracting:
+                break
+            done, _ = wait(list(fetching) + list(extracting), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in extracting:
+                    extracting.discard(future)
+                    try:
+                        skills = future.result()
+                    except Exception as e:
+                        counts['batch_errors'] += 1
+                        yield {'event': 'batch', 'error': str(e)}
+                        continue
+                    batches.append(skills)
+                    yield {'event': 'batch', 'skills': skills}
+                    continue
+                url = fetching.pop(future)
+                try:
+                    page = future.result()
+                except Exception as e:
+                    counts['errors'] += 1
+                    yield {'event': 'error', 'url': url, 'error': str(e)}
+                    continue
+                counts['fetched'] += 1
+                for link in page.get('links', []):
+                    if link not in seen_urls and in_scope(link):
+                        seen_urls.add(link)
+                        frontier.append(link)
+                digest = hashlib.sha256(' '.join(page['text'].split()).encode()).hexdigest()
+                if digest in seen_hashes or not page['text']:
+                    counts['duplicates'] += 1
+                    yield {'event': 'duplicate', 'url': url}
+                    continue
+                seen_hashes.add(digest)
+                # The seed is usually an index of links, not writing worth learning from
+                if url != seed or not frontier:
+                    tokens = min(len(page['text']) // 4, CRAWL_PAGE_TOKENS)
+                    if batch and batch_tokens + tokens > CRAWL_BATCH_TOKENS:
+                        extracting.add(extractors.submit(extract, batch))
+                        batch, batch_tokens = [], 0
+                    batch.append({'url': url, 'title': page['title'], 'text': page['text'], 'hash': digest})
+                    batch_tokens += tokens
+                    counts['learned'] += 1
+                yield {'event': 'page', 'url': url, 'title': page['title'], 'status': page['status'],
+                       'fetched': counts['fetched'], 'queued': len(frontier)}
+    
+    known = [s for group in current_profile().data.get('skills', {}).values() if isinstance(group, list) for s in group]
+    yield {'event': 'complete', 'pages': counts['fetched'], 'learned_from': counts['learned'],
+           'duplicates': counts['duplicates'], 'errors': counts['errors'], 'batch_errors': counts['batch_errors'],
+           'skills': merge_skills(batches, known), 'seconds': round(time.monotonic() - started, 1)}
+
+@app.route('/api/analyze-url/crawl', methods=['POST'])
 @requires_auth
-def api_generate():
-    """Generate cover letter or CV using Claude API with optional company research"""
+def api_analyze_url_crawl():
+    """Learn from a whole site section at once: crawl progress streamed as NDJSON, merged skills at the end"""
     if not ANTHROPIC_API_KEY:
         return jsonify({'error': 'API key not configured'}), 500
     
-    data = request.json
-    gen_type = data.get('type', 'letter')  # 'letter' or 'cv'
-    company = data.get('company', '[COMPANY]')
-    role = data.get('role', '[ROLE]')
-    job_description = data.get('job_description', '')
-    cv_style = data.get('cv_style', 'localisation')
-    company_research = data.get('company_research', '')  # Pre-fetched research
+    data = request.json or {}
+    seed = (data.get('url') or '').strip()
+    if not re.match(r'https?://', seed, re.I):
+        return jsonify({'error': 'An http(s) URL is required'}), 400
+    pattern = data.get('pattern') or None
+    if pattern:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            return jsonify({'error': f'Invalid link pattern: {e}'}), 400
+    try:
+        max_pages = min(max(int(data.get('max_pages') or 50), 1), CRAWL_MAX_PAGES)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'max_pages must be an integer'}), 400
+    
+    def generate():
+        for event in crawl_site(seed, pattern, max_pages):
+            yield json.dumps(event) + '\n'
     
-    # Build Charles's profile context
-    profile_context = f"""
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+# Generation prompts shared by /api/generate, /api/german-letter and the bundles built on them
+PROFILE_CONTEXT = """
 CHARLES SIBOTO'S PROFILE:
 
 Name: Charles Siboto
@@ -2710,6 +5832,101 @@ GAMING BACKGROUND:
 Lifelong gamer since the NES era. First game: Super Mario Bros. Favourites: Half-Life, Mass Effect, Dragon Age, Alan Wake, Baldur's Gate. Views gaming as storytelling engine and cultural innovation space.
 """
 
+GERMAN_PROFILE = """CHARLES SIBOTOS PROFIL:
+- Über 10 Jahre Erfahrung im Verlagswesen und in der digitalen Medienproduktion
+- Veröffentlichter Kinderbuchautor bei Penguin Random House Südafrika
+- Projektmanagement-Erfahrung: 20+ Bücher jährlich bei Jonathan Ball Publishers
+- Seit 2018 in Deutschland, fortgeschrittene Deutschkenntnisse
+- AI Project Management Weiterbildung bei neuefische GmbH (Agile Scrum)
+- BA Language Practice, University of Johannesburg
+- Verfügbar ab: 1. März 2026
+- Gehaltsvorstellung: €50.000 - €58.000"""
+
+GERMAN_LETTER_TASK = """Schreibe ein professionelles Anschreiben auf Deutsch. Verwende formelle Sprache (Sie-Form). Das Anschreiben sollte:
+- Authentisch und nicht zu förmlich klingen
+- Spezifische Erfahrungen hervorheben, die zur Stelle passen
+- Die Motivation für diese spezielle Position zeigen
+- Etwa 3-4 Absätze lang sein"""
+
+def german_letter_system():
+    return f"""Du bist Kyle, ein KI-Assistent, der {current_profile().name} bei Bewerbungen auf dem deutschen Arbeitsmarkt hilft.
+
+{profile_prompt('german')}
+
+{GERMAN_LETTER_TASK}"""
+
+def profile_summary(ctx):
+    """A prompt profile block generated from a profile's data file"""
+    data = ctx.data
+    profile = data.get('profile', {})
+    identity = data.get('professional_identity', {})
+    lines = [f"{ctx.name.upper()}'S PROFILE:", '', f'Name: {ctx.name}']
+    for label, key in (('Location', 'location'), ('Email', 'email'), ('Phone', 'phone')):
+        if profile.get(key):
+            lines.append(f'{label}: {profile[key]}')
+    for label, link in profile.get('links', {}).items():
+        lines.append(f"{label.title()}: {re.sub(r'^https?://(www[.])?', '', link)}")
+    if profile.get('available_from'):
+        lines.append(f"Available from: {format_long_date(profile['available_from'])}")
+    if profile.get('salary_expectation'):
+        lines.append(f"Salary expectation: {profile['salary_expectation']}")
+    if identity.get('about_me') or identity.get('headline'):
+        lines += ['', 'PROFESSIONAL SUMMARY:', identity.get('about_me') or identity['headline']]
+    sections = [
+        ('EXPERIENCE', [f"- {e.get('title', '')}, {e.get('company', '')} ({e.get('dates', '')}): "
+                        + '; '.join(e.get('highlights', [])[:2]) for e in data.get('experience', [])]),
+        ('EDUCATION', [f"- {e.get('degree', '')}, {e.get('institution', '')} ({e.get('dates', '')})"
+                       for e in data.get('education', [])]),
+        ('PUBLISHED BOOKS', [f"- {b.get('title', '')} ({b.get('publisher', '')}, {b.get('year', '')})"
+                             for b in data.get('books', [])]),
+        ('SKILLS', [f"- {group.title()}: {', '.join(items)}" for group, items in data.get('skills', {}).items()
+                    if isinstance(items, list)]),
+        ('LANGUAGES', [f'- {language}: {level}' for language, level in profile.get('languages', {}).items()])
+    ]
+    for title, items in sections:
+        if items:
+            lines += ['', f'{title}:'] + items
+    return '\n'.join(lines)
+
+# The profile sections each prompt block is written from, which is what outputs built on it depend on
+PROMPT_SECTIONS = {
+    'letter': ('profile', 'professional_identity', 'experience', 'education', 'books', 'skills', 'gaming_background'),
+    'analysis': ('experience', 'education', 'books', 'skills', 'gaming_background'),
+    'mind': ('profile', 'professional_identity', 'experience', 'education', 'books', 'skills', 'gaming_background',
+             'target_companies', 'application_history'),
+    'url': ('professional_identity', 'experience', 'education', 'books', 'skills', 'gaming_background'),
+    'german': ('profile', 'experience', 'education', 'books'),
+    'feedback': ('experience', 'education', 'books', 'profile')
+}
+PROFILE_SUMMARY_SECTIONS = ('profile', 'professional_identity', 'experience', 'education', 'books', 'skills')
+
+def hand_written_prompts(ctx):
+    """The default candidate's prompt blocks were written for their profile as shipped; once it has been
+    edited the blocks are generated from the data like everyone else's"""
+    return ctx.slug == DEFAULT_PROFILE and 'version' not in ctx.data
+
+def prompt_sections(kind):
+    return PROMPT_SECTIONS[kind] if hand_written_prompts(current_profile()) else PROFILE_SUMMARY_SECTIONS
+
+def profile_prompt(kind):
+    """The profile block a prompt embeds: hand-written for the default candidate, generated for the rest"""
+    ctx = current_profile()
+    if hand_written_prompts(ctx):
+        return {'letter': PROFILE_CONTEXT, 'analysis': ANALYSIS_PROFILE, 'mind': MIND_PROFILE, 'url': URL_PROFILE,
+                'german': GERMAN_PROFILE, 'feedback': FEEDBACK_PROFILE}[kind].strip()
+    return ctx.get('prompt', lambda: profile_summary(ctx), PROFILE_SUMMARY_SECTIONS)
+
+def contact_header(profile):
+    """Name, location, email, phone and LinkedIn, one per line, as letters open"""
+    return '\n'.join(filter(None, [
+        profile.get('name', ''), profile.get('location', ''), profile.get('email', ''),
+        profile.get('phone', ''), re.sub(r'^https?://(www\.)?', '', profile.get('links', {}).get('linkedin', ''))
+    ]))
+
+def generation_prompt(gen_type, company, role, job_description='', cv_style='localisation', company_research='', facts=''):
+    """English letter or CV prompt; facts pins the claims a bundle's documents must agree on"""
+    ctx = current_profile()
+    profile = ctx.data.get('profile', {})
     # Add company research context if available
     company_context = ""
     if company_research:
@@ -2721,10 +5938,10 @@ Use this research to personalize the application - reference specific company va
 """
 
     if gen_type == 'letter':
-        prompt = f"""{profile_context}
+        prompt = f"""{profile_prompt('letter')}
 {company_context}
 
-TASK: Write a compelling, personalized cover letter for Charles applying to {company} for the role of {role}.
+TASK: Write a compelling, personalized cover letter for {ctx.first_name} applying to {company} for the role of {role}.
 
 {"JOB DESCRIPTION:" + job_description if job_description else ""}
 
@@ -2736,17 +5953,13 @@ STYLE GUIDELINES:
 - Highlight 2-3 most relevant experiences with specific achievements
 - Show genuine enthusiasm for the company/role
 - Be transparent about any gaps but frame positively
-- Close with availability (1 March 2026) and salary (€50,000-€58,000)
-- Sign off with "Warm regards, Charles Siboto"
+- Close with availability ({format_long_date(profile.get('available_from', ''))}) and salary ({profile.get('salary_expectation', '')})
+- Sign off with "Warm regards, {ctx.name}"
 - Keep to approximately 350-450 words
 
 FORMAT:
 Start with contact header:
-Charles Siboto
-Neu-Eichenberg, Germany
-csiboto@gmail.com
-+49 176 8787 3255
-linkedin.com/in/charles-siboto-2a9a773b
+{contact_header(profile)}
 
 [Today's date]
 
@@ -2756,7 +5969,7 @@ Dear Hiring Team,
 
 Warm regards,
 
-Charles Siboto"""
+{ctx.name}"""
 
     else:  # CV
         style_descriptions = {
@@ -2765,10 +5978,10 @@ Charles Siboto"""
             'product': 'Product Manager - emphasize digital strategy, user research, data-driven decisions, content innovation'
         }
         
-        prompt = f"""{profile_context}
+        prompt = f"""{profile_prompt('letter')}
 {company_context}
 
-TASK: Create a tailored CV for Charles targeting the role of {role} at {company or 'a company in this field'}.
+TASK: Create a tailored CV for {ctx.first_name} targeting the role of {role} at {company or 'a company in this field'}.
 
 CV STYLE: {style_descriptions.get(cv_style, style_descriptions['localisation'])}
 
@@ -2792,30 +6005,327 @@ FORMAT as plain text CV with these sections:
 - Publications
 - Additional (gaming background if relevant)
 - Footer (availability, salary)"""
+    return prompt + (f'\n\n{facts}' if facts else '')
 
+def german_letter_prompt(company, role, job_description='', company_research='', facts=''):
+    prompt = f'Schreibe ein Anschreiben für die Position "{role}" bei {company}.'
+    if job_description:
+        prompt += f'\n\nStellenbeschreibung:\n{job_description}'
+    if company_research:
+        prompt += f'\n\nRecherche zum Unternehmen:\n{company_research}'
+    if facts:
+        prompt += f'\n\n{facts}'
+    return prompt
+
+# Voice fingerprint: stylometric features of the candidate's own letters and interview answers, for
+# checking that generated text sounds like them and pointing at the paragraphs that don't
+STYLE_FUNCTION_WORDS = """i me my we our you it this that these which who as at by for from in into of on to with
+and but or so because although while if when than then also not no very more most just only even still a an the
+is are was were be been have has had will would can could should may might do did""".split()
+STYLE_PUNCTUATION = [',', ';', ':', '!', '?', '(', '—', '–', ' - ', '"', "'", '...']
+STYLE_SENTENCE_BINS = np.array([9, 15, 21, 28, 36])  # sentence-length histogram edges, in words
+STYLE_NGRAM_BUCKETS = 512
+STYLE_MIN_WORDS = 25        # shorter paragraphs (headers, salutations, sign-offs) aren't scored
+STYLE_MIN_SEGMENTS = 5
+STYLE_FLAG_VOICE = 10       # paragraphs less typical than 90% of the real ones are flagged
+STYLE_Z_CLIP = 6.0
+STYLE_WORD = re.compile(r"[A-Za-zÀ-ÿ]+(?:'[A-Za-z]+)?")
+STYLE_SENTENCE = re.compile(r'(?<=[.!?])\s+(?=[A-Z"\'(])')
+
+def style_segments(text):
+    """(index, paragraph) pairs worth scoring; indices count every blank-line-separated paragraph from 1"""
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text or '') if p.strip()]
+    return [(i, p) for i, p in enumerate(paragraphs, 1) if len(p.split()) >= STYLE_MIN_WORDS]
+
+class StyleFingerprint:
+    """Per-feature mean and spread over the corpus paragraphs, plus their hashed phrase n-gram centroid.
+    A paragraph's distance is the RMS of its clipped z-scores; voice is the share of real paragraphs
+    that are further away, so 50 is a typical paragraph of theirs and 0 is less typical than any"""
+    
+    def __init__(self, segments):
+        self.labels, self.floors = self._feature_layout()
+        dense, ngrams = self.features(segments)
+        self.mean = dense.mean(axis=0)
+        self.spread = np.sqrt(dense.var(axis=0) + self.floors ** 2)
+        centroid = ngrams.sum(axis=0)
+        self.centroid = centroid / (np.linalg.norm(centroid) or 1)
+        similarity = ngrams @ self.centroid
+        self.similarity_mean, self.similarity_spread = similarity.mean(), max(similarity.std(), 0.02)
+        distances = self._distances(dense, ngrams)[0]
+        self.reference = np.sort(distances)
+        self.examples = [segments[i] for i in np.argsort(distances)[:3]]  # the most typical, as rewrite models
+    
+    @staticmethod
+    def _feature_layout():
+        edges = [0, *STYLE_SENTENCE_BINS.tolist()]
+        labels = [f'sentences of {lo + 1}-{hi} words (%)' for lo, hi in zip(edges, edges[1:])]
+        labels += [f'sentences over {edges[-1]} words (%)', 'average sentence length', 'sentence length spread',
+                   'average word length', 'contractions per 100 words']
+        floors = [10.0] * (len(STYLE_SENTENCE_BINS) + 1) + [3.0, 3.0, 0.3, 1.0]
+        labels += [f'"{w}" per 100 words' for w in STYLE_FUNCTION_WORDS]
+        labels += [f'"{p.strip()}" per 100 words' for p in STYLE_PUNCTUATION]
+        floors += [1.0] * (len(STYLE_FUNCTION_WORDS) + len(STYLE_PUNCTUATION))
+        return labels, np.array(floors)
+    
+    @staticmethod
+    def features(segments):
+        """Dense style features and L2-normalised hashed word 2-3 gram counts, one row per segment"""
+        function_index = {w: i for i, w in enumerate(STYLE_FUNCTION_WORDS)}
+        bins = len(STYLE_SENTENCE_BINS) + 1
+        dense = np.zeros((len(segments), bins + 4 + len(STYLE_FUNCTION_WORDS) + len(STYLE_PUNCTUATION)))
+        ngrams = np.zeros((len(segments), STYLE_NGRAM_BUCKETS))
+        for row, text in enumerate(segments):
+            words = STYLE_WORD.findall(text)
+            lower = [w.lower() for w in words]
+            per_100 = 100 / max(len(words), 1)
+            lengths = np.array([len(STYLE_WORD.findall(s)) for s in STYLE_SENTENCE.split(text)] or [0])
+            dense[row, :bins] = np.bincount(np.searchsorted(STYLE_SENTENCE_BINS, lengths, side='right'),
+                                            minlength=bins) * 100 / len(lengths)
+            dense[row, bins:bins + 4] = (lengths.mean(), lengths.std(), np.mean([len(w) for w in words] or [0]),
+                                         sum("'" in w for w in words) * per_100)
+            hits = [function_index[w] for w in lower if w in function_index]
+            start = bins + 4
+            dense[row, start:start + len(STYLE_FUNCTION_WORDS)] = np.bincount(
+                np.array(hits, dtype=int), minlength=len(STYLE_FUNCTION_WORDS)) * per_100
+            start += len(STYLE_FUNCTION_WORDS)
+            dense[row, start:] = [text.count(p) * per_100 for p in STYLE_PUNCTUATION]
+            grams = [' '.join(lower[i:i + n]) for n in (2, 3) for i in range(len(lower) - n + 1)]
+            if grams:
+                buckets = np.array([zlib.crc32(g.encode()) % STYLE_NGRAM_BUCKETS for g in grams])
+                counts = np.bincount(buckets, minlength=STYLE_NGRAM_BUCKETS).astype(float)
+                ngrams[row] = counts / np.linalg.norm(counts)
+        return dense, ngrams
+    
+    def _distances(self, dense, ngrams):
+        z = np.clip((dense - self.mean) / self.spread, -STYLE_Z_CLIP, STYLE_Z_CLIP)
+        phrasing = np.clip((self.similarity_mean - ngrams @ self.centroid) / self.similarity_spread, 0, STYLE_Z_CLIP)
+        return np.sqrt((np.square(z).sum(axis=1) + np.square(phrasing)) / (z.shape[1] + 1)), z, phrasing
+    
+    def voice(self, distances):
+        """0-100: the share of the candidate's own paragraphs that are less typical than these"""
+        return 100 * (1 - np.searchsorted(self.reference, distances, side='left') / len(self.reference))
+    
+    def check(self, text):
+        """Overall voice of a document and every scorable paragraph, with reasons for the flagged ones"""
+        segments = style_segments(text)
+        if not segments:
+            return {'voice': None, 'paragraphs': [], 'flagged': []}
+        dense, ngrams = self.features([p for _, p in segments])
+        distances, z, phrasing = self._distances(dense, ngrams)
+        voices = self.voice(distances)
+        paragraphs = []
+        for row, (index, paragraph) in enumerate(segments):
+            entry = {'index': index, 'words': len(paragraph.split()), 'voice': round(float(voices[row]))}
+            entry['flagged'] = entry['voice'] < STYLE_FLAG_VOICE
+            if entry['flagged']:
+                entry['reasons'] = self._reasons(dense[row], z[row], phrasing[row])
+            paragraphs.append(entry)
+        weights = np.array([p['words'] for p in paragraphs], dtype=float)
+        return {'voice': round(float(voices @ weights / weights.sum())), 'paragraphs': paragraphs,
+                'flagged': [p['index'] for p in paragraphs if p['flagged']]}
+    
+    def _reasons(self, values, z, phrasing, limit=3):
+        reasons = [f"{self.labels[i]}: {values[i]:.1f} (usually {self.mean[i]:.1f})"
+                   for i in np.argsort(-np.abs(z))[:limit] if abs(z[i]) >= 2]
+        if phrasing >= 2:
+            reasons.append('phrasing unlike their own writing')
+        return reasons
+
+def style_corpus(profile):
+    """Paragraphs the candidate actually wrote: past cover letters and prepared interview answers"""
+    texts = [letter.get('letter', '') for letter in profile.cover_letters]
+    texts += [qa.get('answer', '') for qa in profile.interview_qa]
+    return [p for text in texts for _, p in style_segments(text)]
+
+def get_style_fingerprint():
+    """The profile's fingerprint, or None while it has too little writing to learn a voice from"""
+    profile = current_profile()
+    
+    def build():
+        segments = style_corpus(profile)
+        return StyleFingerprint(segments) if len(segments) >= STYLE_MIN_SEGMENTS else None
+    return profile.get('style_fingerprint', build, ('cover_letters', 'interview_qa'))
+
+def voice_check(text):
+    fingerprint = get_style_fingerprint()
+    return fingerprint.check(text) if fingerprint else None
+
+def restyle_paragraphs(text, indices):
+    """Rewrite only the given paragraphs in the candidate's voice; the rest of the text is kept verbatim"""
+    fingerprint = get_style_fingerprint()
+    paragraphs = [p.strip() for p in re.split(r'\n\s*\n', text) if p.strip()]
+    indices = sorted({i for i in indices if 1 <= i <= len(paragraphs)})
+    if not indices:
+        return text
+    numbered = '\n\n'.join(f'[{i}] {p}' for i, p in enumerate(paragraphs, 1))
+    examples = '\n\n'.join(fingerprint.examples) if fingerprint else ''
+    reply = call_claude([{'role': 'user', 'content': f"""Here are paragraphs {current_profile().first_name} wrote themselves:
+
+{examples}
+
+This document (paragraphs numbered) has paragraphs that don't sound like them:
+
+{numbered}
+
+Rewrite only paragraphs {', '.join(map(str, indices))} so they read like the examples: match their sentence length,
+rhythm, punctuation and phrasing. Keep every fact, name and figure as stated.
+Output each rewritten paragraph on its own, starting with its [n] number, and nothing else."""}],
+        max_tokens=2 * sum(estimate_tokens(paragraphs[i - 1]) for i in indices) + 200, task='restyle')
+    for number, body in re.findall(r'^\[(\d+)\]\s*(.*?)(?=^\[\d+\]|\Z)', reply, re.M | re.S):
+        if int(number) in indices and body.strip():
+            paragraphs[int(number) - 1] = body.strip()
+    return '\n\n'.join(paragraphs)
+
+@app.route('/api/style/check', methods=['POST'])
+@requires_auth
+def api_style_check():
+    """Score a letter or answer against the candidate's own writing, locally; flags off-voice paragraphs"""
+    text = (request.json or {}).get('text', '')
+    if not text.strip():
+        return jsonify({'error': 'Text required'}), 400
+    result = voice_check(text)
+    if result is None:
+        return jsonify({'error': 'Not enough writing samples to learn a voice from'}), 422
+    return jsonify({'success': True, **result})
+
+@app.route('/api/style/fix', methods=['POST'])
+@requires_auth
+def api_style_fix():
+    """Regenerate just the off-voice paragraphs (or the ones given) instead of the whole document"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json or {}
+    text = data.get('text', '')
+    before = voice_check(text)
+    if before is None:
+        return jsonify({'error': 'Not enough writing samples to learn a voice from'}), 422
+    indices = data.get('paragraphs') or before['flagged']
+    if not indices:
+        return jsonify({'success': True, 'content': text, 'rewritten': [], **before})
     try:
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={
-                'Content-Type': 'application/json',
-                'x-api-key': ANTHROPIC_API_KEY,
-                'anthropic-version': '2023-06-01'
-            },
-            json={
-                'model': 'claude-sonnet-4-20250514',
-                'max_tokens': 2000,
-                'messages': [{'role': 'user', 'content': prompt}]
-            },
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            generated_text = result['content'][0]['text']
-            return jsonify({'success': True, 'content': generated_text})
-        else:
-            return jsonify({'error': f'API error: {response.status_code}'}), 500
-            
+        content = restyle_paragraphs(text, [int(i) for i in indices])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify({'success': True, 'content': content, 'rewritten': sorted(set(map(int, indices))),
+                    'voice_before': before['voice'], **voice_check(content)})
+
+# Letter variants: several generations in parallel, ranked locally
+LETTER_VARIANT_ANGLES = [
+    ('publishing', 'editorial depth and managing book projects end to end'),
+    ('gaming', 'a lifelong passion for games and years of entertainment writing'),
+    ('language', 'language craft, German fluency and international co-productions'),
+    ('ai', 'the recent AI project management training and a hands-on technical streak')
+]
+LETTER_TARGET_WORDS = (350, 450)
+LETTER_RANK_WEIGHTS = {'length': 0.3, 'coverage': 0.45, 'similarity': 0.25}
+LETTER_OUTCOME_WEIGHTS = {'offer': 1.0, 'interview': 1.0, 'applied': 0.5, 'pending': 0.5}  # rejected letters don't count
+GENERATION_EXECUTOR = ThreadPoolExecutor(max_workers=len(LETTER_VARIANT_ANGLES))  # also serves the bilingual bundle
+
+def letter_body_words(text):
+    """Word count between the salutation and the sign-off, the part the 350-450 target is about"""
+    body = re.split(r'^Dear [^\n]*$', text, maxsplit=1, flags=re.M)[-1]
+    body = re.split(r'^(Warm|Kind|Best) regards', body, maxsplit=1, flags=re.M | re.I)[0]
+    return len(body.split())
+
+def posting_keywords(job_description, limit=25):
+    counts = collections.Counter(fit_terms(job_description))
+    return [term for term, _ in counts.most_common(limit)]
+
+def reference_letters():
+    """Term sets of past letters that did not end in a rejection, with their outcome weight"""
+    profile = current_profile()
+    return profile.get('reference_letters', lambda: [
+        (set(fit_terms(letter.get('letter', ''))), LETTER_OUTCOME_WEIGHTS[letter.get('status')])
+        for letter in profile.cover_letters if letter.get('status') in LETTER_OUTCOME_WEIGHTS
+    ], ('cover_letters',))
+
+def rank_letters(letters, job_description=''):
+    """Score letters on length, posting keyword coverage and closeness to past letters that went well"""
+    low, high = LETTER_TARGET_WORDS
+    keywords = posting_keywords(job_description)
+    references = reference_letters()
+    ranked = []
+    for letter in letters:
+        words = letter_body_words(letter['content'])
+        length = 1.0 if low <= words <= high else max(0.0, 1 - (low - words if words < low else words - high) / low)
+        terms = set(fit_terms(letter['content']))
+        missing = [k for k in keywords if k not in terms]
+        coverage = 1 - len(missing) / len(keywords) if keywords else 0.0
+        similarity = max((len(terms & ref) / len(terms | ref) * weight for ref, weight in references if terms | ref),
+                         default=0.0)
+        score = (LETTER_RANK_WEIGHTS['length'] * length + LETTER_RANK_WEIGHTS['coverage'] * coverage
+                 + LETTER_RANK_WEIGHTS['similarity'] * similarity)
+        ranked.append({**letter, 'words': words, 'length_score': round(length, 2), 'keyword_coverage': round(coverage, 2),
+                       'missing_keywords': missing[:8], 'similarity': round(similarity, 2), 'score': round(10 * score, 1)})
+    ranked.sort(key=lambda r: -r['score'])
+    for rank, letter in enumerate(ranked, 1):
+        letter['rank'] = rank
+    return ranked
+
+def generate_letter_variants(prompt, count, job_description='', industry=None):
+    """Fire one generation per angle at once; the slowest call sets the wall-clock time"""
+    first = LETTER_HOOKS.get(industry)
+    angles = sorted(LETTER_VARIANT_ANGLES, key=lambda a: a[0] != first)[:count]
+    hooks = current_profile().data.get('cover_letter_style', {}).get('hooks', {})
+    futures = [
+        (hook, emphasis, GENERATION_EXECUTOR.submit(in_profile(call_claude), [{'role': 'user', 'content': f"""{prompt}
+
+VARIANT: Build the hook around this line from {current_profile().first_name}'s own letters: "{hooks.get(hook, '')}".
+Lead with {emphasis}; keep the other experience brief."""}], task='letter'))
+        for hook, emphasis in angles
+    ]
+    letters, errors = [], []
+    for hook, emphasis, future in futures:
+        try:
+            letters.append({'content': future.result(), 'hook': hook, 'emphasis': emphasis})
+        except Exception as e:
+            errors.append(str(e))
+    if not letters:
+        raise RuntimeError(errors[0])
+    ranked = rank_letters(letters, job_description)
+    for letter in ranked:
+        check = voice_check(letter['content'])
+        if check:
+            letter['voice'], letter['off_voice'] = check['voice'], check['flagged']
+    return {'variants': ranked, 'failed': len(errors)}
+
+@app.route('/api/generate', methods=['POST'])
+@requires_auth
+def api_generate():
+    """Generate cover letter or CV using Claude API with optional company research"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json
+    gen_type = data.get('type', 'letter')  # 'letter' or 'cv'
+    company = data.get('company', '[COMPANY]')
+    role = data.get('role', '[ROLE]')
+    job_description = data.get('job_description', '')
+    cv_style = data.get('cv_style', 'localisation')
+    company_research = data.get('company_research', '')  # Pre-fetched research
+    if not company_research and company.strip('[]') != 'COMPANY':
+        company_research = get_research(company, fetch=False)
+    try:
+        variants = min(max(int(data.get('variants') or 1), 1), len(LETTER_VARIANT_ANGLES)) if gen_type == 'letter' else 1
+    except (TypeError, ValueError):
+        return jsonify({'error': 'variants must be an integer'}), 400
+    job_description, usage = budget_job_description('cv' if gen_type == 'cv' else 'letter', job_description)
+    
+    prompt = generation_prompt(gen_type, company, role, job_description, cv_style, company_research)
+
+    if variants > 1:
+        try:
+            return jsonify({'success': True, 'input': usage,
+                            **generate_letter_variants(prompt, variants, job_description, data.get('industry'))})
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+    
+    try:
+        generated_text = call_claude([{'role': 'user', 'content': prompt}], task='cv' if gen_type == 'cv' else 'letter')
+        check = voice_check(generated_text) if gen_type == 'letter' else None
+        voice = {'voice': check['voice'], 'off_voice': check['flagged']} if check else {}
+        return jsonify({'success': True, 'content': generated_text, 'input': usage, **voice})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2824,16 +6334,210 @@ def manifest():
     return jsonify({
         "name": "Kyle",
         "short_name": "Kyle",
-        "start_url": "/",
+        "start_url": request.script_root + "/",
         "display": "standalone",
         "background_color": "#1a1a2e",
         "theme_color": "#1a1a2e",
         "icons": [{"src": "data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>🧠</text></svg>", "sizes": "any", "type": "image/svg+xml"}]
     })
 
+SERVICE_WORKER_JS = r'''
+const VERSION = '__VERSION__';
+// Each profile's worker is registered at its /p/<slug>/ prefix and only handles paths under it
+const BASE = new URL(self.registration.scope).pathname.replace(/\/$/, '');
+const SHELL_CACHE = 'kyle-shell-' + VERSION + '@' + BASE;
+const DATA_CACHE = 'kyle-data-' + VERSION + '@' + BASE;
+const SHELL_URLS = [BASE + '/', BASE + '/manifest.json'];
+const STALE_WHILE_REVALIDATE = ['/api/profile', '/api/letters', '/api/interview'];
+const NETWORK_FIRST = ['/api/applications', '/api/analytics'];
+const QUEUEABLE = ['/api/applications', '/api/analytics/events'];
+
+self.addEventListener('install', event => {
+    event.waitUntil(caches.open(SHELL_CACHE).then(cache => cache.addAll(SHELL_URLS)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    // A deploy changes VERSION, so every cache from the previous build is dropped here
+    event.waitUntil(caches.keys().then(keys => Promise.all(
+        keys.filter(key => key.startsWith('kyle-') && (key.endsWith('@' + BASE) || !key.includes('@'))
+            && key !== SHELL_CACHE && key !== DATA_CACHE)
+            .map(key => caches.delete(key))
+    )).then(() => self.clients.claim()));
+});
+
+function staleWhileRevalidate(request, cacheName) {
+    return caches.open(cacheName).then(cache => cache.match(request).then(cached => {
+        const network = fetch(request).then(response => {
+            if (response.ok) cache.put(request, response.clone());
+            return response;
+        });
+        if (cached) {
+            network.catch(() => {});
+            return cached;
+        }
+        return network;
+    }));
+}
+
+function networkFirst(request) {
+    return caches.open(DATA_CACHE).then(cache => fetch(request).then(response => {
+        if (response.ok) cache.put(request, response.clone());
+        return response;
+    }).catch(() => cache.match(request).then(cached => cached || Promise.reject(new Error('offline')))));
+}
+
+// Failed writes are kept in IndexedDB and replayed in order by background sync
+function openOutbox() {
+    return new Promise((resolve, reject) => {
+        const open = indexedDB.open('kyle-outbox', 1);
+        open.onupgradeneeded = () => open.result.createObjectStore('requests', {keyPath: 'id', autoIncrement: true});
+        open.onsuccess = () => resolve(open.result);
+        open.onerror = () => reject(open.error);
+    });
+}
+
+function outboxTx(mode, action) {
+    return openOutbox().then(db => new Promise((resolve, reject) => {
+        const tx = db.transaction('requests', mode);
+        const result = action(tx.objectStore('requests'));
+        tx.oncomplete = () => resolve(result.result);
+        tx.onerror = () => reject(tx.error);
+    }));
+}
+
+function queueRequest(request) {
+    return request.text().then(body => outboxTx('readwrite', store => store.add({
+        url: request.url,
+        method: request.method,
+        contentType: request.headers.get('Content-Type'),
+        body: body
+    }))).then(() => self.registration.sync ? self.registration.sync.register('kyle-replay') : null)
+      .then(() => new Response(JSON.stringify({success: true, queued: true}), {
+          status: 202, headers: {'Content-Type': 'application/json'}
+      }));
+}
+
+function replayOutbox() {
+    return outboxTx('readonly', store => store.getAll()).then(items => items.reduce((chain, item) => chain.then(() =>
+        fetch(item.url, {
+            method: item.method,
+            headers: item.contentType ? {'Content-Type': item.contentType} : {},
+            body: item.method === 'DELETE' ? undefined : item.body
+        }).then(response => {
+            // A 4xx will never succeed, so it is dropped; a server error (or an expired login or rate limit)
+            // keeps this request and everything after it queued, in order, for the next replay
+            if (response.status >= 500 || [401, 408, 429].includes(response.status)) {
+                throw new Error('Replay deferred: HTTP ' + response.status);
+            }
+            return outboxTx('readwrite', store => store.delete(item.id));
+        })
+    ), Promise.resolve()));
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (url.origin !== self.location.origin || !url.pathname.startsWith(BASE + '/')) return;
+    const path = url.pathname.slice(BASE.length);
+    if (path.startsWith('/p/')) return;  // another profile, handled by its own worker
+    
+    if (request.method !== 'GET') {
+        if (QUEUEABLE.some(prefix => path.startsWith(prefix))) {
+            const copy = request.clone();
+            event.respondWith(fetch(request).catch(() => queueRequest(copy)));
+        }
+        return;
+    }
+    // Only the dashboard itself is the app shell; opening an API URL in a tab must still show its JSON
+    if (SHELL_URLS.includes(url.pathname)) {
+        event.respondWith(staleWhileRevalidate(path === '/manifest.json' ? request : BASE + '/', SHELL_CACHE));
+    } else if (STALE_WHILE_REVALIDATE.includes(path)) {
+        event.respondWith(staleWhileRevalidate(request, DATA_CACHE));
+    } else if (NETWORK_FIRST.some(prefix => path.startsWith(prefix))) {
+        event.respondWith(networkFirst(request));
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === 'kyle-replay') event.waitUntil(replayOutbox());
+});
+
+self.addEventListener('message', event => {
+    // Browsers without Background Sync ask for a replay when they come back online
+    if (event.data === 'replay') event.waitUntil(replayOutbox().catch(() => {}));
+});
+'''
+
 @app.route('/sw.js')
 def service_worker():
-    return Response("self.addEventListener('fetch', function(event) {});", mimetype='application/javascript')
+    return Response(
+        SERVICE_WORKER_JS.replace('__VERSION__', asset_version(current_profile())),
+        mimetype='application/javascript',
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+# Interview feedback: cached per (question, answer, personality), score parsed here rather than in the browser
+FEEDBACK_PROFILE = """CHARLES'S BACKGROUND:
+- 10+ years in publishing/editorial
+- Published children's author (Penguin Random House SA)
+- Project management experience (20+ books/year)
+- Living in Germany since 2018, advanced German
+- Recent AI Project Management bootcamp"""
+
+INTERVIEW_FEEDBACK_TASK = """Provide constructive feedback on the candidate's interview answer. Be encouraging but honest.
+
+Structure your feedback as:
+1. **Score: X/10** - Overall rating
+2. **Strengths** - What worked well (2-3 points)
+3. **Improvements** - What could be better (2-3 points)
+4. **Suggested answer structure** - Brief guidance on how to frame it better
+5. **Key phrases to include** - Specific language that would strengthen the answer
+
+Keep feedback concise but actionable."""
+
+def interview_feedback_system():
+    return f"""You are Kyle, an interview coach helping {current_profile().name} practice for job interviews.
+
+{profile_prompt('feedback')}
+
+{INTERVIEW_FEEDBACK_TASK}"""
+
+FEEDBACK_WORKERS = 6
+FEEDBACK_EXECUTOR = ThreadPoolExecutor(max_workers=FEEDBACK_WORKERS)
+FEEDBACK_SCORE = re.compile(r'Score\W*(\d+(?:\.\d+)?)\s*(?:/|out of)\s*10', re.I)
+FEEDBACK_SECTION = re.compile(r'^\W*\d*\W*\*\*([^*]+?)\*\*', re.M)
+
+def parse_feedback(text):
+    """Score and the bullet points under each bold section heading of a feedback reply"""
+    match = FEEDBACK_SCORE.search(text) or re.search(r'Score\W*(\d+)', text, re.I)
+    score = min(float(match.group(1)), 10.0) if match else None
+    sections = {}
+    headings = list(FEEDBACK_SECTION.finditer(text))
+    for heading, following in zip(headings, headings[1:] + [None]):
+        body = text[heading.end():following.start() if following else len(text)]
+        points = [re.sub(r'^\s*(?:[-*•]|\d+[.)])\s*', '', line).strip() for line in body.splitlines()]
+        name = re.sub(r'\W+', '_', heading.group(1).split(':')[0].strip().lower()).strip('_')
+        sections[name] = [p for p in points if p and p not in '-–']
+    sections.pop('score', None)
+    return {'score': score, 'sections': sections}
+
+def feedback_key(question, answer, personality):
+    return hashlib.sha256(json.dumps([question.strip(), answer.strip(), personality]).encode('utf-8')).hexdigest()
+
+def score_interview_answer(question, answer, personality='professional'):
+    """Feedback for one practice answer, from cache when the same answer was scored before"""
+    key = feedback_key(question, answer, personality)
+    cached = cache_get('feedback', key, depends=prompt_sections('feedback') + ('profile',))
+    if cached is not None:
+        return {**cached, 'cached': True}
+    
+    feedback = call_claude(
+        [{'role': 'user', 'content': f'Interview Question: {question}\n\nMy Answer: {answer}\n\nPlease provide feedback.'}],
+        system=f"{interview_feedback_system()}\n\nDeliver the feedback in Kyle's {personality} voice.", task='feedback'
+    )
+    result = {'feedback': feedback, **parse_feedback(feedback)}
+    cache_put('feedback', key, result, depends=prompt_sections('feedback') + ('profile',))
+    return {**result, 'cached': False}
 
 @app.route('/api/interview-feedback', methods=['POST'])
 @requires_auth
@@ -2850,52 +6554,51 @@ def api_interview_feedback():
     if not question or not answer:
         return jsonify({'error': 'Question and answer required'}), 400
     
-    system_prompt = """You are Kyle, an interview coach helping Charles Siboto practice for job interviews. 
-
-Charles's background:
-- 10+ years in publishing/editorial
-- Published children's author (Penguin Random House SA)
-- Project management experience (20+ books/year)
-- Living in Germany since 2018, advanced German
-- Recent AI Project Management bootcamp
-
-Provide constructive feedback on his interview answer. Be encouraging but honest.
-
-Structure your feedback as:
-1. **Score: X/10** - Overall rating
-2. **Strengths** - What worked well (2-3 points)
-3. **Improvements** - What could be better (2-3 points)
-4. **Suggested answer structure** - Brief guidance on how to frame it better
-5. **Key phrases to include** - Specific language that would strengthen the answer
-
-Keep feedback concise but actionable."""
-
     try:
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={
-                'Content-Type': 'application/json',
-                'x-api-key': ANTHROPIC_API_KEY,
-                'anthropic-version': '2023-06-01'
-            },
-            json={
-                'model': 'claude-sonnet-4-20250514',
-                'max_tokens': 1000,
-                'system': system_prompt,
-                'messages': [{'role': 'user', 'content': f'Interview Question: {question}\n\nMy Answer: {answer}\n\nPlease provide feedback.'}]
-            },
-            timeout=60
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            return jsonify({'success': True, 'feedback': result['content'][0]['text']})
-        else:
-            return jsonify({'error': f'API error: {response.status_code}'}), 500
-            
+        result = score_interview_answer(question, answer, personality)
+        return jsonify({'success': True, **result})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/interview-feedback/batch', methods=['POST'])
+@requires_auth
+def api_interview_feedback_batch():
+    """Score a whole mock-interview session at once; repeated answers come from the cache"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json or {}
+    personality = data.get('personality', 'professional')
+    answers = data.get('answers', [])
+    if not isinstance(answers, list) or not all(
+        isinstance(a, dict) and all(isinstance(a.get(f, ''), str) for f in ('question', 'answer')) for a in answers
+    ):
+        return jsonify({'error': 'answers must be a list of {question, answer} objects'}), 400
+    answers = [a for a in answers if a.get('question') and a.get('answer')]
+    if not answers:
+        return jsonify({'error': 'Answers required'}), 400
+    
+    # The same answer asked twice in one session is scored once
+    pending = {}
+    for a in answers:
+        key = feedback_key(a['question'], a['answer'], personality)
+        if key not in pending:
+            pending[key] = FEEDBACK_EXECUTOR.submit(in_profile(score_interview_answer), a['question'], a['answer'], personality)
+    futures = [pending[feedback_key(a['question'], a['answer'], personality)] for a in answers]
+    results = []
+    for a, future in zip(answers, futures):
+        try:
+            results.append({'question': a['question'], **future.result()})
+        except Exception as e:
+            results.append({'question': a['question'], 'error': str(e)})
+    scores = [r['score'] for r in results if r.get('score') is not None]
+    return jsonify({
+        'success': True,
+        'results': results,
+        'average': round(sum(scores) / len(scores), 1) if scores else None,
+        'cached': sum(1 for r in results if r.get('cached'))
+    })
+
 @app.route('/api/german-letter', methods=['POST'])
 @requires_auth
 def api_german_letter():
@@ -2911,53 +6614,658 @@ def api_german_letter():
     if not company or not role:
         return jsonify({'error': 'Company and role required'}), 400
     
-    system_prompt = """Du bist Kyle, ein KI-Assistent, der Charles Siboto bei Bewerbungen auf dem deutschen Arbeitsmarkt hilft.
 
-CHARLES SIBOTOS PROFIL:
-- Über 10 Jahre Erfahrung im Verlagswesen und in der digitalen Medienproduktion
-- Veröffentlichter Kinderbuchautor bei Penguin Random House Südafrika
-- Projektmanagement-Erfahrung: 20+ Bücher jährlich bei Jonathan Ball Publishers
-- Seit 2018 in Deutschland, fortgeschrittene Deutschkenntnisse
-- AI Project Management Weiterbildung bei neuefische GmbH (Agile Scrum)
-- BA Language Practice, University of Johannesburg
-- Verfügbar ab: 1. März 2026
-- Gehaltsvorstellung: €50.000 - €58.000
+    try:
+        job_description, usage = budget_job_description('german', job_description)
+        prompt = german_letter_prompt(company, role, job_description)
+        letter = call_claude([{'role': 'user', 'content': prompt}], system=german_letter_system(), task='german')
+        return jsonify({'success': True, 'letter': letter, 'input': usage})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-Schreibe ein professionelles Anschreiben auf Deutsch. Verwende formelle Sprache (Sie-Form). Das Anschreiben sollte:
-- Authentisch und nicht zu förmlich klingen
-- Spezifische Erfahrungen hervorheben, die zur Stelle passen
-- Die Motivation für diese spezielle Position zeigen
-- Etwa 3-4 Absätze lang sein"""
+# Bilingual bundle: English and German letters written at once from the same facts
+MONTHS = {name: i for i, names in enumerate([
+    (), ('january', 'januar'), ('february', 'februar'), ('march', 'märz', 'maerz'), ('april',), ('may', 'mai'),
+    ('june', 'juni'), ('july', 'juli'), ('august',), ('september',), ('october', 'oktober'), ('november',),
+    ('december', 'dezember')
+]) for name in names}
+CLAIM_DATE = re.compile(r'\b(?:(\d{1,2})(?:st|nd|rd|th|\.)?\s+)?(' + '|'.join(MONTHS) + r')\s+(\d{4})\b', re.I)
+CLAIM_MONEY = re.compile(r'\b\d{1,3}(?:[.,]\d{3})+\b')  # thousands-grouped amounts; in a letter that is the salary
+CLAIM_FIGURE = re.compile(r'(?<![\d.,+])(\d{1,3})\s?(\+|%|\s?Prozent|\s?percent)?(?![\d.,])', re.I)
+
+def application_facts():
+    """The claims both languages must state identically, taken from the profile"""
+    profile = current_profile().data.get('profile', {})
+    since = profile.get('living_in_germany_since')
+    return '\n'.join([
+        'FACTS (state these exactly as given and do not introduce other figures or dates):',
+        f"- Available from: {format_long_date(profile.get('available_from', ''))}",
+        f"- Salary expectation: {profile.get('salary_expectation', '')} per year",
+        *([f'- Living in Germany since: {since}'] if since else []),
+        '- Only cite achievement numbers (titles per year, years of experience, percentages) from the profile'
+    ])
+
+def letter_claims(text):
+    """Dates, salary figures, other numbers and former employers stated in a letter, language-neutral"""
+    profile = current_profile().data.get('profile', {})
+    for contact in (profile.get('phone'), profile.get('email')):
+        text = text.replace(contact or '\0', '')
+    dates = {f'{year}-{MONTHS[month.lower()]:02d}' + (f'-{int(day):02d}' if day else '')
+             for day, month, year in CLAIM_DATE.findall(text)}
+    text = CLAIM_DATE.sub(' ', text)
+    money = {int(re.sub(r'\D', '', amount)) for amount in CLAIM_MONEY.findall(text)}
+    text = CLAIM_MONEY.sub(' ', text)
+    figures = {n + ('%' if unit.strip().lower() in ('%', 'prozent', 'percent') else '') for n, unit in CLAIM_FIGURE.findall(text)}
+    years = set(re.findall(r'\b(?:19|20)\d{2}\b', text))
+    words = ' ' + ' '.join(entity_words(text)) + ' '
+    employers = {exp['company'] for exp in current_profile().data.get('experience', [])
+                 if ' ' + ' '.join(entity_words(exp['company'])[:2]) + ' ' in words}
+    return {'dates': dates, 'salary': money, 'figures': figures, 'years': years, 'employers': employers}
+
+def compare_letter_claims(english, german):
+    """Claims that appear in only one of the two letters"""
+    en, de = letter_claims(english), letter_claims(german)
+    mismatches = {}
+    for kind in en:
+        en_only, de_only = sorted(map(str, en[kind] - de[kind])), sorted(map(str, de[kind] - en[kind]))
+        if en_only or de_only:
+            mismatches[kind] = {'english_only': en_only, 'german_only': de_only}
+    return {'consistent': not mismatches, 'mismatches': mismatches}
+
+def generate_bilingual(company, role, job_description='', company_research='', check=True):
+    """Both letters from the same research and facts; wall-clock is the slower of the two calls"""
+    facts = application_facts()
+    job_description, usage = budget_job_description('letter', job_description)
+    english = GENERATION_EXECUTOR.submit(in_profile(call_claude), [{'role': 'user', 'content': generation_prompt(
+        'letter', company, role, job_description, company_research=company_research, facts=facts)}], task='letter')
+    german = GENERATION_EXECUTOR.submit(in_profile(call_claude), [{'role': 'user', 'content': german_letter_prompt(
+        company, role, job_description, company_research, facts)}], system=german_letter_system(), task='german')
+    bundle = {'english': english.result(), 'german': german.result(), 'input': usage}
+    bundle['consistency'] = compare_letter_claims(bundle['english'], bundle['german']) if check else None
+    return bundle
+
+@app.route('/api/bilingual-letter', methods=['POST'])
+@requires_auth
+def api_bilingual_letter():
+    """English and German cover letters for the same application, generated concurrently"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json or {}
+    company = data.get('company', '')
+    role = data.get('role', '')
+    if not company or not role:
+        return jsonify({'error': 'Company and role required'}), 400
+    company_research = data.get('company_research') or get_research(company, fetch=False)
+    
+    try:
+        bundle = generate_bilingual(company, role, data.get('job_description', ''), company_research,
+                                    check=data.get('check', True))
+        return jsonify({'success': True, **bundle})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
+@app.route('/api/applications', methods=['GET'])
+@requires_auth
+def api_list_applications():
+    """Paginated tracker listing, filterable by status, company and industry"""
+    conn = get_db()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+    
+    where, params = [], []
+    for field in ('status', 'industry'):
+        if request.args.get(field):
+            where.append(f'{field} = ?')
+            params.append(request.args[field])
+    if request.args.get('company'):
+        where.append('company = ? COLLATE NOCASE')
+        params.append(request.args['company'])
+    clause = ('WHERE ' + ' AND '.join(where)) if where else ''
+    
+    total = conn.execute(f'SELECT COUNT(*) FROM applications {clause}', params).fetchone()[0]
+    rows = conn.execute(
+        f'SELECT * FROM applications {clause} ORDER BY date DESC, id DESC LIMIT ? OFFSET ?',
+        params + [per_page, (page - 1) * per_page]
+    ).fetchall()
+    return jsonify({
+        'applications': [dict(r) for r in rows],
+        'page': page,
+        'per_page': per_page,
+        'total': total
+    })
+
+@app.route('/api/applications', methods=['POST'])
+@requires_auth
+def api_add_application():
     try:
-        prompt = f'Schreibe ein Anschreiben für die Position "{role}" bei {company}.'
-        if job_description:
-            prompt += f'\n\nStellenbeschreibung:\n{job_description}'
-        
-        response = requests.post(
-            'https://api.anthropic.com/v1/messages',
-            headers={
-                'Content-Type': 'application/json',
-                'x-api-key': ANTHROPIC_API_KEY,
-                'anthropic-version': '2023-06-01'
-            },
-            json={
-                'model': 'claude-sonnet-4-20250514',
-                'max_tokens': 1500,
-                'system': system_prompt,
-                'messages': [{'role': 'user', 'content': prompt}]
-            },
-            timeout=60
+        application = save_application(get_db(), request.json or {})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'application': application}), 201
+
+@app.route('/api/applications/<uid>', methods=['PUT', 'PATCH'])
+@requires_auth
+def api_update_application(uid):
+    conn = get_db()
+    if not conn.execute('SELECT 1 FROM applications WHERE uid = ?', (uid,)).fetchone():
+        return jsonify({'error': 'Application not found'}), 404
+    try:
+        application = save_application(conn, request.json or {}, uid=uid)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'success': True, 'application': application})
+
+@app.route('/api/applications/<uid>', methods=['DELETE'])
+@requires_auth
+def api_delete_application(uid):
+    if not delete_application(get_db(), uid):
+        return jsonify({'error': 'Application not found'}), 404
+    return jsonify({'success': True})
+
+@app.route('/api/applications/stats')
+@requires_auth
+def api_application_stats():
+    """Aggregate counters, maintained on write rather than computed per request"""
+    stats = {'total': 0, 'status': {}, 'week': {}, 'industry': {}}
+    for row in get_db().execute('SELECT kind, key, count FROM app_counters WHERE count != 0'):
+        if row['kind'] == 'total':
+            stats['total'] = row['count']
+        else:
+            stats.setdefault(row['kind'], {})[row['key']] = row['count']
+    today = datetime.date.today()
+    stats['this_month'] = sum(n for day, n in stats.get('day', {}).items()
+                              if today.replace(day=1).isoformat() <= day <= today.isoformat())
+    return jsonify(stats)
+
+ANALYTICS_EVENTS = ['ai_use', 'url_analyzed']
+
+def _streak(conn, today):
+    """Consecutive days with applications, ending today or yesterday"""
+    days = [r[0] for r in conn.execute(
+        "SELECT key FROM app_counters WHERE kind = 'day' AND count > 0 AND key <= ? "
+        "ORDER BY key DESC LIMIT 400", (today.isoformat(),)
+    )]
+    streak = 0
+    expected = today
+    for day in days:
+        if day == expected.isoformat():
+            streak += 1
+        elif streak == 0 and day == (today - datetime.timedelta(days=1)).isoformat():
+            streak, expected = 1, today - datetime.timedelta(days=1)
+        else:
+            break
+        expected -= datetime.timedelta(days=1)
+    return streak
+
+@app.route('/api/analytics')
+@requires_auth
+def api_analytics():
+    """Stats tab numbers, read from the materialized counters only"""
+    conn = get_db()
+    today = datetime.date.today()
+    counters = {}
+    for row in conn.execute("SELECT kind, key, count FROM app_counters WHERE kind IN ('status', 'total', 'event')"):
+        counters[(row['kind'], row['key'])] = row['count']
+    
+    week_start = today - datetime.timedelta(days=6)
+    daily = dict(conn.execute(
+        "SELECT key, count FROM app_counters WHERE kind = 'day' AND key BETWEEN ? AND ?",
+        (min(week_start, today.replace(day=1)).isoformat(), today.isoformat())
+    ).fetchall())
+    weekly = [0] * 7  # Monday first
+    for offset in range(7):
+        day = week_start + datetime.timedelta(days=offset)
+        weekly[day.weekday()] += daily.get(day.isoformat(), 0)
+    this_month = sum(n for day, n in daily.items() if day >= today.replace(day=1).isoformat())
+    
+    funnel = {s: counters.get(('status', s), 0) for s in APP_STATUSES}
+    total = counters.get(('total', 'all'), 0)
+    responses = funnel['interview'] + funnel['offer']
+    streak = _streak(conn, today)
+    ai_uses = counters.get(('event', 'ai_use'), 0)
+    urls_analyzed = counters.get(('event', 'url_analyzed'), 0)
+    
+    return jsonify({
+        'total': total,
+        'response_rate': round(responses / total * 100) if total else 0,
+        'streak': streak,
+        'this_month': this_month,
+        'funnel': funnel,
+        'weekly': weekly,
+        'ai_uses': ai_uses,
+        'urls_analyzed': urls_analyzed,
+        'achievements': [
+            total >= 1, total >= 5, total >= 10, streak >= 3,
+            funnel['interview'] >= 1, funnel['offer'] >= 1,
+            ai_uses >= 10, urls_analyzed >= 3
+        ]
+    })
+
+@app.route('/api/analytics/events', methods=['POST'])
+@requires_auth
+def api_analytics_event():
+    data = request.json or {}
+    event = data.get('event', '')
+    if event not in ANALYTICS_EVENTS:
+        return jsonify({'error': f"Event must be one of: {', '.join(ANALYTICS_EVENTS)}"}), 400
+    bump_event(get_db(), event)
+    return jsonify({'success': True})
+
+SYNC_STORES = ['applications', 'memory', 'practice', 'ai_uses']
+SYNC_BATCH = 500
+
+def apply_sync_change(conn, change, device):
+    """Last-writer-wins on (updated_at, device); returns False if the server copy is newer"""
+    if not isinstance(change, dict):
+        raise ValueError('Invalid sync record')
+    store, key = change.get('store'), str(change.get('key', ''))
+    if store not in SYNC_STORES or not key:
+        raise ValueError(f'Invalid sync record: {store}/{key}')
+    updated_at = float(change.get('updated_at') or time.time())
+    deleted = bool(change.get('deleted'))
+    existing = conn.execute(
+        'SELECT updated_at, device FROM sync_records WHERE store = ? AND key = ?', (store, key)
+    ).fetchone()
+    if existing and (existing['updated_at'], existing['device']) >= (updated_at, device):
+        return False
+    
+    if store == 'applications':
+        if deleted:
+            if not delete_application(conn, key, device, updated_at):
+                with conn:
+                    log_change(conn, store, key, None, updated_at, device, deleted=True)
+        else:
+            save_application(conn, change.get('value') or {}, uid=key, device=device, updated_at=updated_at)
+    else:
+        with conn:
+            log_change(conn, store, key, change.get('value'), updated_at, device, deleted)
+    return True
+
+@app.route('/api/sync', methods=['POST'])
+@requires_auth
+def api_sync():
+    """Exchange records changed since the device's cursor, SYNC_BATCH at a time"""
+    body = request.get_data()
+    try:
+        if request.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        data = json.loads(body or b'{}')
+    except (OSError, EOFError, ValueError):
+        return jsonify({'error': 'Invalid JSON'}), 400
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Invalid JSON'}), 400
+    
+    device = str(data.get('device', ''))
+    changes = data.get('changes', [])
+    try:
+        cursor = int(data.get('cursor', 0))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'cursor must be an integer'}), 400
+    if not device:
+        return jsonify({'error': 'Device ID required'}), 400
+    if not isinstance(changes, list):
+        return jsonify({'error': 'changes must be a list'}), 400
+    if len(changes) > SYNC_BATCH:
+        return jsonify({'error': f'At most {SYNC_BATCH} changes per request'}), 413
+    
+    conn = get_db()
+    rejected = []
+    for change in changes:
+        # A change that loses to a newer server copy, or is invalid, is rejected on its own; the rest still apply
+        try:
+            if not apply_sync_change(conn, change, device):
+                rejected.append({'store': change['store'], 'key': str(change['key'])})
+        except (TypeError, ValueError) as e:
+            store, key = (change.get('store'), change.get('key')) if isinstance(change, dict) else (None, None)
+            rejected.append({'store': store, 'key': None if key is None else str(key), 'error': str(e)})
+    
+    # Read the high-water mark first so concurrent writers can't be skipped
+    high = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM sync_records').fetchone()[0]
+    rows = conn.execute(
+        'SELECT * FROM sync_records WHERE seq > ? AND seq <= ? AND device != ? ORDER BY seq LIMIT ?',
+        (cursor, high, device, SYNC_BATCH)
+    ).fetchall()
+    more = len(rows) == SYNC_BATCH
+    new_cursor = rows[-1]['seq'] if more else max(cursor, high)
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO sync_devices (device, cursor, last_seen) VALUES (?, ?, ?)',
+            (device, new_cursor, time.time())
         )
+    
+    payload = json.dumps({
+        'cursor': new_cursor,
+        'more': more,
+        'rejected': rejected,
+        'changes': [{
+            'store': r['store'],
+            'key': r['key'],
+            'value': json.loads(r['value']) if r['value'] is not None else None,
+            'updated_at': r['updated_at'],
+            'deleted': bool(r['deleted'])
+        } for r in rows]
+    }).encode('utf-8')
+    response = Response(payload, mimetype='application/json')
+    if len(payload) > 1024 and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response.set_data(gzip.compress(payload))
+        response.headers['Content-Encoding'] = 'gzip'
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+# Letter drafting: an instant local draft, then a streamed LLM edit of it
+LETTER_HOOKS = {'gaming': 'gaming', 'publishing': 'publishing', 'streaming': 'language', 'education': 'language'}
+LETTER_CV_VERSIONS = {
+    'gaming': 'localisation_pm',
+    'publishing': 'product_manager',
+    'streaming': 'product_language_manager',
+    'education': 'localisation_pm'
+}
+
+def _words(text):
+    return set(re.findall(r'[a-zäöüß]+', (text or '').lower()))
+
+def format_long_date(value):
+    """'2026-03-01' -> '1 March 2026'; anything unparseable is returned as-is"""
+    try:
+        d = datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    return f'{d.day} {d.strftime("%B %Y")}'
+
+def pick_cv_version(role, industry=None):
+    """Choose the cv_versions entry whose target roles best match the role title"""
+    versions = current_profile().data.get('cv_versions', {})
+    role_words = _words(role)
+    best, best_overlap = None, 0
+    for key, version in versions.items():
+        overlap = max((len(role_words & _words(t)) for t in version.get('target_roles', [])), default=0)
+        if overlap > best_overlap:
+            best, best_overlap = key, overlap
+    return best or LETTER_CV_VERSIONS.get(industry, next(iter(versions), None))
+
+def _highlight_sentence(company, highlight):
+    first, _, rest = highlight.partition(' ')
+    verb = first.lower()
+    if verb.endswith('ing'):
+        verb = 'am ' + verb
+    return f'At {company}, I {verb} {rest}'.rstrip('.') + '.'
+
+def build_letter_draft(company, role, industry='publishing', job_description=''):
+    """Assemble a cover letter from cover_letter_style, cv_versions and profile facts"""
+    data = current_profile().data
+    profile = data.get('profile', {})
+    style = data.get('cover_letter_style', {})
+    cv_key = pick_cv_version(role, industry)
+    summary = data.get('cv_versions', {}).get(cv_key, {}).get('summary', '')
+    
+    opening = style.get('opening', 'I am writing to apply for the [ROLE] position at [COMPANY].')
+    opening = opening.replace('[ROLE]', role).replace('[COMPANY]', company)
+    hook = style.get('hooks', {}).get(LETTER_HOOKS.get(industry, 'publishing'), '')
+    intro = f'{opening} {hook}, I would welcome the chance to bring that experience to {company}.' if hook else opening
+    
+    # The two highlights sharing most words with the role and posting
+    target = _words(f'{role} {job_description} {industry}')
+    highlights = [
+        (len(target & _words(h)), -i, exp.get('company', ''), h)
+        for i, exp in enumerate(data.get('experience', []))
+        for h in exp.get('highlights', [])[:2]
+    ]
+    highlights.sort(reverse=True)
+    evidence = ' '.join(_highlight_sentence(c, h) for _, _, c, h in highlights[:2])
+    
+    paragraphs = [
+        contact_header(profile),
+        format_long_date(datetime.date.today().isoformat()),
+        'Dear Hiring Team,',
+        intro,
+        (f'I am a {summary[0].lower()}{summary[1:]} ' if summary else '') + evidence,
+        *([f"Having lived in Germany since {profile['living_in_germany_since']}, I am comfortable working in "
+           f"both English and German, and I bring a proactive, positive attitude to every team I join."]
+          if profile.get('living_in_germany_since') else []),
+        f"I am available to start from {format_long_date(profile.get('available_from', ''))}, and my salary "
+        f"expectation is {profile.get('salary_expectation', '')} annually. Thank you for considering my application.",
+        style.get('signature', f'Warm regards,\n{current_profile().name}').replace('\n', '\n\n', 1)
+    ]
+    return '\n\n'.join(paragraphs), cv_key
+
+KEEP_MARKER = re.compile(r'\[KEEP (\d+)\]')
+
+def expand_keep_markers(chunks, paragraphs):
+    """Replace '[KEEP n]' lines in a text stream with draft paragraph n, passing other text straight through"""
+    pending = ''
+    at_line_start = True
+    for chunk in chunks:
+        out = []
+        for ch in chunk:
+            if pending:
+                pending += ch
+                if ch == '\n':
+                    match = KEEP_MARKER.fullmatch(pending.strip())
+                    index = int(match.group(1)) - 1 if match else -1
+                    out.append(paragraphs[index] + '\n' if 0 <= index < len(paragraphs) else pending)
+                    pending, at_line_start = '', True
+                elif not re.fullmatch(r'\[(K(E(E(P( \d*\]?)?)?)?)?)?', pending):
+                    out.append(pending)
+                    pending, at_line_start = '', False
+            elif at_line_start and ch == '[':
+                pending = ch
+            else:
+                out.append(ch)
+                at_line_start = ch == '\n'
+        if out:
+            yield ''.join(out)
+    if pending:
+        match = KEEP_MARKER.fullmatch(pending.strip())
+        index = int(match.group(1)) - 1 if match else -1
+        yield paragraphs[index] if 0 <= index < len(paragraphs) else pending
+
+@app.route('/api/letter/draft', methods=['POST'])
+@requires_auth
+def api_letter_draft():
+    """Instant template letter built from the profile, no LLM call"""
+    data = request.json or {}
+    draft, cv_version = build_letter_draft(
+        data.get('company') or '[COMPANY]',
+        data.get('role') or '[ROLE]',
+        data.get('industry', 'publishing'),
+        data.get('job_description', '')
+    )
+    return jsonify({'success': True, 'draft': draft, 'cv_version': cv_version})
+
+@app.route('/api/letter/refine', methods=['POST'])
+@requires_auth
+def api_letter_refine():
+    """Stream an LLM edit of a draft; unchanged paragraphs cost a marker, not their full text"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json or {}
+    draft = data.get('draft', '')
+    company = data.get('company', '[COMPANY]')
+    role = data.get('role', '[ROLE]')
+    if not draft:
+        return jsonify({'error': 'Draft required'}), 400
+    
+    paragraphs = [p.strip() for p in draft.split('\n\n') if p.strip()]
+    numbered = '\n\n'.join(f'[{i}] {p}' for i, p in enumerate(paragraphs, 1))
+    context = ''
+    if data.get('job_description'):
+        context += f"\nJOB DESCRIPTION:\n{data['job_description']}\n"
+    company_research = data.get('company_research') or get_research(company, fetch=False)
+    if company_research:
+        context += f"\nCOMPANY RESEARCH ON {company.upper()}:\n{company_research}\n"
+    
+    prompt = f"""Edit this draft cover letter for {current_profile().name} applying to {company} for the role of {role}.
+{context}
+DRAFT (paragraphs numbered):
+{numbered}
+
+Edit rather than rewrite: tailor the hook and evidence to the role and company, tighten wording, keep every fact as stated and stay within 350-450 words.
+Output the finished letter paragraph by paragraph, separated by blank lines, without the [n] numbers.
+For any paragraph you leave exactly as it is, output only the line [KEEP n] in its place.
+Output nothing except the letter."""
+
+    def generate():
+        try:
+            chunks = stream_claude([{'role': 'user', 'content': prompt}],
+                                   max_tokens=estimate_tokens(draft) * 3 // 2 + 300, task='refine')
+            yield from expand_keep_markers(chunks, paragraphs)
+        except Exception as e:
+            yield f'\n\n[Refinement stopped: {e}]'
+    
+    return Response(stream_with_context(generate()), mimetype='text/plain',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
+
+# Application pack: research, analysis, letter, CV and German letter run as a dependency graph
+PACK_STAGES = {
+    'research': (),
+    'analysis': (),
+    'letter': ('research', 'analysis'),
+    'cv': ('research', 'analysis'),
+    'german': ('research', 'analysis')
+}
+PACK_INPUTS = {  # the request fields each stage's cached result depends on, besides its dependencies
+    'research': ('company',),
+    'analysis': ('company', 'role', 'job_description'),
+    'letter': ('company', 'role', 'job_description'),
+    'cv': ('company', 'role', 'job_description', 'cv_style'),
+    'german': ('company', 'role', 'job_description')
+}
+PACK_PROMPTS = {'analysis': 'analysis', 'letter': 'letter', 'cv': 'letter', 'german': 'german'}
+
+def pack_stage_sections(stage):
+    """Profile sections a stage's prompt is built from; research depends on the company alone"""
+    return tuple(sorted(set(prompt_sections(PACK_PROMPTS[stage])) | {'profile'})) if stage in PACK_PROMPTS else ()
+PACK_EXECUTOR = ThreadPoolExecutor(max_workers=8)
+
+def _pack_guidance(analysis):
+    """What the analysis tells the writing stages to work in"""
+    lines = []
+    if analysis.get('keywords_to_include'):
+        lines.append('KEYWORDS TO WORK IN NATURALLY: ' + ', '.join(analysis['keywords_to_include']))
+    if analysis.get('opening_hook'):
+        lines.append(f"SUGGESTED OPENING HOOK: {analysis['opening_hook']}")
+    return '\n'.join(lines + [application_facts()])
+
+def _pack_research(inputs, deps):
+    return get_research(inputs['company'])
+
+def _pack_analysis(inputs, deps):
+    if not inputs['job_description']:
+        return {}
+    return analyze_posting(inputs['company'], inputs['role'], inputs['job_description'])['analysis']
+
+def _pack_letter(inputs, deps):
+    job_description = budget_job_description('letter', inputs['job_description'])[0]
+    prompt = generation_prompt('letter', inputs['company'], inputs['role'], job_description,
+                               company_research=deps['research'], facts=_pack_guidance(deps['analysis']))
+    return call_claude([{'role': 'user', 'content': prompt}], task='letter')
+
+def _pack_cv(inputs, deps):
+    cv_style = inputs['cv_style'] or deps['analysis'].get('cv_version') or 'localisation'
+    job_description = budget_job_description('cv', inputs['job_description'])[0]
+    prompt = generation_prompt('cv', inputs['company'], inputs['role'], job_description, cv_style,
+                               company_research=deps['research'], facts=_pack_guidance(deps['analysis']))
+    return call_claude([{'role': 'user', 'content': prompt}], task='cv')
+
+def _pack_german(inputs, deps):
+    job_description = budget_job_description('german', inputs['job_description'])[0]
+    prompt = german_letter_prompt(inputs['company'], inputs['role'], job_description,
+                                  deps['research'], _pack_guidance(deps['analysis']))
+    return call_claude([{'role': 'user', 'content': prompt}], system=german_letter_system(), task='german')
+
+PACK_RUNNERS = {'research': _pack_research, 'analysis': _pack_analysis, 'letter': _pack_letter,
+                'cv': _pack_cv, 'german': _pack_german}
+
+def pack_stage_key(stage, inputs, deps):
+    """Cache key over the stage's own inputs and its dependencies' results"""
+    material = json.dumps([stage, [inputs[f] for f in PACK_INPUTS[stage]], deps], sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def run_pack(inputs, stages=None, force=()):
+    """Run the requested stages (and what they need) as soon as their dependencies are done;
+    yields a progress event whenever a stage starts, finishes, is served from cache or fails"""
+    wanted, todo = set(), list(stages or PACK_STAGES)
+    while todo:
+        stage = todo.pop()
+        if stage in PACK_STAGES and stage not in wanted:
+            wanted.add(stage)
+            todo.extend(PACK_STAGES[stage])
+    
+    started = time.perf_counter()
+    results, failed, running = {}, set(), {}
+    while True:
+        scheduled = True
+        while scheduled:
+            scheduled = False
+            for stage in PACK_STAGES:
+                if stage not in wanted or stage in results or stage in failed or stage in running.values():
+                    continue
+                needs = PACK_STAGES[stage]
+                if any(d in failed for d in needs):
+                    failed.add(stage)
+                    scheduled = True
+                    yield {'stage': stage, 'status': 'skipped'}
+                elif all(d in results for d in needs):
+                    deps = {d: results[d] for d in needs}
+                    key = pack_stage_key(stage, inputs, deps)
+                    cached = None if stage in force else cache_get('pack', key, RESEARCH_TTL, pack_stage_sections(stage))
+                    if cached is not None:
+                        results[stage] = cached
+                        scheduled = True
+                        yield {'stage': stage, 'status': 'cached', 'result': cached}
+                    else:
+                        running[PACK_EXECUTOR.submit(in_profile(PACK_RUNNERS[stage]), inputs, deps)] = stage
+                        yield {'stage': stage, 'status': 'started'}
         
-        if response.status_code == 200:
-            result = response.json()
-            return jsonify({'success': True, 'letter': result['content'][0]['text']})
-        else:
-            return jsonify({'error': f'API error: {response.status_code}'}), 500
-            
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        if not running:
+            break
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            stage = running.pop(future)
+            try:
+                results[stage] = future.result()
+            except Exception as e:
+                failed.add(stage)
+                yield {'stage': stage, 'status': 'error', 'error': str(e)}
+                continue
+            deps = {d: results[d] for d in PACK_STAGES[stage]}
+            cache_put('pack', pack_stage_key(stage, inputs, deps), results[stage], pack_stage_sections(stage))
+            yield {'stage': stage, 'status': 'done', 'result': results[stage]}
+    yield {'status': 'complete', 'failed': sorted(failed), 'seconds': round(time.perf_counter() - started, 2)}
+
+def pack_stage_list(value, field):
+    """value as a list of known stage names (empty when not given); raises ValueError"""
+    if not value:
+        return []
+    if not isinstance(value, list) or not all(isinstance(s, str) and s in PACK_STAGES for s in value):
+        raise ValueError(f"{field} must be a list of stages: {', '.join(PACK_STAGES)}")
+    return value
+
+@app.route('/api/pack', methods=['POST'])
+@requires_auth
+def api_pack():
+    """Research, fit analysis, letter, CV and German letter in one run, streamed as NDJSON progress events"""
+    if not ANTHROPIC_API_KEY:
+        return jsonify({'error': 'API key not configured'}), 500
+    
+    data = request.json or {}
+    inputs = {field: (data.get(field) or '').strip() for field in ('company', 'role', 'job_description', 'cv_style')}
+    if not inputs['company'] or not inputs['role']:
+        return jsonify({'error': 'Company and role required'}), 400
+    try:
+        stages = pack_stage_list(data.get('stages'), 'stages') or list(PACK_STAGES)
+        force = PACK_STAGES if data.get('force') is True else set(pack_stage_list(data.get('force'), 'force'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def generate():
+        for event in run_pack(inputs, stages, force):
+            yield json.dumps(event) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={'X-Accel-Buffering': 'no', 'Cache-Control': 'no-cache'})
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
@@ -2966,9 +7274,10 @@ if __name__ == '__main__':
     print("\n" + "="*50)
     print("KYLE - JOB APPLICATION ASSISTANT")
     print("="*50)
-    print(f"\n✓ Profile: {bool(PROFILE)}")
-    print(f"✓ Interview Q&A: {len(INTERVIEW_QA)} items")
-    print(f"✓ Cover Letters: {len(COVER_LETTERS)} examples")
+    default = PROFILES.get(DEFAULT_PROFILE)
+    print(f"\n✓ Profile: {bool(default.data)}")
+    print(f"✓ Interview Q&A: {len(default.interview_qa)} items")
+    print(f"✓ Cover Letters: {len(default.cover_letters)} examples")
     if PASSWORD:
         print("✓ Password protection: ENABLED")
     print(f"\n👉 Open: http://127.0.0.1:{port}\n")
@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE = tempfile.mkdtemp(prefix='kyle-tests-')
+
+# The app reads its configuration at import and the default profile from the working directory
+os.environ['KYLE_DB'] = os.path.join(STATE, 'kyle.db')
+os.environ['KYLE_PROFILES_DIR'] = os.path.join(STATE, 'profiles')
+os.environ['KYLE_INGEST_DIR'] = os.path.join(STATE, 'ingest')
+os.environ['KYLE_WARM_HOURS'] = 'off'
+os.environ.pop('PASSWORD', None)
+os.environ.pop('ANTHROPIC_API_KEY', None)
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+import app as kyle  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return kyle.app.test_client()
+
+
+@pytest.fixture
+def ctx():
+    """A request context on the default profile, for calling helpers directly"""
+    with kyle.app.test_request_context():
+        kyle.app.preprocess_request()
+        yield kyle
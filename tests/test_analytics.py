@@ -0,0 +1,29 @@
+import datetime
+
+import pytest
+
+
+def analytics(client):
+    return client.get('/api/analytics').get_json()
+
+
+def test_events_count_one_each(client):
+    before = analytics(client)['ai_uses']
+    assert client.post('/api/analytics/events', json={'event': 'ai_use', 'count': 10 ** 9}).status_code == 200
+    assert client.post('/api/analytics/events', json={'event': 'ai_use'}).status_code == 200
+    assert analytics(client)['ai_uses'] == before + 2
+
+
+@pytest.mark.parametrize('event', ['page_view', '', None])
+def test_unknown_events_are_rejected(client, event):
+    assert client.post('/api/analytics/events', json={'event': event}).status_code == 400
+
+
+def test_funnel_follows_applications(client):
+    before = analytics(client)
+    client.post('/api/applications', json={'company': 'Funnel AG', 'status': 'interview',
+                                                'date': datetime.date.today().isoformat()})
+    after = analytics(client)
+    assert after['total'] == before['total'] + 1
+    assert after['funnel']['interview'] == before['funnel']['interview'] + 1
+    assert after['this_month'] >= 1 and after['streak'] >= 1
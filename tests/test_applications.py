@@ -0,0 +1,90 @@
+import datetime
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import app as kyle
+
+
+def stats(client):
+    return client.get('/api/applications/stats').get_json()
+
+
+def test_crud_keeps_counters_in_step(client):
+    before = stats(client)
+    created = client.post('/api/applications', json={'company': 'Carlsen', 'role': 'Editor', 'status': 'applied',
+                                                     'date': '2026-03-02'})
+    assert created.status_code == 201
+    uid = created.get_json()['application']['uid']
+    assert created.get_json()['application']['industry'] == 'publishing'
+
+    after = stats(client)
+    assert after['total'] == before['total'] + 1
+    assert after['status']['applied'] == before['status'].get('applied', 0) + 1
+
+    client.patch(f'/api/applications/{uid}', json={'status': 'interview'})
+    moved = stats(client)
+    assert moved['status'].get('applied', 0) == before['status'].get('applied', 0)
+    assert moved['status']['interview'] == before['status'].get('interview', 0) + 1
+
+    assert client.delete(f'/api/applications/{uid}').status_code == 200
+    assert stats(client)['total'] == before['total']
+    assert client.delete(f'/api/applications/{uid}').status_code == 404
+
+
+def test_invalid_application_is_rejected(client):
+    assert client.post('/api/applications', json={'role': 'Editor'}).status_code == 400
+    assert client.post('/api/applications', json={'company': 'X', 'status': 'ghosted'}).status_code == 400
+
+
+def test_filters_and_pagination(client):
+    for i in range(3):
+        client.post('/api/applications', json={'company': 'Filter GmbH', 'role': f'Role {i}', 'status': 'rejected'})
+    page = client.get('/api/applications?company=filter gmbh&per_page=2').get_json()
+    assert page['total'] == 3 and len(page['applications']) == 2
+    assert all(a['company'] == 'Filter GmbH' for a in page['applications'])
+
+
+def test_device_only_application_uploaded_through_sync_is_listed(client):
+    change = {'store': 'applications', 'key': 'local-dev1-abc123', 'updated_at': 1.0,
+              'value': {'company': 'Legacy Verlag', 'role': 'Proofreader', 'date': '2024-05-01',
+                        'status': 'rejected', 'notes': 'from localStorage'}}
+    response = client.post('/api/sync', json={'device': 'dev1', 'cursor': 0, 'changes': [change]})
+    assert response.status_code == 200 and response.get_json()['rejected'] == []
+    listed = client.get('/api/applications?company=Legacy Verlag').get_json()['applications']
+    assert [(a['uid'], a['notes']) for a in listed] == [('local-dev1-abc123', 'from localStorage')]
+
+
+def test_page_keeps_device_only_applications_when_loading():
+    page = kyle.HTML_TEMPLATE
+    assert "applications.filter(a => !a.uid || syncState.outbox['applications|' + a.uid])" in page
+
+
+def test_stats_count_this_calendar_month(client):
+    before = stats(client)['this_month']
+    today = datetime.date.today()
+    client.post('/api/applications', json={'company': 'Monat Verlag', 'date': today.isoformat()})
+    last_month = today.replace(day=1) - datetime.timedelta(days=1)
+    client.post('/api/applications', json={'company': 'Monat Verlag', 'date': last_month.isoformat()})
+    assert stats(client)['this_month'] == before + 1
+
+
+@pytest.mark.skipif(not shutil.which('node'), reason='needs node')
+def test_page_loads_every_page_of_applications():
+    function = re.search(r'async function fetchAllApplications\(\) \{.*?\n        \}\n', kyle.HTML_TEMPLATE, re.S).group(0)
+    script = function + """
+const rows = Array.from({length: 450}, (_, i) => ({uid: 'a' + i}));
+const calls = [];
+global.fetch = async url => {
+    calls.push(url);
+    const params = new URL(url, 'http://x').searchParams;
+    const size = +params.get('per_page'), page = +params.get('page');
+    return {ok: true, json: async () => ({applications: rows.slice((page - 1) * size, page * size), total: rows.length})};
+};
+fetchAllApplications().then(all => console.log(JSON.stringify([all.length, calls.length])));
+"""
+    result = subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == [450, 3]
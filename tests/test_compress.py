@@ -0,0 +1,67 @@
+from app import compress_job_description, estimate_tokens
+
+SECTIONED_AD = """Content Editor (m/w/d)
+What we offer:
+- 30 days of vacation
+- Flexible hours and a Deutschlandticket
+Who you are
+- 3+ years of experience in editorial work
+- Solid knowledge of data protection (GDPR)
+- Fluent German and English
+"""
+
+NOISY_AD = """We use cookies to improve your experience. See our Privacy Policy.
+Senior Localisation Editor
+Your tasks:
+- Own the English localisation of dialogue for two titles
+- Review and edit translations from German into English
+Your profile
+- 5+ years of experience in game localisation or editing
+- Solid knowledge of data protection (GDPR)
+What we offer
+- 30 days of vacation
+- Free snacks, team events and a gym membership
+Acme Games is an equal opportunity employer. We welcome applicants regardless of race, gender, age or religion.
+Apply now! Share this job.
+"""
+
+
+def test_under_budget_text_is_unchanged_but_for_repeated_lines():
+    ad = SECTIONED_AD + '- Fluent German and English\n'
+    text, usage = compress_job_description(ad, 1500)
+    assert text == SECTIONED_AD.rstrip('\n')
+    assert usage['dropped'] == {'duplicate': 1}
+    assert usage['tokens_before'] == estimate_tokens(ad)
+
+
+def test_any_header_ends_a_dropped_section():
+    text, usage = compress_job_description(SECTIONED_AD, 30)
+    assert '30 days of vacation' not in text
+    assert '3+ years of experience in editorial work' in text
+    assert 'Solid knowledge of data protection (GDPR)' in text
+
+
+def test_boilerplate_lines_go_but_requirements_mentioning_them_stay():
+    text, usage = compress_job_description(NOISY_AD * 20, 400)
+    assert 'cookies' not in text
+    assert 'equal opportunity' not in text
+    assert 'Share this job' not in text
+    assert 'gym membership' not in text
+    assert 'Solid knowledge of data protection (GDPR)' in text
+    assert text.count('Own the English localisation') == 1
+    assert usage['tokens_after'] <= 400
+    assert usage['tokens_saved'] == usage['tokens_before'] - usage['tokens_after']
+
+
+def test_budget_drops_non_requirements_first():
+    ad = NOISY_AD + '\n'.join(f'Our studio story, chapter {i}, is long and winding.' for i in range(200))
+    text, usage = compress_job_description(ad, 120)
+    assert 'chapter 199' not in text
+    assert usage['tokens_after'] <= 120
+    assert '5+ years of experience in game localisation or editing' in text
+    assert usage['dropped']['budget'] > 0
+
+
+def test_empty_description():
+    assert compress_job_description('', 100) == ('', {'tokens_before': 0, 'tokens_after': 0, 'tokens_saved': 0,
+                                                      'budget': 100, 'dropped': {}})
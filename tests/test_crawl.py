@@ -0,0 +1,40 @@
+import pytest
+
+import app as kyle
+
+
+def test_scope_follows_same_site_under_the_seed_directory():
+    in_scope = kyle.crawl_scope('https://www.writer.example/author/charles/index.html')
+    assert in_scope('https://writer.example/author/charles/books')
+    assert not in_scope('https://writer.example/author/someone-else/')
+    assert not in_scope('https://other.example/author/charles/')
+    assert kyle.crawl_scope('https://writer.example/', r'^/reviews/')('https://writer.example/reviews/1')
+
+
+def test_merge_skills_counts_batches_and_drops_known():
+    merged = kyle.merge_skills([['Video editing', 'InDesign'], ['video  editing', 'Copy-editing']], known=['indesign'])
+    assert merged == [{'skill': 'Video editing', 'mentions': 2}, {'skill': 'Copy-editing', 'mentions': 1}]
+
+
+@pytest.mark.parametrize('max_pages', ['lots', [5]])
+def test_max_pages_must_be_an_integer(client, monkeypatch, max_pages):
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    response = client.post('/api/analyze-url/crawl', json={'url': 'https://writer.example/', 'max_pages': max_pages})
+    assert response.status_code == 400
+
+
+def test_crawl_learns_from_linked_pages_once(ctx, monkeypatch):
+    site = {
+        'https://writer.example/a/': ('Index', 'links', ['https://writer.example/a/1', 'https://writer.example/a/2',
+                                                         'https://elsewhere.example/a/3']),
+        'https://writer.example/a/1': ('One', 'Reviewed films for a magazine.', ['https://writer.example/a/2']),
+        'https://writer.example/a/2': ('Two', 'Reviewed  films for a magazine.', []),
+    }
+    monkeypatch.setattr(kyle, 'fetch_page', lambda url: dict(zip(('title', 'text', 'links'), site[url]), status='fetched'))
+    monkeypatch.setattr(kyle, 'extract_batch_skills', lambda pages: ['Film criticism'] * len(pages))
+    events = list(kyle.crawl_site('https://writer.example/a/', max_pages=10))
+    complete = events[-1]
+    assert complete['event'] == 'complete'
+    assert (complete['learned_from'], complete['duplicates']) == (1, 1)
+    assert [s['skill'] for s in complete['skills']] == ['Film criticism']
+    assert not any(e.get('url') == 'https://elsewhere.example/a/3' for e in events)
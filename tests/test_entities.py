@@ -0,0 +1,42 @@
+import app as kyle
+
+PROFILE = {
+    'target_companies': {
+        'high_priority': {'publishing': ['Arena Verlag', 'Carlsen'], 'gaming': ['InnoGames']},
+        'low_priority_too_competitive': ['Nintendo'],
+    },
+    'application_history': {'applications': [{'company': 'Freaks 4U Gaming'}]},
+}
+
+
+def matcher():
+    return kyle.CompanyMatcher(PROFILE, extra_aliases={'InnoGames': ['Inno Games']})
+
+
+def test_mentions_are_found_with_tier_and_offsets():
+    text = 'Applied to Carlsen and Inno Games; heard back from Freaks 4U Gaming.'
+    found = matcher().find(text)
+    assert [(m['company'], m['tier'], m['group']) for m in found] == [
+        ('Carlsen', 'high', 'publishing'), ('InnoGames', 'high', 'gaming'), ('Freaks 4U Gaming', None, None)]
+    assert [text[m['start']:m['end']] for m in found] == ['Carlsen', 'Inno Games', 'Freaks 4U Gaming']
+
+
+def test_short_alias_that_is_a_common_word_needs_a_capital():
+    assert [m['company'] for m in matcher().find('Arena is hiring an editor')] == ['Arena Verlag']
+    assert matcher().find('a sports arena near Kassel') == []
+
+
+def test_longest_alias_wins():
+    found = matcher().find('Arena Verlag announced its programme')
+    assert [(m['company'], m['text']) for m in found] == [('Arena Verlag', 'Arena Verlag')]
+
+
+def test_resolve_name_prefers_exact_alias():
+    assert matcher().resolve_name('inno games')['company'] == 'InnoGames'
+    assert matcher().resolve_name('Unknown GmbH') is None
+
+
+def test_entities_endpoint_tags_many_texts(client):
+    results = client.post('/api/entities', json={'texts': ['Ravensburger job', 'nothing here']}).get_json()['results']
+    assert [m['company'] for m in results[0]] == ['Ravensburger'] and results[1] == []
+    assert client.post('/api/entities', json={}).status_code == 400
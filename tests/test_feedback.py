@@ -0,0 +1,49 @@
+import pytest
+
+import app as kyle
+
+REPLY = """**Score: 7/10**
+
+**Strengths:**
+- Clear structure
+- Concrete numbers
+
+**Areas to improve:**
+1. Mention the team size
+2. Shorter ending
+"""
+
+
+def test_feedback_is_parsed_into_score_and_sections():
+    parsed = kyle.parse_feedback(REPLY)
+    assert parsed['score'] == 7.0
+    assert parsed['sections'] == {'strengths': ['Clear structure', 'Concrete numbers'],
+                                  'areas_to_improve': ['Mention the team size', 'Shorter ending']}
+    assert kyle.parse_feedback('No score given')['score'] is None
+
+
+def test_batch_scores_each_distinct_answer_once(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setattr(kyle, 'call_claude', lambda messages, **kwargs: calls.append(messages) or REPLY)
+    answers = [{'question': 'Why us?', 'answer': 'I love your quest design.'},
+               {'question': 'Strengths?', 'answer': 'Editing under deadline.'}]
+    first = client.post('/api/interview-feedback/batch', json={'answers': answers}).get_json()
+    assert first['average'] == 7.0 and first['cached'] == 0 and len(calls) == 2
+    again = client.post('/api/interview-feedback/batch', json={'answers': answers + [{'question': 'x'}]}).get_json()
+    assert again['cached'] == 2 and len(again['results']) == 2 and len(calls) == 2
+
+
+def test_repeats_within_a_batch_are_scored_once(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setattr(kyle, 'call_claude', lambda messages, **kwargs: calls.append(messages) or REPLY)
+    answer = {'question': 'Biggest mistake?', 'answer': 'Shipping a build with untranslated credits.'}
+    result = client.post('/api/interview-feedback/batch', json={'answers': [answer, dict(answer)]}).get_json()
+    assert len(calls) == 1 and [r['score'] for r in result['results']] == [7.0, 7.0]
+
+
+@pytest.mark.parametrize('answers', [['Why us?'], [{'question': 'Why us?', 'answer': 42}], {'question': 'Why us?'}])
+def test_malformed_answers_are_rejected(client, monkeypatch, answers):
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    assert client.post('/api/interview-feedback/batch', json={'answers': answers}).status_code == 400
@@ -0,0 +1,124 @@
+import socket
+
+import pytest
+
+import app as kyle
+
+PUBLIC = '93.184.216.34'
+
+
+class FakeResponse:
+    def __init__(self, url, status=200, body=b'', headers=None):
+        self.url, self.status_code, self.body = url, status, body
+        self.headers = {'Content-Type': 'text/html; charset=utf-8', **(headers or {})}
+        self.is_redirect = status in (301, 302, 303, 307, 308) and 'Location' in self.headers
+
+    def iter_content(self, size):
+        for start in range(0, len(self.body), size):
+            yield self.body[start:start + size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeSession:
+    """Serves canned responses by URL and records the requests made"""
+
+    def __init__(self, routes):
+        self.routes, self.requests = routes, []
+
+    def get(self, url, headers=None, **kwargs):
+        assert kwargs.get('allow_redirects') is False
+        self.requests.append((url, dict(headers or {})))
+        return self.routes[url](url, headers or {})
+
+
+@pytest.fixture
+def web(monkeypatch):
+    real = socket.getaddrinfo
+
+    def resolve(host, port, *args, **kwargs):
+        if host.endswith('.example'):
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (PUBLIC, port))]
+        return real(host, port, *args, **kwargs)
+
+    monkeypatch.setattr(kyle.socket, 'getaddrinfo', resolve)
+    session = FakeSession({})
+    monkeypatch.setattr(kyle, 'fetch_session', lambda: session)
+    return session
+
+
+@pytest.mark.parametrize('url', ['http://127.0.0.1/admin', 'http://localhost:5000/', 'http://169.254.169.254/latest/meta-data',
+                                 'http://10.0.0.7/', 'http://[::1]/', 'ftp://files.example/', 'http://192.168.1.1/'])
+def test_private_and_non_http_urls_are_refused(ctx, web, url):
+    with pytest.raises(ValueError):
+        kyle.fetch_page(url)
+    assert web.requests == []
+
+
+def test_every_redirect_hop_is_checked(ctx, web):
+    web.routes['https://jobs.example/post'] = lambda url, h: FakeResponse(
+        url, 302, headers={'Location': 'http://169.254.169.254/latest/meta-data'})
+    with pytest.raises(ValueError, match='not a public address'):
+        kyle.fetch_page('https://jobs.example/post')
+    assert [url for url, _ in web.requests] == ['https://jobs.example/post']
+
+
+def test_redirects_are_followed_and_pages_revalidated(ctx, web):
+    page = b'<html><title>Editor</title><body><p>Edit books.</p><a href="/apply">Apply</a></body></html>'
+    web.routes['https://jobs.example/a'] = lambda url, h: FakeResponse(url, 301, headers={'Location': '/b'})
+    web.routes['https://jobs.example/b'] = lambda url, h: (
+        FakeResponse(url, 304) if h.get('If-None-Match') == '"v1"' else FakeResponse(url, body=page, headers={'ETag': '"v1"'}))
+    first = kyle.fetch_page('https://jobs.example/a')
+    assert (first['status'], first['title'], first['url']) == ('fetched', 'Editor', 'https://jobs.example/b')
+    assert 'https://jobs.example/apply' in first['links']
+    assert kyle.fetch_page('https://jobs.example/a')['status'] == 'revalidated'
+
+
+def test_expired_pages_are_fetched_afresh_and_pruned(ctx, web, monkeypatch):
+    web.routes['https://old.example/'] = lambda url, h: FakeResponse(url, body=b'<p>Hi</p>', headers={'ETag': '"x"'})
+    kyle.fetch_page('https://old.example/')
+    conn = kyle.get_db()
+    with conn:
+        conn.execute("UPDATE llm_cache SET created_at = created_at - ? WHERE namespace = 'page'", (kyle.PAGE_CACHE_TTL + 1,))
+    web.routes['https://new.example/'] = lambda url, h: FakeResponse(url, body=b'<p>New</p>')
+    kyle.fetch_page('https://new.example/')
+    assert conn.execute("SELECT COUNT(*) FROM llm_cache WHERE namespace = 'page' AND key = 'https://old.example/'").fetchone()[0] == 0
+    assert kyle.fetch_page('https://old.example/')['status'] == 'fetched'
+    assert 'If-None-Match' not in web.requests[-1][1]
+
+
+def test_oversized_pages_are_refused(ctx, web, monkeypatch):
+    monkeypatch.setattr(kyle, 'FETCH_MAX_BYTES', 100_000)
+    web.routes['https://big.example/'] = lambda url, h: FakeResponse(url, body=b'x' * 200_000)
+    with pytest.raises(ValueError, match='too large'):
+        kyle.fetch_page('https://big.example/')
+
+
+def test_pages_without_validators_are_cached_for_the_ttl(ctx, web):
+    web.routes['https://plain.example/'] = lambda url, h: FakeResponse(url, body=b'<p>Static</p>')
+    assert kyle.fetch_page('https://plain.example/')['status'] == 'fetched'
+    assert kyle.fetch_page('https://plain.example/')['status'] == 'cached'
+    assert [url for url, _ in web.requests] == ['https://plain.example/']
+
+
+def test_connections_go_to_the_address_that_was_checked(monkeypatch):
+    answers = iter([PUBLIC, '127.0.0.1'])
+    monkeypatch.setattr(kyle.socket, 'getaddrinfo', lambda host, port, *a, **k: [
+        (socket.AF_INET, socket.SOCK_STREAM, 6, '', (next(answers), port))])
+    connected = []
+    monkeypatch.setattr(kyle.urllib3.util.connection, 'create_connection',
+                        lambda address, *a, **k: connected.append(address) or socket.socket())
+    pool = kyle.fetch_session().get_adapter('https://rebind.example/').poolmanager.connection_from_url('https://rebind.example/')
+    assert pool.ConnectionCls is kyle.PublicHTTPSConnection
+    pool.ConnectionCls('rebind.example', 443)._new_conn().close()
+    assert connected == [(PUBLIC, 443)]
+    with pytest.raises(ValueError, match='not a public address'):
+        kyle.PublicHTTPConnection('rebind.example', 80)._new_conn()
+    assert connected == [(PUBLIC, 443)]
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+import app as kyle
+
+
+class Crash(BaseException):
+    """Stands in for the process dying"""
+
+
+def upload(client, monkeypatch, postings, query=''):
+    monkeypatch.setattr(kyle, 'start_ingest_job', lambda job_id: None)
+    body = '\n'.join(json.dumps(p) for p in postings)
+    response = client.post('/api/ingest?format=jsonl&top=5' + query, data=body)
+    assert response.status_code == 202
+    return response.get_json()['job_id']
+
+
+def feed(prefix, count):
+    return [{'company': f'{prefix} Verlag {i}', 'title': 'Editor',
+             'description': f'Edit and proofread children\'s books, posting {prefix}-{i}. German and English.'}
+            for i in range(count)]
+
+
+def test_restart_before_checkpoint_reprocesses_the_batch(client, ctx, monkeypatch):
+    monkeypatch.setattr(kyle, 'INGEST_BATCH', 10)
+    monkeypatch.setattr(kyle, 'INGEST_WORKERS', 1)
+    job_id = upload(client, monkeypatch, feed('restart', 30))
+    
+    checkpoint = kyle.IngestJob._checkpoint
+    def crash_first(self, *args, **kwargs):
+        monkeypatch.setattr(kyle.IngestJob, '_checkpoint', checkpoint)
+        raise Crash()
+    monkeypatch.setattr(kyle.IngestJob, '_checkpoint', crash_first)
+    with pytest.raises(Crash):
+        kyle.IngestJob(job_id).run()
+    
+    row = kyle.get_db().execute('SELECT * FROM ingest_jobs WHERE id = ?', (job_id,)).fetchone()
+    assert (row['status'], row['offset'], row['rows_read']) == ('running', 0, 0)
+    
+    kyle.IngestJob(job_id).run()
+    row = kyle.get_db().execute('SELECT * FROM ingest_jobs WHERE id = ?', (job_id,)).fetchone()
+    assert row['status'] == 'done'
+    assert (row['rows_read'], row['rows_kept'], row['duplicates']) == (30, 30, 0)
+    candidates = client.get(f'/api/ingest/{job_id}/candidates').get_json()
+    assert len(candidates['candidates']) == 5
+
+
+def test_earlier_feeds_are_skipped_only_when_asked(client, ctx, monkeypatch):
+    monkeypatch.setattr(kyle, 'INGEST_WORKERS', 1)
+    postings = feed('again', 12)
+    first = upload(client, monkeypatch, postings)
+    kyle.IngestJob(first).run()
+    reupload = upload(client, monkeypatch, postings + postings[:2])
+    kyle.IngestJob(reupload).run()
+    row = kyle.get_db().execute('SELECT * FROM ingest_jobs WHERE id = ?', (reupload,)).fetchone()
+    assert (row['rows_kept'], row['duplicates']) == (12, 2)
+    second = upload(client, monkeypatch, postings[:6] + feed('new', 3), '&skip_seen=1')
+    kyle.IngestJob(second).run()
+    row = kyle.get_db().execute('SELECT * FROM ingest_jobs WHERE id = ?', (second,)).fetchone()
+    assert (row['rows_kept'], row['duplicates']) == (3, 6)
+
+
+def test_status_does_not_reveal_the_upload_path(client, monkeypatch):
+    job_id = upload(client, monkeypatch, feed('path', 1))
+    status = client.get(f'/api/ingest/{job_id}').get_json()
+    assert 'path' not in status and status['size'] > 0
+
+
+def test_migration_keeps_hashes_seen_before_jobs_were_recorded(tmp_path):
+    conn = kyle.sqlite3.connect(tmp_path / 'old.db')
+    conn.row_factory = kyle.sqlite3.Row
+    conn.executescript(kyle.TRACKER_SCHEMA)
+    conn.executescript('DROP TABLE ingest_seen; CREATE TABLE ingest_seen (hash TEXT PRIMARY KEY) WITHOUT ROWID; '
+                       "INSERT INTO ingest_seen VALUES ('abc');")
+    conn.execute('PRAGMA user_version = 5')
+    kyle._migrate(conn)
+    assert [tuple(r) for r in conn.execute('SELECT hash, job_id FROM ingest_seen')] == [('abc', '')]
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import app as kyle
+
+SHARED = ('my years steering translated picture books through tight print schedules taught me '
+          'to keep translators illustrators and printers moving in step')
+
+
+def letter(opening):
+    return f'{opening}\n\n{SHARED}.\n\nI would welcome a conversation about the role.'
+
+
+def test_winnowing_catches_any_run_of_guaranteed_length():
+    words = [f'w{i}' for i in range(60)]
+    _, first, _ = kyle.winnow(' '.join(words))
+    guaranteed = kyle.WINNOW_K + kyle.WINNOW_WINDOW - 1
+    for start in range(0, 60 - guaranteed):
+        run = ' '.join(['x'] * 5 + words[start:start + guaranteed] + ['y'] * 5)
+        assert np.isin(kyle.winnow(run)[1], first).any()
+
+
+def test_winnow_of_short_text_is_empty():
+    spans, hashes, positions = kyle.winnow('too short')
+    assert len(spans) == 2 and len(hashes) == 0 and len(positions) == 0
+
+
+def test_archiving_the_same_letter_twice_adds_it_once(client):
+    body = {'company': 'Ravensburger', 'role': 'Editor', 'letter': letter('Dear Ravensburger team,')}
+    first = client.post('/api/letters/archive', json=body)
+    again = client.post('/api/letters/archive', json={**body, 'company': ' ravensburger '})
+    assert first.status_code == 201 and again.status_code == 200
+    assert again.get_json() == {'success': True, 'id': first.get_json()['id'], 'duplicate': True}
+    elsewhere = client.post('/api/letters/archive', json={**body, 'company': 'Carlsen'})
+    assert elsewhere.status_code == 201
+
+
+def test_reuse_report_names_the_letters_a_passage_went_to(client):
+    client.post('/api/letters/archive', json={'company': 'Oetinger', 'role': 'Producer', 'letter': letter('Hello Oetinger,')})
+    report = client.post('/api/letters/reuse', json={'letter': letter('Dear Arena Verlag,')}).get_json()
+    assert report['letters_matched'] >= 1
+    passage = next(p for p in report['passages'] if 'picture books' in p['text'])
+    assert passage['words'] >= kyle.REUSE_MIN_WORDS
+    assert 'Oetinger' in {l['company'] for l in passage['letters']}
+
+
+def test_reuse_report_shape_is_the_same_without_matches(client):
+    report = client.post('/api/letters/reuse', json={'letter': 'Zebra quartz vortex nimbly jousting fjord.'}).get_json()
+    assert report == {'success': True, 'reused_share': 0.0, 'passages': [], 'letters': [], 'letters_matched': 0}
+
+
+def test_migration_collapses_duplicate_archive_rows(tmp_path):
+    conn = kyle.sqlite3.connect(tmp_path / 'old.db')
+    conn.row_factory = kyle.sqlite3.Row
+    conn.executescript(kyle.TRACKER_SCHEMA)
+    for company in ('Loewe', 'loewe', 'Thienemann'):
+        conn.execute('INSERT INTO letter_archive (company, letter, hashes, positions, created_at) VALUES (?, ?, ?, ?, 0)',
+                     (company, 'Same letter.', b'', b''))
+    conn.execute('PRAGMA user_version = 3')
+    kyle._migrate(conn)
+    rows = conn.execute('SELECT company, digest FROM letter_archive ORDER BY id').fetchall()
+    assert [r['company'] for r in rows] == ['Loewe', 'Thienemann'] and all(r['digest'] for r in rows)
+
+
+def test_variants_must_be_an_integer(client, monkeypatch):
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setattr(kyle, 'call_claude', lambda *a, **k: pytest.fail('no call for a bad request'))
+    response = client.post('/api/generate', json={'company': '[COMPANY]', 'variants': 'three'})
+    assert response.status_code == 400
@@ -0,0 +1,49 @@
+import pytest
+
+import app as kyle
+
+
+def test_draft_is_built_locally_for_the_company(client):
+    result = client.post('/api/letter/draft', json={'company': 'Loewe Verlag', 'role': 'Localisation Producer'}).get_json()
+    assert result['success'] and result['cv_version']
+    assert 'Loewe Verlag' in result['draft'] and 'Dear Hiring Team,' in result['draft']
+    assert '[COMPANY]' not in result['draft'] and '[ROLE]' not in result['draft']
+
+
+@pytest.mark.parametrize('size', [1, 2, 5, 100])
+def test_keep_markers_expand_across_chunk_boundaries(size):
+    stream = 'New opening.\n[KEEP 2]\n[KEEP 9]\n[not a marker]\nLast line [KEEP 1]\n[KEEP 1]'
+    chunks = [stream[i:i + size] for i in range(0, len(stream), size)]
+    out = ''.join(kyle.expand_keep_markers(chunks, ['First para.', 'Second para.']))
+    assert out == 'New opening.\nSecond para.\n[KEEP 9]\n[not a marker]\nLast line [KEEP 1]\nFirst para.'
+
+
+def test_letters_are_ranked_on_length_coverage_and_past_letters(ctx):
+    job = 'Localisation producer for games: translation vendors, schedules, German and English.'
+    body = ' '.join(['I coordinate translation vendors and schedules for games in German and English.'] * 30)
+    on_target = {'content': f'Dear Team,\n\n{body}\n\nKind regards', 'id': 'good'}
+    short = {'content': 'Dear Team,\n\nI like books.\n\nKind regards', 'id': 'short'}
+    ranked = kyle.rank_letters([short, on_target], job)
+    assert [r['id'] for r in ranked] == ['good', 'short'] and [r['rank'] for r in ranked] == [1, 2]
+    assert ranked[0]['keyword_coverage'] > ranked[1]['keyword_coverage']
+    assert ranked[1]['length_score'] < 0.1 and 'translation' in ranked[1]['missing_keywords']
+
+
+def test_bilingual_claims_are_compared_language_neutrally(ctx):
+    english = 'I am available from 1 March 2026 and expect €52,000 per year. I have lived in Germany since 2018.'
+    german = 'Ich bin ab dem 1. März 2026 verfügbar und erwarte 52.000 € im Jahr. Ich lebe seit 2018 in Deutschland.'
+    assert kyle.compare_letter_claims(english, german) == {'consistent': True, 'mismatches': {}}
+    drifted = kyle.compare_letter_claims(english, german.replace('2018', '2019'))
+    assert drifted['mismatches'] == {'years': {'english_only': ['2018'], 'german_only': ['2019']}}
+
+
+def test_drafts_and_facts_state_only_what_the_profile_has(ctx):
+    data = {'profile': {'name': 'Ana Lima', 'available_from': '2026-05-01', 'salary_expectation': '€45,000'}}
+    token = kyle._current_profile.set(kyle.ProfileContext('ana-draft', data, [], [], ':memory:', '/dev/null'))
+    try:
+        draft, _ = kyle.build_letter_draft('Carlsen', 'Editor')
+        facts = kyle.application_facts()
+    finally:
+        kyle._current_profile.reset(token)
+    assert 'Germany since' not in draft and 'Germany since' not in facts
+    assert '1 May 2026' in draft and 'Ana Lima' in draft
@@ -0,0 +1,55 @@
+from concurrent.futures import Future
+
+import pytest
+
+import app as kyle
+
+
+@pytest.fixture
+def live(monkeypatch):
+    """An API key and a Claude that answers with what it was asked, recording each call"""
+    calls = []
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setattr(kyle, 'call_claude', lambda messages, **kwargs: calls.append(messages) or 'live answer')
+    return calls
+
+
+def test_prewarmed_answer_only_opens_a_conversation(client, ctx, live):
+    question = kyle.MIND_SUGGESTIONS[2]
+    kyle.cache_put('mind', kyle.mind_answer_key('professional', question), 'warm answer', depends=kyle.mind_depends())
+
+    opening = client.post('/api/mind', json={'message': question}).get_json()
+    assert (opening['reply'], opening['served']) == ('warm answer', 'cached')
+    assert live == []
+
+    history = [{'role': 'user', 'content': 'I only want remote roles'}, {'role': 'assistant', 'content': 'Noted.'}]
+    follow_up = client.post('/api/mind', json={'message': question, 'history': history}).get_json()
+    assert follow_up['reply'] == 'live answer' and 'served' not in follow_up
+    assert live[0][:2] == history
+
+
+def test_warming_stays_within_the_token_budget(ctx, live, monkeypatch):
+    submitted = []
+
+    class Executor:
+        def submit(self, fn, personality, question):
+            submitted.append((personality, question))
+            future = Future()
+            future.set_result('answer')
+            return future
+
+    monkeypatch.setattr(kyle, 'MIND_EXECUTOR', Executor())
+    monkeypatch.setattr(kyle, 'WARM_HOURS', '2-6')
+    monkeypatch.setattr(kyle, 'WARM_TOKENS', 3 * kyle.warm_cost('chat'))
+    cached = kyle.MIND_SUGGESTIONS[0]
+    kyle.cache_put('mind', kyle.mind_answer_key('professional', cached), 'warm answer', depends=kyle.mind_depends())
+
+    uncached = [q for q in kyle.MIND_SUGGESTIONS
+                if kyle.cache_get('mind', kyle.mind_answer_key('professional', q), depends=kyle.mind_depends()) is None]
+    
+    assert kyle.warm_mind_answers() == 3
+    assert cached not in uncached
+    assert submitted == [('professional', q) for q in uncached[:3]]
+
+    monkeypatch.setattr(kyle, 'WARM_HOURS', 'off')
+    assert kyle.warm_mind_answers() == 0
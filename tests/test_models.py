@@ -0,0 +1,34 @@
+import pytest
+
+import app as kyle
+
+
+def test_unknown_model_and_bad_budget_are_rejected(client):
+    assert client.post('/api/mind', json={'message': 'hi', 'model': 'gpt-4'}).status_code == 400
+    assert client.post('/api/mind', json={'message': 'hi', 'max_tokens': 'lots'}).status_code == 400
+
+
+def test_route_budget_and_override(ctx):
+    models, budget = kyle.MODEL_ROUTER.plan('chat')
+    assert budget == kyle.MODEL_ROUTES['chat'][1]
+    assert models[0] == kyle.MODEL_TIERS[kyle.MODEL_ROUTES['chat'][0]]
+    token = kyle._model_override.set({'model': 'fast', 'max_tokens': 50})
+    try:
+        models, budget = kyle.MODEL_ROUTER.plan('chat')
+    finally:
+        kyle._model_override.reset(token)
+    assert models[0] == kyle.MODEL_TIERS['fast'] and budget == 50
+
+
+@pytest.mark.parametrize('override', [{'model': 'fast', 'max_tokens': None}, {'model': None, 'max_tokens': 20}])
+def test_overridden_outputs_are_cached_apart(ctx, override):
+    key = f'answer-{override}'
+    token = kyle._model_override.set(override)
+    try:
+        kyle.cache_put('feedback', key, 'short answer')
+        assert kyle.cache_get('feedback', key) == 'short answer'
+    finally:
+        kyle._model_override.reset(token)
+    assert kyle.cache_get('feedback', key) is None
+    kyle.cache_put('feedback', key, 'routed answer')
+    assert kyle.cache_get('feedback', key) == 'routed answer'
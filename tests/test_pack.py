@@ -0,0 +1,68 @@
+import threading
+
+import pytest
+
+import app as kyle
+
+INPUTS = {'company': 'Deck13', 'role': 'Writer', 'job_description': 'Write quests.', 'cv_style': ''}
+
+
+@pytest.fixture
+def stages(monkeypatch):
+    """Stage runners that record what they were given; research and analysis may run at the same time"""
+    calls, lock = [], threading.Lock()
+
+    def runner(stage):
+        def run(inputs, deps):
+            with lock:
+                calls.append((stage, sorted(deps)))
+            if stage == 'analysis' and inputs['job_description'] == 'fail':
+                raise RuntimeError('analysis down')
+            return f'{stage} for {inputs["company"]}'
+        return run
+
+    for stage in kyle.PACK_STAGES:
+        monkeypatch.setitem(kyle.PACK_RUNNERS, stage, runner(stage))
+    return calls
+
+
+def test_stages_run_after_their_dependencies_and_are_cached(ctx, stages):
+    events = list(kyle.run_pack(INPUTS, ['letter']))
+    order = [stage for stage, _ in stages]
+    assert sorted(order[:2]) == ['analysis', 'research'] and order[2:] == ['letter']
+    assert stages[-1] == ('letter', ['analysis', 'research'])
+    assert events[-1]['failed'] == []
+
+    again = list(kyle.run_pack(INPUTS, ['letter']))
+    assert {e['stage']: e['status'] for e in again if 'stage' in e} == {
+        'research': 'cached', 'analysis': 'cached', 'letter': 'cached'}
+    assert len(stages) == 3
+
+    list(kyle.run_pack(INPUTS, ['letter'], force={'letter'}))
+    assert [stage for stage, _ in stages[3:]] == ['letter']
+
+
+def test_a_failed_stage_skips_its_dependents(ctx, stages):
+    events = list(kyle.run_pack({**INPUTS, 'job_description': 'fail'}, ['letter', 'cv']))
+    statuses = {e['stage']: e['status'] for e in events if 'stage' in e and e['status'] != 'started'}
+    assert statuses['analysis'] == 'error'
+    assert statuses['letter'] == statuses['cv'] == 'skipped'
+    assert events[-1]['failed'] == ['analysis', 'cv', 'letter']
+
+
+@pytest.mark.parametrize('body', [{'stages': 'letter'}, {'stages': ['letter', 'poem']}, {'force': 'letter'},
+                                  {'force': [{'stage': 'cv'}]}, {'force': 1}])
+def test_stages_and_force_must_name_known_stages(client, monkeypatch, body):
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setattr(kyle, 'run_pack', lambda *a: pytest.fail('ran with a malformed request'))
+    response = client.post('/api/pack', json={'company': 'Deck13', 'role': 'Writer', **body})
+    assert response.status_code == 400
+
+
+def test_stage_lists_and_force_true_are_accepted(client, monkeypatch):
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    given = []
+    monkeypatch.setattr(kyle, 'run_pack', lambda inputs, stages, force: given.append((stages, set(force))) or iter(()))
+    response = client.post('/api/pack', json={'company': 'Deck13', 'role': 'Writer', 'stages': ['letter'], 'force': True})
+    assert response.status_code == 200 and response.get_data() == b''
+    assert given == [(['letter'], set(kyle.PACK_STAGES))]
@@ -0,0 +1,30 @@
+import app as kyle
+
+
+def render(name, location='Berlin', links=None):
+    data = {'profile': {'name': name, 'location': location, 'email': 'a@b.de', 'phone': '1', 'links': links or {}}}
+    profile = kyle.ProfileContext('test', data, [], [], ':memory:', '/dev/null')
+    return kyle.render_page(profile, '/p/test')
+
+
+def test_profile_values_in_scripts_are_js_literals():
+    page = render("Ann O'Brien</script><script>alert(1)//", location="`${alert(2)}`")
+    script = page[page.index('<script>'):]
+    assert "O'Brien</script>" not in script
+    assert '"Ann O\'Brien<\\/script><script>alert(1)//".toUpperCase()' in script
+    assert '${"`${alert(2)}`".replace(' in script
+    assert 'const KYLE_BASE = "/p/test";' in script
+
+
+def test_page_cache_is_keyed_by_script_root(client):
+    direct = client.get('/').get_data(as_text=True)
+    mounted = client.get('/', base_url='http://localhost/kyle').get_data(as_text=True)
+    assert 'const KYLE_BASE = "";' in direct
+    assert 'const KYLE_BASE = "/kyle";' in mounted
+
+
+def test_cv_links_come_from_the_profile():
+    script = render('Ana Lima', links={'linkedin': 'https://www.linkedin.com/in/ana'})
+    script = script[script.index('<script>'):]
+    assert 'charles-siboto' not in script and 'charless-digital-canvas' not in script
+    assert "[['LinkedIn', \"https://www.linkedin.com/in/ana\"], ['Portfolio', \"\"]]" in script
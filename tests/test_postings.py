@@ -0,0 +1,64 @@
+import numpy as np
+
+import app as kyle
+
+POSTING = ('We are looking for a localisation producer to coordinate translators, manage vendor budgets, '
+           'plan release schedules across twelve languages and keep quality high for our mobile games. '
+           'You have three years of experience in games localisation and speak fluent German and English.')
+
+
+def test_signatures_estimate_jaccard():
+    index = kyle.PostingIndex()
+    same = index.signature(POSTING)
+    assert np.array_equal(same, index.signature(POSTING.upper()))
+    near = index.signature(POSTING.replace('twelve', 'fourteen'))
+    far = index.signature('Bake bread and pastries in our Kassel bakery every morning from four.')
+    assert np.mean(same == near) > 0.6 > np.mean(same == far)
+
+
+def test_near_duplicates_reuse_the_stored_analysis(client, ctx):
+    index = kyle.posting_index()
+    signature = index.signature(POSTING)
+    kyle.store_posting('InnoGames', 'Localisation Producer', POSTING, signature, {'fit_score': 8})
+    repost = POSTING + ' Apply by June.'
+    result = client.post('/api/postings/check', json={'job_description': repost}).get_json()
+    assert result['duplicate'] and result['analysis'] == {'fit_score': 8}
+    assert result['duplicate_of']['company'] == 'InnoGames'
+    assert result['changes'] == {'added': ['Apply by June.'], 'removed': []}
+
+
+def test_unrelated_postings_are_not_duplicates(client):
+    result = client.post('/api/postings/check', json={'job_description': 'Drive a forklift in our Hamburg warehouse.'})
+    assert result.get_json() == {'duplicate': False}
+
+
+def test_analyses_are_reused_only_under_the_same_model_override(client, ctx):
+    posting = ('Community manager for our strategy games: moderate the Discord, run weekly events, write patch '
+               'notes in German and English and report player sentiment to the product team every sprint.')
+    index = kyle.posting_index()
+    token = kyle._model_override.set({'model': 'fast', 'max_tokens': None})
+    try:
+        kyle.store_posting('Bytro', 'Community Manager', posting, index.signature(posting), {'fit_score': 6})
+    finally:
+        kyle._model_override.reset(token)
+    assert client.post('/api/postings/check', json={'job_description': posting}).get_json() == {'duplicate': False}
+    result = client.post('/api/postings/check?model=fast', json={'job_description': posting}).get_json()
+    assert result['duplicate'] and result['analysis'] == {'fit_score': 6}
+
+
+def test_purged_matches_are_skipped_and_reanalysis_replaces_them(client, ctx):
+    posting = ('Localisation QA tester for our racing games: check German and French builds, log text overflow '
+               'and terminology bugs, verify fixes and keep the glossary current with the translation vendor.')
+    index = kyle.posting_index()
+    purged = kyle.store_posting('Kylotonn', 'LQA Tester', posting, index.signature(posting), {'fit_score': 5})
+    kyle.get_db().execute('UPDATE postings SET analysis = NULL, deps = NULL WHERE id = ?', (purged,))
+    kyle.get_db().commit()
+    repost = posting + ' Apply by June.'
+    kept = kyle.store_posting('Kylotonn', 'LQA Tester', repost, index.signature(repost), {'fit_score': 7})
+    signature, duplicate, replaces = kyle.find_duplicate_posting(posting)
+    assert duplicate['duplicate_of']['id'] == kept and duplicate['analysis'] == {'fit_score': 7}
+    assert replaces == purged
+    count = kyle.get_db().execute('SELECT COUNT(*) FROM postings').fetchone()[0]
+    assert kyle.store_posting('Kylotonn', 'LQA Tester', posting, signature, {'fit_score': 6}, replaces) == purged
+    assert kyle.get_db().execute('SELECT COUNT(*) FROM postings').fetchone()[0] == count
+    assert kyle.find_duplicate_posting(posting)[1]['analysis'] == {'fit_score': 6}
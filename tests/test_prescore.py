@@ -0,0 +1,42 @@
+import pytest
+
+import app as kyle
+
+POSTINGS = [
+    {'company': 'Verlag', 'role': 'Editor', 'job_description': 'Edit manuscripts and manage book projects in publishing.'},
+    {'company': 'Garage', 'role': 'Mechanic', 'job_description': 'Repair engines, brakes and gearboxes.'},
+]
+
+
+def test_postings_are_ranked_by_local_fit(client):
+    ranked = client.post('/api/prescore', json={'postings': POSTINGS}).get_json()['ranked']
+    assert [r['company'] for r in ranked] == ['Verlag', 'Garage']
+    assert all(0 <= r['fit_score'] <= 10 for r in ranked)
+
+
+def test_valid_weight_overrides_change_the_scores(client):
+    default = client.post('/api/prescore', json={'postings': POSTINGS[:1]}).get_json()['ranked'][0]
+    phrases_only = client.post('/api/prescore', json={'postings': POSTINGS[:1],
+                                                      'weights': {'phrase_share': 0, 'skills': 5}}).get_json()
+    assert phrases_only['ranked'][0]['fit_score'] != default['fit_score']
+
+
+@pytest.mark.parametrize('weights', [{'phrase_saturation': 0}, {'phrase_saturation': -3}, {'skills': 'heavy'},
+                                     {'phrase_share': 1.5}, {'experience': 'nan'}, ['skills']])
+def test_invalid_weights_are_rejected(client, weights):
+    response = client.post('/api/prescore', json={'postings': POSTINGS, 'weights': weights})
+    assert response.status_code == 400
+
+
+def test_top_k_must_be_an_integer(client):
+    assert client.post('/api/prescore', json={'postings': POSTINGS, 'top_k': 'all'}).status_code == 400
+
+
+@pytest.mark.parametrize('postings', [['Editor at Verlag'], [POSTINGS[0], None], {'company': 'Verlag'}])
+def test_postings_must_be_a_list_of_objects(client, postings):
+    assert client.post('/api/prescore', json={'postings': postings}).status_code == 400
+
+
+def test_an_empty_profile_scores_zero():
+    result = kyle.FitScorer({}).score_many([POSTINGS[0]['job_description']])[0]
+    assert result['fit_score'] == 0 and result['matching_skills'] == []
@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+import app as kyle
+
+
+@pytest.fixture
+def tenant():
+    """A second profile on disk, served under /p/ana/"""
+    folder = os.path.join(kyle.PROFILES_DIR, 'ana')
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, 'profile.json'), 'w', encoding='utf-8') as f:
+        json.dump({'profile': {'name': 'Ana Lima', 'location': 'Leipzig'}, 'skills': {'tools': ['Figma']},
+                   'target_companies': {'high_priority': ['Spreadshirt']}}, f)
+    return os.path.join(folder, 'profile.json')
+
+
+def test_profiles_are_served_under_their_prefix(client, tenant):
+    assert client.get('/p/ana/api/profile').get_json()['profile']['name'] == 'Ana Lima'
+    assert client.get('/api/profile').get_json()['profile']['name'] != 'Ana Lima'
+    assert client.get('/p/nobody/api/profile').status_code == 404
+    assert 'ana' in client.get('/api/profiles').get_json()['profiles']
+
+
+def test_each_profile_has_its_own_tracker(client, tenant):
+    client.post('/p/ana/api/applications', json={'company': 'Spreadshirt', 'role': 'Designer'})
+    assert client.get('/p/ana/api/applications?company=Spreadshirt').get_json()['total'] == 1
+    assert client.get('/api/applications?company=Spreadshirt').get_json()['total'] == 0
+
+
+def test_patch_drops_only_what_read_the_changed_sections(client, tenant):
+    ana = kyle.PROFILES.get('ana')
+    ana.get('company_matcher', lambda: 'matcher', ('target_companies',))
+    ana.get('fit_scorer', lambda: 'scorer', ('skills',))
+    version = ana.data.get('version', 0)
+
+    result = client.patch('/p/ana/api/profile', json={'skills': {'tools': ['Figma', 'Blender']}}).get_json()
+    assert result['changed'] == ['skills'] and result['derived_dropped'] == ['fit_scorer']
+    assert result['version'] == version + 1
+    assert 'company_matcher' in ana.derived and 'fit_scorer' not in ana.derived
+    with open(tenant, encoding='utf-8') as f:
+        assert json.load(f)['skills']['tools'] == ['Figma', 'Blender']
+
+    assert client.patch('/p/ana/api/profile', json=['skills']).status_code == 400
+
+
+def test_cached_outputs_follow_their_sections(ctx):
+    kyle.cache_put('feedback', 'skills-based', 'old', depends=('skills',))
+    kyle.cache_put('feedback', 'experience-based', 'kept', depends=('experience',))
+    kyle.current_profile().hashes.pop('skills', None)
+    original = kyle.current_profile().data.get('skills')
+    kyle.current_profile().data['skills'] = {'edited': ['yes']}
+    try:
+        assert kyle.cache_get('feedback', 'skills-based', depends=('skills',)) is None
+        assert kyle.purge_stale(['skills']) >= 1
+    finally:
+        kyle.current_profile().data['skills'] = original
+        kyle.current_profile().hashes.pop('skills', None)
+    assert kyle.cache_get('feedback', 'experience-based', depends=('experience',)) == 'kept'
+
+
+def test_merge_patch_follows_rfc_7386():
+    target = {'a': {'b': 1, 'c': 2}, 'd': [1, 2]}
+    assert kyle.merge_patch(target, {'a': {'b': None, 'e': 3}, 'd': [3]}) == {'a': {'c': 2, 'e': 3}, 'd': [3]}
+    assert target == {'a': {'b': 1, 'c': 2}, 'd': [1, 2]}
+
+
+def test_registry_evicts_least_recently_used(tenant):
+    registry = kyle.ProfileRegistry(max_profiles=1, max_bytes=10 ** 9)
+    first = registry.get(kyle.DEFAULT_PROFILE)
+    registry.get('ana')
+    assert [p.slug for p in registry.loaded()] == ['ana'] and registry.stats()['evictions'] == 1
+    assert registry.get(kyle.DEFAULT_PROFILE) is not first
+    assert registry.get('../etc') is None
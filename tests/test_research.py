@@ -0,0 +1,65 @@
+import datetime
+import threading
+
+import pytest
+
+import app as kyle
+
+
+@pytest.fixture
+def claude(monkeypatch):
+    """A slow Claude that researches whatever it is asked about, counting calls"""
+    calls, release = [], threading.Event()
+
+    def call(messages, **kwargs):
+        calls.append(messages[0]['content'])
+        release.wait(5)
+        return f'Research #{len(calls)}'
+
+    monkeypatch.setattr(kyle, 'ANTHROPIC_API_KEY', 'test-key')
+    monkeypatch.setattr(kyle, 'call_claude', call)
+    return calls, release
+
+
+def test_prefetch_is_joined_rather_than_repeated(ctx, claude):
+    calls, release = claude
+    assert kyle.prefetch_research('Yager Development') == 'queued'
+    assert kyle.prefetch_research('yager  development') == 'pending'
+    release.set()
+    assert kyle.get_research('Yager Development') == 'Research #1'
+    assert kyle.prefetch_research('Yager Development') == 'cached'
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('hours, hour, expected', [('2-6', 3, True), ('2-6', 6, False), ('22-4', 23, True),
+                                                   ('22-4', 2, True), ('22-4', 12, False), ('off', 3, False)])
+def test_off_peak_window(monkeypatch, hours, hour, expected):
+    monkeypatch.setattr(kyle, 'WARM_HOURS', hours)
+    assert kyle.off_peak(datetime.datetime(2026, 1, 5, hour)) is expected
+
+
+def test_warm_plan_puts_interviews_first_and_skips_fresh_research(client, ctx, claude):
+    calls, release = claude
+    release.set()
+    client.post('/api/applications', json={'company': 'Mimimi Games', 'status': 'interview'})
+    plan = kyle.warm_plan()
+    assert plan[0]['priority'] == 0 and 'Mimimi Games' in [c['company'] for c in plan if c['priority'] == 0]
+    kyle.research_company('Mimimi Games')
+    assert 'Mimimi Games' not in [c['company'] for c in kyle.warm_plan()]
+
+
+def test_warming_reserves_the_token_budget(ctx, claude, monkeypatch):
+    calls, release = claude
+    release.set()
+    monkeypatch.setattr(kyle, 'WARM_JITTER', 0)
+    monkeypatch.setattr(kyle, 'WARM_TOKENS', 2 * kyle.warm_cost('research'))
+    due = len(kyle.warm_plan())
+    summary = kyle.warm_research(scheduled=False)
+    assert summary['refreshed'] == 2 and summary['deferred'] == due - 2
+    assert summary['tokens_reserved'] == 2 * kyle.warm_cost('research')
+
+
+def test_warming_refuses_a_model_override(client, claude, monkeypatch):
+    monkeypatch.setattr(kyle, 'warm_research', lambda scheduled=True: pytest.fail('warmed under an override'))
+    assert client.post('/api/research/warm?model=fast').status_code == 400
+    assert client.post('/api/research/warm', json={'max_tokens': 100}).status_code == 400
@@ -0,0 +1,75 @@
+import json
+import re
+import shutil
+import subprocess
+
+import pytest
+
+import app as kyle
+
+HARNESS = """
+const queued = [{id: 1, url: '/a', method: 'POST', body: '1'}, {id: 2, url: '/b', method: 'POST', body: '2'},
+                {id: 3, url: '/c', method: 'POST', body: '3'}];
+const statuses = %s;
+const deleted = [], sent = [];
+function outboxTx(mode, action) {
+    return Promise.resolve(action({getAll: () => queued, delete: id => deleted.push(id)}));
+}
+function fetch(url) {
+    sent.push(url);
+    const status = statuses[url];
+    return status === 'offline' ? Promise.reject(new TypeError('Failed to fetch')) : Promise.resolve({status, ok: status < 300});
+}
+%s
+replayOutbox().catch(() => {}).then(() => console.log(JSON.stringify({sent, deleted})));
+"""
+
+
+def replay(statuses):
+    source = re.search(r'^function replayOutbox\(\) \{.*?^\}', kyle.SERVICE_WORKER_JS, re.S | re.M).group(0)
+    result = subprocess.run(['node', '-e', HARNESS % (json.dumps(statuses), source)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(not shutil.which('node'), reason='needs node')
+@pytest.mark.parametrize('statuses, sent, deleted', [
+    ({'/a': 200, '/b': 400, '/c': 201}, ['/a', '/b', '/c'], [1, 2, 3]),
+    ({'/a': 200, '/b': 503, '/c': 200}, ['/a', '/b'], [1]),
+    ({'/a': 'offline', '/b': 200, '/c': 200}, ['/a'], []),
+    ({'/a': 401, '/b': 200, '/c': 200}, ['/a'], []),
+])
+def test_replay_keeps_requests_the_server_did_not_take(statuses, sent, deleted):
+    assert replay(statuses) == {'sent': sent, 'deleted': deleted}
+
+
+def test_service_worker_is_versioned(client):
+    script = client.get('/sw.js').get_data(as_text=True)
+    assert '__VERSION__' not in script and 'function replayOutbox()' in script
+
+
+ROUTING = """
+const handlers = {}, served = [];
+const self = {registration: {scope: 'https://kyle.example/p/ana/'}, location: {origin: 'https://kyle.example'},
+              addEventListener: (type, handler) => { handlers[type] = handler; }};
+const caches = {open: name => Promise.resolve({match: () => Promise.resolve(null), put: () => {}})};
+function fetch(request) { return Promise.resolve({ok: true, clone() { return this; }}); }
+%s
+for (const [url, mode] of %s) {
+    let how = 'network';
+    handlers.fetch({request: {url, method: 'GET', mode}, respondWith: () => { how = 'worker'; }});
+    served.push(how);
+}
+console.log(JSON.stringify(served));
+"""
+
+
+@pytest.mark.skipif(not shutil.which('node'), reason='needs node')
+def test_only_the_dashboard_is_served_from_the_shell():
+    requests = [['https://kyle.example/p/ana/', 'navigate'],
+                ['https://kyle.example/p/ana/api/ingest/abc', 'navigate'],
+                ['https://kyle.example/p/ana/api/models', 'navigate'],
+                ['https://kyle.example/p/ana/api/applications', 'cors']]
+    script = ROUTING % (kyle.SERVICE_WORKER_JS.replace('__VERSION__', 'test'), json.dumps(requests))
+    result = subprocess.run(['node', '-e', script], capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout) == ['worker', 'network', 'network', 'worker']
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+import app as kyle
+
+REPLY = 'Here you go:\n{"fit_score": 8, "summary": "Strong, \\"editorial\\" fit {really}", "skills": ["InDesign", "Jira"], ' \
+        '"gaps": {"german": "C1 needed"}}\nThanks!'
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, len(REPLY)])
+def test_fields_are_reported_once_each_as_they_complete(size):
+    parser, seen = kyle.StreamingJSONParser(), []
+    for start in range(0, len(REPLY), size):
+        seen += parser.feed(REPLY[start:start + size])
+    assert [field for field, _ in seen] == ['fit_score', 'summary', 'skills', 'gaps']
+    assert parser.complete and parser.fields['summary'] == 'Strong, "editorial" fit {really}'
+    assert parser.finish() == (parser.fields, [])
+
+
+def test_a_field_is_not_reported_before_its_value_ends():
+    parser = kyle.StreamingJSONParser()
+    assert parser.feed('{"skills": ["InDesign", ') == []
+    assert parser.feed('"Jira"], "fit') == [('skills', ['InDesign', 'Jira'])]
+
+
+def test_truncated_reply_is_repaired_on_finish():
+    parser = kyle.StreamingJSONParser()
+    parser.feed('{"fit_score": 7, "skills": ["InDesign", "Jir')
+    fields, recovered = parser.finish()
+    assert fields == {'fit_score': 7, 'skills': ['InDesign', 'Jir']} and recovered == [('skills', ['InDesign', 'Jir'])]
+
+
+def test_dangling_key_falls_back_to_the_last_complete_member():
+    parser = kyle.StreamingJSONParser()
+    parser.feed('{"fit_score": 7, "summary": "Good", "skills":')
+    assert parser.finish()[0] == {'fit_score': 7, 'summary': 'Good'}
+
+
+def test_finish_without_an_object():
+    parser = kyle.StreamingJSONParser()
+    parser.feed('I cannot help with that.')
+    assert parser.finish() == (None, [])
+
+
+@pytest.mark.parametrize('fragment', ['{"a": [1, 2', '{"a": "x\\', '{"a": {"b": 1,'])
+def test_closed_fragments_parse(fragment):
+    assert isinstance(json.loads(kyle.close_json_fragment(fragment)), dict)
+
+
+def test_trailing_commas_are_tolerated():
+    assert kyle._loads_lenient('{"a": [1, 2,],}') == {'a': [1, 2]}
+    assert kyle._loads_lenient('{"a": ') is None
@@ -0,0 +1,22 @@
+import app as kyle
+
+ROBOT = ('Leveraging synergistic paradigms, the candidate operationalises cross-functional deliverables; '
+         'furthermore, stakeholder alignment is maximised via robust, scalable, best-in-class frameworks; '
+         'moreover, KPIs are optimised; consequently, value is unlocked; additionally, bandwidth is streamlined.')
+
+
+def test_own_writing_scores_in_voice_and_jargon_is_flagged(ctx):
+    fingerprint = kyle.get_style_fingerprint()
+    own = fingerprint.examples[0]
+    result = fingerprint.check(f'{own}\n\n{ROBOT}\n\nThanks!')
+    first, second = result['paragraphs']
+    assert (first['index'], second['index']) == (1, 2)   # the short sign-off is too short to score
+    assert first['voice'] > 50 and not first['flagged']
+    assert second['flagged'] and second['reasons'] and result['flagged'] == [2]
+
+
+def test_style_check_endpoint(client):
+    assert client.post('/api/style/check', json={'text': ''}).status_code == 400
+    result = client.post('/api/style/check', json={'text': ROBOT}).get_json()
+    assert result['success'] and result['flagged'] == [1]
+    assert client.post('/api/style/check', json={'text': 'Too short to score.'}).get_json()['voice'] is None
@@ -0,0 +1,52 @@
+import gzip
+import json
+
+
+def sync(client, device, changes=(), cursor=0):
+    response = client.post('/api/sync', json={'device': device, 'cursor': cursor, 'changes': list(changes)})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def memory(key, value, updated_at, deleted=False):
+    return {'store': 'memory', 'key': key, 'value': value, 'updated_at': updated_at, 'deleted': deleted}
+
+
+def test_last_writer_wins_and_other_devices_pull_it(client):
+    cursor = sync(client, 'phone')['cursor']
+    assert sync(client, 'laptop', [memory('lww', 'new', 20.0)])['rejected'] == []
+    stale = sync(client, 'tablet', [memory('lww', 'old', 10.0)])
+    assert stale['rejected'] == [{'store': 'memory', 'key': 'lww'}]
+
+    pulled = sync(client, 'phone', cursor=cursor)
+    assert [(c['key'], c['value']) for c in pulled['changes'] if c['key'] == 'lww'] == [('lww', 'new')]
+    assert not any(c['key'] == 'lww' for c in sync(client, 'phone', cursor=pulled['cursor'])['changes'])
+
+
+def test_equal_timestamps_break_ties_by_device(client):
+    sync(client, 'a-device', [memory('tie', 'from a', 5.0)])
+    assert sync(client, 'b-device', [memory('tie', 'from b', 5.0)])['rejected'] == []
+    assert sync(client, 'a-device', [memory('tie', 'from a again', 5.0)])['rejected'] != []
+
+
+def test_invalid_changes_are_rejected_individually(client):
+    changes = [memory('before-bad', 1, 30.0), {'store': 'nope', 'key': 'x'}, 'not a change',
+               {'store': 'applications', 'key': 'no-company', 'value': {'role': 'Editor'}},
+               memory('after-bad', 2, 30.0)]
+    result = sync(client, 'batch-device', changes)
+    assert [r['key'] for r in result['rejected']] == ['x', None, 'no-company']
+    assert all(r['error'] for r in result['rejected'])
+    pulled = sync(client, 'other-device')['changes']
+    assert {'before-bad', 'after-bad'} <= {c['key'] for c in pulled}
+
+
+def test_gzip_bodies_and_malformed_requests(client):
+    body = gzip.compress(json.dumps({'device': 'zipped', 'changes': [memory('gz', 'yes', 40.0)]}).encode())
+    response = client.post('/api/sync', data=body, headers={'Content-Encoding': 'gzip', 'Content-Type': 'application/json'})
+    assert response.status_code == 200 and response.get_json()['rejected'] == []
+
+    bad_gzip = client.post('/api/sync', data=b'not gzip', headers={'Content-Encoding': 'gzip'})
+    assert bad_gzip.status_code == 400
+    assert client.post('/api/sync', json={'device': 'd', 'cursor': 'abc'}).status_code == 400
+    assert client.post('/api/sync', json={'device': 'd', 'changes': {'store': 'memory'}}).status_code == 400
+    assert client.post('/api/sync', json={'cursor': 0}).status_code == 400